@@ -0,0 +1,60 @@
+# Backend.py
+# Seleccion del motor numerico de las bibliotecas internas.
+#
+#  - "python" (por defecto): las implementaciones hechas a mano de Matrix.py,
+#    MyMLP.py y MyClusterNN.py.
+#  - "numpy": las mismas operaciones vectorizadas con NumPy (NumpyBackend.py).
+#    Es opcional: solo se usa si NumPy esta instalado y se pide con la
+#    variable de entorno DLANG_BACKEND=numpy o con Main.py --backend numpy.
+
+import os
+import sys
+
+
+BACKENDS = ("python", "numpy")
+
+_current = "python"
+_module = None   # NumpyBackend cuando el motor es "numpy"
+
+
+# Cambia el motor. Con "numpy" falla si NumPy no se puede importar
+def set_backend(name):
+    global _current, _module
+    if name not in BACKENDS:
+        raise ValueError(f"Motor numerico desconocido: {name} (opciones: {', '.join(BACKENDS)})")
+    module = None
+    if name == "numpy":
+        try:
+            import NumpyBackend as module
+        except ImportError:
+            raise Exception("El motor numpy necesita NumPy instalado (pip install numpy)") from None
+    _current = name
+    _module = module
+
+
+def get_backend():
+    return _current
+
+
+# Modulo con las versiones vectorizadas, o None con el motor de Python.
+# Uso en las bibliotecas:
+#     fast = Backend.accelerated()
+#     if fast is not None:
+#         return fast.mat_mul(A, B)
+def accelerated():
+    return _module
+
+
+# Motor inicial segun DLANG_BACKEND; si pide numpy y no esta instalado se
+# avisa y se sigue con el de Python
+def _from_environment():
+    name = os.environ.get("DLANG_BACKEND", "").strip().lower()
+    if not name:
+        return
+    try:
+        set_backend(name)
+    except Exception as e:
+        print(f"Aviso: DLANG_BACKEND={name} ignorado: {e}", file=sys.stderr)
+
+
+_from_environment()
@@ -0,0 +1,234 @@
+# Benchmarks.py
+# Mediciones de rendimiento de las bibliotecas internas.
+#
+#   python Benchmarks.py                      (todos)
+#   python Benchmarks.py matmul               (tamanos 64, 256 y 512)
+#   python Benchmarks.py matmul --sizes 64 128
+#   python Benchmarks.py mathfn --samples 50000
+#   python Benchmarks.py cluster --queries 5000
+#
+# Cada caso compara la implementacion actual con la de referencia que
+# reemplazo, sobre los mismos datos, y muestra la aceleracion.
+
+import sys
+import math
+import time
+import random
+import argparse
+import operator
+from array import array
+from itertools import repeat
+
+import Matrix
+import MyMath
+import MyClusterNN
+
+
+# Mejor tiempo (segundos) de repeat ejecuciones de fn()
+def best_time(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        t = time.perf_counter() - t0
+        if best is None or t < best:
+            best = t
+    return best
+
+
+def _random_matrix(rows, cols, rng):
+    return Matrix.Matrix(rows, cols, array('d', [rng.uniform(-1.0, 1.0) for _ in range(rows * cols)]))
+
+
+def _report(title, rows):
+    print(title)
+    print(f"  {'caso':<14} {'referencia':>12} {'actual':>12} {'aceleracion':>12}")
+    for name, ref, cur in rows:
+        print(f"  {name:<14} {ref * 1000:>10.1f}ms {cur * 1000:>10.1f}ms {ref / cur:>11.1f}x")
+
+
+# ---------- Producto de matrices ----------
+
+def bench_matmul(args):
+    sizes, repeat = args.sizes, args.repeat
+    rng = random.Random(0)
+    rows = []
+    for n in sizes:
+        A = _random_matrix(n, n, rng)
+        B = _random_matrix(n, n, rng)
+        a, b = A.flat(), B.flat()
+        # la version original es O(n^3) escalar: una sola ejecucion basta
+        ref = best_time(lambda: Matrix._matmul_naive(a, b, n, n, n), repeat=1 if n > 128 else repeat)
+        cur = best_time(lambda: Matrix.mat_mul(A, B), repeat)
+
+        expected = Matrix._matmul_naive(a, b, n, n, n)
+        got = Matrix.mat_mul(A, B).flat()
+        err = max(abs(x - y) for x, y in zip(expected, got))
+        if err > 1e-9 * n:
+            raise Exception(f"mat_mul difiere de la referencia en {err} (n={n})")
+        rows.append((f"{n}x{n}", ref, cur))
+    _report("mat_mul (i-j-k original vs actual)", rows)
+
+
+# ---------- Funciones trascendentes de MyMath ----------
+# Versiones anteriores, como referencia: reduccion de rango restando 2 pi en
+# un bucle (O(|x|) y pierde precision con |x| grande) y e^x como serie de
+# Taylor de 10 terminos sin reducir (solo sirve cerca de 0).
+
+_REF_SIN_COEFS = tuple((-1) ** k / MyMath.factorial(2 * k + 1) for k in range(10))
+_REF_COS_COEFS = tuple((-1) ** k / MyMath.factorial(2 * k) for k in range(10))
+
+
+def _ref_reducir_angulo(x):
+    while x > MyMath.PI:
+        x -= 2 * MyMath.PI
+    while x < -MyMath.PI:
+        x += 2 * MyMath.PI
+    return x
+
+
+# Polinomio c0 + c1 t + ... para todos los elementos, un coeficiente por pasada
+def _ref_horner(coefs, ts):
+    acc = [coefs[-1]] * len(ts)
+    for c in reversed(coefs[:-1]):
+        acc = list(map(operator.add, map(operator.mul, acc, ts), repeat(c)))
+    return acc
+
+
+def _ref_sin(xs):
+    xs = [_ref_reducir_angulo(float(v)) for v in xs]
+    x2 = [v * v for v in xs]
+    return [v * p for v, p in zip(xs, _ref_horner(_REF_SIN_COEFS, x2))]
+
+
+def _ref_cos(xs):
+    xs = [_ref_reducir_angulo(float(v)) for v in xs]
+    return _ref_horner(_REF_COS_COEFS, [v * v for v in xs])
+
+
+def _ref_exp1(x):
+    res = 0.0
+    for k in range(10):
+        res += MyMath.potencia(x, k) / MyMath.factorial(k)
+    return res
+
+
+def _ref_exp(xs):
+    return [_ref_exp1(float(v)) for v in xs]
+
+
+# Error maximo frente al modulo math de Python (relativo para exp)
+def _max_error(values, expected, relative=False):
+    err = 0.0
+    for v, e in zip(values, expected):
+        d = abs(v - e)
+        if relative and e != 0.0:
+            d /= abs(e)
+        err = max(err, d)
+    return err
+
+
+def bench_mathfn(args):
+    rng = random.Random(0)
+    xs = [rng.uniform(-10.0, 10.0) for _ in range(args.samples)]
+    cases = [
+        ("sin", _ref_sin, MyMath.sin, math.sin, False),
+        ("cos", _ref_cos, MyMath.cos, math.cos, False),
+        ("exp", _ref_exp, MyMath.exp, math.exp, True),
+    ]
+    rows = []
+    errors = []
+    for name, ref_fn, cur_fn, exact_fn, relative in cases:
+        ref = best_time(lambda: ref_fn(xs), args.repeat)
+        cur = best_time(lambda: cur_fn(xs), args.repeat)
+        rows.append((name, ref, cur))
+        expected = [exact_fn(x) for x in xs]
+        errors.append((name, _max_error(ref_fn(xs), expected, relative),
+                       _max_error(cur_fn(xs), expected, relative)))
+    _report(f"MyMath ({args.samples} valores en [-10, 10])", rows)
+
+    print("  error maximo frente a math (relativo en exp)")
+    print(f"  {'caso':<14} {'referencia':>12} {'actual':>12}")
+    for name, ref_err, cur_err in errors:
+        print(f"  {name:<14} {ref_err:>12.2e} {cur_err:>12.2e}")
+
+    # la referencia tarda O(|x|) en reducir: solo se mide la version actual
+    print("  argumentos grandes, version actual")
+    for limit in (1e9, 1e22, 1e300):
+        big = [rng.uniform(-limit, limit) for _ in range(1000)]
+        for name, fn, exact_fn in (("sin", MyMath.sin, math.sin), ("cos", MyMath.cos, math.cos)):
+            err = _max_error(fn(big), [exact_fn(x) for x in big])
+            print(f"  {name + f' |x|<={limit:.0e}':<22} {err:>17.2e}")
+
+
+# ---------- Centro mas cercano (predict_cluster) ----------
+
+# Referencia: recorrer todos los centros con _squared_distance
+def _ref_predict_cluster(model, X):
+    labels = []
+    for x in X:
+        xv = [float(v) for v in x]
+        best_j = 0
+        best_d = MyClusterNN._squared_distance(xv, model.centers[0])
+        for j in range(1, model.num_clusters):
+            d = MyClusterNN._squared_distance(xv, model.centers[j])
+            if d < best_d:
+                best_d = d
+                best_j = j
+        labels.append(best_j)
+    return labels
+
+
+def bench_cluster(args):
+    rng = random.Random(0)
+    rows = []
+    for dim, k in ((2, 256), (4, 256), (16, 256)):
+        model = MyClusterNN.create_cluster_net(dim, k)
+        model.centers = [[rng.gauss(0.0, 1.0) for _ in range(dim)] for _ in range(k)]
+        X = [[rng.gauss(0.0, 1.0) for _ in range(dim)] for _ in range(args.queries)]
+        if MyClusterNN.predict_cluster(model, X) != _ref_predict_cluster(model, X):
+            raise Exception(f"predict_cluster difiere de la referencia (dim {dim}, k {k})")
+        ref = best_time(lambda: _ref_predict_cluster(model, X), args.repeat)
+        cur = best_time(lambda: MyClusterNN.predict_cluster(model, X), args.repeat)
+        rows.append((f"dim {dim} k {k}", ref, cur))
+    _report(f"predict_cluster ({args.queries} consultas)", rows)
+
+
+BENCHMARKS = {
+    "matmul": bench_matmul,
+    "mathfn": bench_mathfn,
+    "cluster": bench_cluster,
+}
+
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Benchmarks de DLang")
+    # sin choices=: argparse tambien valida la lista vacia y la rechaza
+    arg_parser.add_argument("bench", nargs="*",
+                            help=f"benchmarks a ejecutar: {', '.join(sorted(BENCHMARKS))} (por defecto todos)")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[64, 256, 512],
+                            help="tamanos de matriz a medir (matmul)")
+    arg_parser.add_argument("--samples", type=int, default=20000,
+                            help="cantidad de valores a evaluar (mathfn)")
+    arg_parser.add_argument("--queries", type=int, default=2000,
+                            help="cantidad de ejemplos a clasificar (cluster)")
+    arg_parser.add_argument("--repeat", type=int, default=3,
+                            help="repeticiones por caso (se toma la mejor)")
+    args = arg_parser.parse_args(argv)
+
+    unknown = [name for name in args.bench if name not in BENCHMARKS]
+    if unknown:
+        arg_parser.error(f"benchmark desconocido: {', '.join(unknown)} "
+                         f"(opciones: {', '.join(sorted(BENCHMARKS))})")
+    args.bench = args.bench or sorted(BENCHMARKS)
+    return args
+
+
+def main():
+    args = parse_args()
+    for name in args.bench:
+        BENCHMARKS[name](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+# Builtins.py
+# Registro de las funciones internas de DLang.
+#
+# Se construye una sola vez al importar el modulo: cada modulo interno declara
+# en DL_BUILTINS los nombres que exporta al lenguaje, y solo esos quedan en
+# una tabla nombre -> Builtin con su aridad. Lo demas (clases, utilidades
+# como as_matrix) no se ve desde DLang ni tapa funciones del usuario. Si dos
+# modulos exportan el mismo nombre es un error, en lugar de quedarse en
+# silencio con el primero que aparezca.
+
+import inspect
+
+import MyMath
+import MyPlot
+import Matrix
+import MyFile
+import MyRegression
+import MyMLP
+import MyClusterNN
+import MyCheckpoint
+
+
+BUILTIN_MODULES = (MyMath, Matrix, MyPlot, MyFile, MyRegression, MyMLP, MyClusterNN,
+                   MyCheckpoint)
+
+# Funciones puras: sin efectos secundarios y con resultado que solo depende de
+# los argumentos. El optimizador puede evaluarlas al compilar si todos sus
+# argumentos son constantes.
+PURE_BUILTINS = frozenset([
+    'sin', 'cos', 'tan', 'sqrt', 'exp', 'log', 'factorial', 'binomial',
+    'potencia', 'reducir_angulo',
+])
+
+
+class Builtin:
+
+    def __init__(self, name, func, module_name, min_args, max_args):
+        self.name = name
+        self.func = func
+        self.module_name = module_name
+        self.min_args = min_args
+        self.max_args = max_args   # None = sin limite (*args)
+        self.pure = name in PURE_BUILTINS
+
+    def accepts(self, argc):
+        if argc < self.min_args:
+            return False
+        return self.max_args is None or argc <= self.max_args
+
+    # Error para una llamada con un numero de argumentos no valido
+    def arity_error(self, argc):
+        if self.max_args is None:
+            expected = f"al menos {self.min_args}"
+        elif self.min_args == self.max_args:
+            expected = f"{self.min_args}"
+        else:
+            expected = f"entre {self.min_args} y {self.max_args}"
+        return Exception(f"{self.name} espera {expected} argumentos, recibio {argc}")
+
+    def __repr__(self):
+        return f"<builtin {self.module_name}.{self.name}>"
+
+
+# Aridad (minimo, maximo) de una funcion segun su firma
+def _arity(func):
+    min_args = 0
+    max_args = 0
+    for p in inspect.signature(func).parameters.values():
+        if p.kind == p.VAR_POSITIONAL:
+            max_args = None
+        elif p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD):
+            if p.default is p.empty:
+                min_args += 1
+            if max_args is not None:
+                max_args += 1
+    return min_args, max_args
+
+
+def build_registry(modules=BUILTIN_MODULES):
+    registry = {}
+    for module in modules:
+        for name in module.DL_BUILTINS:
+            obj = getattr(module, name, None)
+            if not inspect.isfunction(obj) or obj.__module__ != module.__name__:
+                raise Exception(f"{module.__name__}.DL_BUILTINS exporta {name}, "
+                                f"que no es una funcion del modulo")
+            if name in registry:
+                raise Exception(
+                    f"Funcion interna duplicada: {name} "
+                    f"(en {registry[name].module_name} y {module.__name__})"
+                )
+            min_args, max_args = _arity(obj)
+            registry[name] = Builtin(name, obj, module.__name__, min_args, max_args)
+    return registry
+
+
+REGISTRY = build_registry()
+
+
+# Devuelve el Builtin con ese nombre, o None si no es una funcion interna
+def lookup(name):
+    return REGISTRY.get(name)
+
+
+# Resuelve una llamada con argc argumentos: devuelve la funcion de Python a
+# invocar, o None si el nombre no es interno (puede ser una funcion del DSL).
+# Lanza error si el numero de argumentos no es valido.
+def resolve(name, argc):
+    builtin = REGISTRY.get(name)
+    if builtin is None:
+        return None
+    if not builtin.accepts(argc):
+        raise builtin.arity_error(argc)
+    return builtin.func
@@ -0,0 +1,426 @@
+# Compiler.py
+# Compila el arbol de ANTLR de un programa DLang a un arbol de closures de Python.
+#
+# El arbol se recorre una sola vez: cada nodo se convierte en una funcion que ya
+# tiene resueltos sus operadores, literales, nombres y funciones internas.
+# Ejecutar el programa es llamar a la closure raiz, sin volver a pasar por
+# visit(), getText() ni float() en cada iteracion.
+#
+# Todas las closures reciben el marco de la llamada en curso: la lista de slots
+# locales de la funcion (ver Scope.py), o None en el nivel superior.
+#
+# Convencion para sentencias: la closure devuelve None si la ejecucion sigue,
+# o un _Return con el valor cuando se ejecuta un 'return'.
+#
+# Con un Optimizer (Optimizer.py) las expresiones constantes se compilan a su
+# valor ya calculado y los 'if' / 'while' con condicion constante solo
+# conservan el bloque que se ejecuta.
+
+from DLangVisitor import DLangVisitor
+from DLangParser import DLangParser
+
+import Builtins
+from Operators import op_pow, op_not, add_sub_chain, ARITH_OPS, REL_OPS
+from Matrix import is_dense
+from Scope import Scope, UNSET
+
+
+class _Return:
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+# Funcion del DSL ya compilada
+class _Function:
+    __slots__ = ('name', 'param_slots', 'nslots', 'body')
+
+    def __init__(self, name, param_slots, nslots, body):
+        self.name = name
+        self.param_slots = param_slots
+        self.nslots = nslots
+        self.body = body
+
+
+class Compiler(DLangVisitor):
+    # Las closures trabajan sobre las mismas globales y tabla de funciones que el
+    # EvalVisitor recibido, de modo que el estado se conserva entre llamadas (REPL)
+    def __init__(self, visitor, optimizer=None):
+        self.env = visitor.env
+        self.funcs = visitor.funcs
+        self.scope = None   # Scope de la funcion que se esta compilando
+        self.constants = optimizer.constants if optimizer else {}
+        self.branches = optimizer.branches if optimizer else {}
+        self.dead_loops = optimizer.dead_loops if optimizer else set()
+
+    def compile(self, tree):
+        return self.visit(tree)
+
+    def visit(self, tree):
+        if tree in self.constants:
+            return self._const(self.constants[tree])
+        return tree.accept(self)
+
+    # ---------- Programa ----------
+
+    def visitProgram(self, ctx: DLangParser.ProgramContext):
+        body = self._block(ctx.statement())
+
+        def run_program():
+            body(None)
+            return None
+        return run_program
+
+    # ---------- Sentencias ----------
+
+    def visitSimpleStatement(self, ctx: DLangParser.SimpleStatementContext):
+        child = ctx.getChild(0)
+        fn = self.visit(child)
+        if isinstance(child, DLangParser.FuncCallExprContext):
+            # llamada como sentencia: se descarta el valor devuelto
+            def call_stmt(frame):
+                fn(frame)
+            return call_stmt
+        return fn
+
+    def visitAssignStmt(self, ctx: DLangParser.AssignStmtContext):
+        name = ctx.ID().getText()
+        value = self.visit(ctx.expr())
+        env = self.env
+
+        slot = self.scope.slot(name) if self.scope is not None else None
+        if slot is None:
+            def assign_global(frame):
+                env[name] = value(frame)
+            return assign_global
+
+        def assign_local(frame):
+            v = value(frame)
+            # un nombre que aun no es local pero ya existe como global
+            # actualiza la global
+            if frame[slot] is UNSET and name in env:
+                env[name] = v
+            else:
+                frame[slot] = v
+        return assign_local
+
+    def visitPrintStmt(self, ctx: DLangParser.PrintStmtContext):
+        value = self.visit(ctx.expr())
+
+        def print_stmt(frame):
+            print(value(frame))
+        return print_stmt
+
+    def visitReturnStmt(self, ctx: DLangParser.ReturnStmtContext):
+        if ctx.expr() is None:
+            def return_none(frame):
+                return _Return(None)
+            return return_none
+
+        value = self.visit(ctx.expr())
+
+        def return_stmt(frame):
+            return _Return(value(frame))
+        return return_stmt
+
+    # ---------- Control de flujo ----------
+
+    def visitIfStmt(self, ctx: DLangParser.IfStmtContext):
+        if ctx in self.branches:
+            chosen = self.branches[ctx]
+            if chosen is None:
+                return self._block(())
+            return self.visit(ctx.block(chosen))
+
+        cond = self.visit(ctx.expr())
+        then = self.visit(ctx.block(0))
+        if ctx.block(1) is None:
+            def if_stmt(frame):
+                if cond(frame):
+                    return then(frame)
+                return None
+            return if_stmt
+
+        other = self.visit(ctx.block(1))
+
+        def if_else_stmt(frame):
+            if cond(frame):
+                return then(frame)
+            return other(frame)
+        return if_else_stmt
+
+    def visitWhileStmt(self, ctx: DLangParser.WhileStmtContext):
+        if ctx in self.dead_loops:
+            return self._block(())
+
+        cond = self.visit(ctx.expr())
+        body = self.visit(ctx.block())
+
+        def while_stmt(frame):
+            while cond(frame):
+                r = body(frame)
+                if r is not None:
+                    return r
+            return None
+        return while_stmt
+
+    def visitBlockStmt(self, ctx: DLangParser.BlockStmtContext):
+        return self._block(ctx.statement())
+
+    # Secuencia de sentencias; se corta en el primer 'return'
+    def _block(self, statements):
+        stmts = tuple(self.visit(st) for st in statements)
+        if len(stmts) == 0:
+            def empty(frame):
+                return None
+            return empty
+        if len(stmts) == 1:
+            return stmts[0]
+
+        def block(frame):
+            for st in stmts:
+                r = st(frame)
+                if r is not None:
+                    return r
+            return None
+        return block
+
+    # ---------- Funciones ----------
+
+    def visitFuncDefStmt(self, ctx: DLangParser.FuncDefStmtContext):
+        name = ctx.ID().getText()
+        params = [p.getText() for p in ctx.paramList().ID()] if ctx.paramList() else []
+
+        outer_scope = self.scope
+        self.scope = Scope(params, ctx.block())
+        try:
+            body = self.visit(ctx.block())
+            func = _Function(name, self.scope.param_slots, len(self.scope), body)
+        finally:
+            self.scope = outer_scope
+        funcs = self.funcs
+
+        def func_def(frame):
+            funcs[name] = func
+        return func_def
+
+    def visitFuncCallExpr(self, ctx: DLangParser.FuncCallExprContext):
+        name = ctx.ID().getText()
+        args = tuple(self.visit(e) for e in ctx.argList().expr()) if ctx.argList() else ()
+
+        # 1) Funciones internas: se resuelven una sola vez, al compilar
+        builtin = Builtins.lookup(name)
+        if builtin is not None:
+            if not builtin.accepts(len(args)):
+                # el error se da al ejecutar la llamada, como en EvalVisitor
+                def bad_call(frame):
+                    for a in args:
+                        a(frame)
+                    raise builtin.arity_error(len(args))
+                return bad_call
+            return self._builtin_call(builtin.func, args)
+
+        # 2) Funciones del DSL: se buscan al llamar (pueden definirse despues).
+        #    Cada llamada crea su propio arreglo de locales; las globales no se copian.
+        funcs = self.funcs
+
+        def user_call(frame):
+            values = [a(frame) for a in args]
+            if name not in funcs:
+                raise Exception(f"Funcion no definida: {name}")
+            func = funcs[name]
+            new_frame = [UNSET] * func.nslots
+            for slot, v in zip(func.param_slots, values):
+                new_frame[slot] = v
+            r = func.body(new_frame)
+            return r.value if r is not None else None
+        return user_call
+
+    def _builtin_call(self, func, args):
+        if len(args) == 0:
+            def call0(frame):
+                return func()
+            return call0
+        if len(args) == 1:
+            a0 = args[0]
+
+            def call1(frame):
+                return func(a0(frame))
+            return call1
+        if len(args) == 2:
+            a0, a1 = args
+
+            def call2(frame):
+                return func(a0(frame), a1(frame))
+            return call2
+
+        def calln(frame):
+            return func(*[a(frame) for a in args])
+        return calln
+
+    def visitFuncCallPrimary(self, ctx: DLangParser.FuncCallPrimaryContext):
+        return self.visit(ctx.funcCall())
+
+    # ---------- Literales y variables ----------
+
+    def _const(self, value):
+        def const(frame):
+            return value
+        return const
+
+    def visitNumberLiteralExpr(self, ctx: DLangParser.NumberLiteralExprContext):
+        text = ctx.NUMBER().getText()
+        return self._const(float(text) if '.' in text else int(text))
+
+    def visitStringLiteralExpr(self, ctx: DLangParser.StringLiteralExprContext):
+        return self._const(ctx.STRING().getText()[1:-1])
+
+    def visitTrueLiteralExpr(self, ctx: DLangParser.TrueLiteralExprContext):
+        return self._const(True)
+
+    def visitFalseLiteralExpr(self, ctx: DLangParser.FalseLiteralExprContext):
+        return self._const(False)
+
+    def visitIdentifierExpr(self, ctx: DLangParser.IdentifierExprContext):
+        name = ctx.ID().getText()
+        env = self.env
+
+        slot = self.scope.slot(name) if self.scope is not None else None
+        if slot is None:
+            def load_global(frame):
+                try:
+                    return env[name]
+                except KeyError:
+                    raise Exception(f"Variable no definida: {name}") from None
+            return load_global
+
+        def load_local(frame):
+            v = frame[slot]
+            if v is not UNSET:
+                return v
+            try:
+                return env[name]
+            except KeyError:
+                raise Exception(f"Variable no definida: {name}") from None
+        return load_local
+
+    def visitParenExpr(self, ctx: DLangParser.ParenExprContext):
+        return self.visit(ctx.expr())
+
+    # ---------- Listas / matrices ----------
+
+    def visitListLiteralNode(self, ctx: DLangParser.ListLiteralNodeContext):
+        items = tuple(self.visit(e) for e in ctx.expr())
+
+        def make_list(frame):
+            return [item(frame) for item in items]
+        return make_list
+
+    def visitListLiteralExpr(self, ctx: DLangParser.ListLiteralExprContext):
+        return self.visit(ctx.listLiteral())
+
+    # ---------- Logicos ----------
+    # La verdad de los valores de DLang (Operators.is_true) coincide con la de
+    # Python, por eso las closures usan directamente 'if' / 'not'.
+
+    def visitOrOp(self, ctx: DLangParser.OrOpContext):
+        left = self.visit(ctx.expr())
+        right = self.visit(ctx.andExpr())
+
+        def or_op(frame):
+            return True if left(frame) else bool(right(frame))
+        return or_op
+
+    def visitAndOp(self, ctx: DLangParser.AndOpContext):
+        left = self.visit(ctx.andExpr())
+        right = self.visit(ctx.relExpr())
+
+        def and_op(frame):
+            return bool(right(frame)) if left(frame) else False
+        return and_op
+
+    def visitRelOpExpr(self, ctx: DLangParser.RelOpExprContext):
+        left = self.visit(ctx.addExpr(0))
+        if ctx.relOp() is None:
+            return left
+        right = self.visit(ctx.addExpr(1))
+        return self._binary(REL_OPS[ctx.relOp().getText()], left, right)
+
+    # ---------- Aritmetica ----------
+
+    def visitAddSubExpr(self, ctx: DLangParser.AddSubExprContext):
+        # a + b - c ... completo (sin entrar en subexpresiones ya plegadas)
+        terms = []
+        node = ctx
+        while isinstance(node, DLangParser.AddSubExprContext) and node not in self.constants:
+            terms.append((node.getChild(1).getText(), self.visit(node.mulExpr())))
+            node = node.addExpr()
+        terms.reverse()
+        left = self.visit(node)
+
+        if len(terms) == 1:
+            op, right = terms[0]
+            return self._binary(ARITH_OPS[op], left, right)
+
+        # con numeros se opera de a pares; si el primer termino es una matriz,
+        # la cadena se fusiona en una sola pasada (Operators.add_sub_chain)
+        steps = tuple((ARITH_OPS[op], right) for op, right in terms)
+
+        def add_chain(frame):
+            acc = left(frame)
+            if is_dense(acc):
+                return add_sub_chain(acc, ((op, right(frame)) for op, right in terms))
+            for fn, right in steps:
+                acc = fn(acc, right(frame))
+            return acc
+        return add_chain
+
+    def visitMulDivExpr(self, ctx: DLangParser.MulDivExprContext):
+        left = self.visit(ctx.mulExpr())
+        right = self.visit(ctx.powExpr())
+        return self._binary(ARITH_OPS[ctx.getChild(1).getText()], left, right)
+
+    def _binary(self, op, left, right):
+        def binary(frame):
+            return op(left(frame), right(frame))
+        return binary
+
+    def visitPowerOp(self, ctx: DLangParser.PowerOpContext):
+        result = self.visit(ctx.unaryExpr(0))
+        # a ^ b ^ c se evalua de izquierda a derecha, igual que EvalVisitor
+        for i in range(1, len(ctx.unaryExpr())):
+            result = self._binary(op_pow, result, self.visit(ctx.unaryExpr(i)))
+        return result
+
+    # ---------- Unarios ----------
+
+    def visitUnaryMinusExpr(self, ctx: DLangParser.UnaryMinusExprContext):
+        operand = self.visit(ctx.unaryExpr())
+
+        def neg(frame):
+            return -operand(frame)
+        return neg
+
+    def visitUnaryPlusExpr(self, ctx: DLangParser.UnaryPlusExprContext):
+        operand = self.visit(ctx.unaryExpr())
+
+        def pos(frame):
+            return +operand(frame)
+        return pos
+
+    def visitUnaryNotExpr(self, ctx: DLangParser.UnaryNotExprContext):
+        operand = self.visit(ctx.unaryExpr())
+
+        def not_op(frame):
+            return op_not(operand(frame))
+        return not_op
+
+    def visitPrimaryExpr(self, ctx: DLangParser.PrimaryExprContext):
+        return self.visit(ctx.primary())
+
+
+# Compila el arbol de un programa y devuelve la closure que lo ejecuta.
+# optimizer: resultado de Optimizer.optimize(tree), o None para no optimizar
+def compile_program(tree, visitor, optimizer=None):
+    return Compiler(visitor, optimizer).compile(tree)
@@ -1,13 +1,12 @@
 from DLangVisitor import DLangVisitor
 from DLangParser import DLangParser
 
-import MyMath
-import MyPlot
-import Matrix
-import MyFile
-import MyRegression
-import MyMLP
-import MyClusterNN
+import Builtins
+from Operators import is_true, op_pow, add_sub_chain, ARITH_OPS, REL_OPS
+
+
+# Marca de un nodo de llamada ya resuelto que no es una funcion interna
+_NOT_BUILTIN = object()
 
 
 class ReturnException(Exception):
@@ -17,19 +16,14 @@ class ReturnException(Exception):
 
 class EvalVisitor(DLangVisitor):
     def __init__(self):
-        self.env = {}
+        self.env = {}        # variables globales
         self.funcs = {}
+        self.frame = None    # locales de la llamada en curso (None = nivel superior)
 
     # ---------- Utilidades ----------
 
     def _is_true(self, v):
-        if isinstance(v, (int, float)):
-            return v != 0
-        if isinstance(v, str):
-            return v != ""
-        if v is None:
-            return False
-        return bool(v)
+        return is_true(v)
 
     # ---------- Programa ----------
 
@@ -43,7 +37,12 @@ class EvalVisitor(DLangVisitor):
     def visitAssignStmt(self, ctx: DLangParser.AssignStmtContext):
         name = ctx.ID().getText()
         value = self.visit(ctx.expr())
-        self.env[name] = value
+        # reglas de ambito en Scope.py: se escribe donde el nombre ya existe
+        frame = self.frame
+        if frame is None or (name not in frame and name in self.env):
+            self.env[name] = value
+        else:
+            frame[name] = value
         return value
 
     def visitPrintStmt(self, ctx: DLangParser.PrintStmtContext):
@@ -88,26 +87,31 @@ class EvalVisitor(DLangVisitor):
         name = ctx.ID().getText()
         args = [self.visit(e) for e in ctx.argList().expr()] if ctx.argList() else []
 
-        # 1) Módulos internos
-        for module in (MyMath, Matrix, MyPlot, MyFile, MyRegression, MyMLP, MyClusterNN):
-            if hasattr(module, name):
-                func = getattr(module, name)
-                return func(*args)
-
-        # 2) Funciones del DSL
+        # 1) Funciones internas. Cada nodo de llamada se resuelve una sola vez
+        #    contra el registro y guarda el resultado (cache en linea)
+        try:
+            func = ctx.dl_builtin
+        except AttributeError:
+            func = Builtins.resolve(name, len(args))
+            ctx.dl_builtin = func if func is not None else _NOT_BUILTIN
+            func = ctx.dl_builtin
+        if func is not _NOT_BUILTIN:
+            return func(*args)
+
+        # 2) Funciones del DSL: cada llamada tiene su propio marco de locales,
+        #    sin copiar las globales
         if name in self.funcs:
             params, block = self.funcs[name]
-            old_env = self.env.copy()
+            saved_frame = self.frame
+            self.frame = dict(zip(params, args))
             try:
-                for p, a in zip(params, args):
-                    self.env[p] = a
                 try:
                     self.visit(block)
                 except ReturnException as r:
                     return r.value
                 return None
             finally:
-                self.env = old_env
+                self.frame = saved_frame
 
         raise Exception(f"Funcion no definida: {name}")
 
@@ -132,6 +136,9 @@ class EvalVisitor(DLangVisitor):
 
     def visitIdentifierExpr(self, ctx: DLangParser.IdentifierExprContext):
         name = ctx.ID().getText()
+        frame = self.frame
+        if frame is not None and name in frame:
+            return frame[name]
         if name not in self.env:
             raise Exception(f"Variable no definida: {name}")
         return self.env[name]
@@ -169,51 +176,36 @@ class EvalVisitor(DLangVisitor):
             return left
         right = self.visit(ctx.addExpr(1))
         op = ctx.relOp().getText()
-        if op == '==':
-            return left == right
-        if op == '!=':
-            return left != right
-        if op == '<':
-            return left < right
-        if op == '<=':
-            return left <= right
-        if op == '>':
-            return left > right
-        if op == '>=':
-            return left >= right
+        return REL_OPS[op](left, right)
 
     # ---------- Aritmética ----------
 
     def visitAddSubExpr(self, ctx: DLangParser.AddSubExprContext):
-        left = self.visit(ctx.addExpr())
-        right = self.visit(ctx.mulExpr())
-        op = ctx.getChild(1).getText()
-
-        if isinstance(left, list) and isinstance(right, list):
-            return Matrix.mat_add(left, right) if op == '+' else Matrix.mat_sub(left, right)
-
-        return left + right if op == '+' else left - right
+        # a + b - c ... completo: con matrices se fusiona en una sola pasada
+        terms = []
+        node = ctx
+        while isinstance(node, DLangParser.AddSubExprContext):
+            terms.append((node.getChild(1).getText(), node.mulExpr()))
+            node = node.addExpr()
+        terms.reverse()
+
+        left = self.visit(node)
+        if len(terms) == 1:
+            op, right = terms[0]
+            return ARITH_OPS[op](left, self.visit(right))
+        return add_sub_chain(left, ((op, self.visit(e)) for op, e in terms))
 
     def visitMulDivExpr(self, ctx: DLangParser.MulDivExprContext):
         left = self.visit(ctx.mulExpr())
         right = self.visit(ctx.powExpr())
         op = ctx.getChild(1).getText()
-
-        if isinstance(left, list) and isinstance(right, list) and op == '*':
-            return Matrix.mat_mul(left, right)
-
-        if op == '*':
-            return left * right
-        elif op == '/':
-            return left / right
-        else:
-            return left % right
+        return ARITH_OPS[op](left, right)
 
     def visitPowerOp(self, ctx: DLangParser.PowerOpContext):
         result = self.visit(ctx.unaryExpr(0))
         for i in range(1, len(ctx.unaryExpr())):
             expo = self.visit(ctx.unaryExpr(i))
-            result = MyMath.potencia(result, expo)
+            result = op_pow(result, expo)
         return result
 
     # ---------- Unarios ----------
@@ -0,0 +1,173 @@
+# Frontend.py
+# Analisis lexico y sintactico de programas DLang con ANTLR.
+#
+# El lexer, el flujo de tokens y el parser se crean una sola vez y se
+# reutilizan para cada programa (solo se cambia su entrada).
+#
+# El analisis se hace en dos etapas:
+#  1) Prediccion SLL con BailErrorStrategy: mas rapida, y suficiente para casi
+#     todos los programas. Al primer error se aborta sin intentar recuperarse.
+#  2) Solo si la etapa 1 falla, se vuelve a analizar con la prediccion LL
+#     completa y la estrategia de errores normal (que informa y se recupera).
+# Los tokens de la etapa 1 se reutilizan en la 2: el codigo se tokeniza una vez.
+#
+# encode_tree / decode_tree pasan un arbol a tuplas y listas simples (que
+# ProgramCache guarda en disco) y lo reconstruyen con las mismas clases del
+# parser, sin volver a analizar el codigo.
+
+import time
+
+from antlr4 import InputStream, CommonTokenStream
+from antlr4.Token import CommonToken, Token
+from antlr4.tree.Tree import ErrorNode, TerminalNodeImpl
+from antlr4.atn.PredictionMode import PredictionMode
+from antlr4.error.ErrorListener import ConsoleErrorListener
+from antlr4.error.ErrorStrategy import BailErrorStrategy, DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
+
+from DLangLexer import DLangLexer
+from DLangParser import DLangParser
+
+
+class Frontend:
+
+    def __init__(self):
+        self.lexer = DLangLexer(None)
+        self.tokens = CommonTokenStream(self.lexer)
+        self.parser = DLangParser(self.tokens)
+
+        # Tiempos del ultimo analisis (segundos) y modo con el que termino
+        self.last_timing = None
+        # Estadisticas acumuladas
+        self.sll_parses = 0
+        self.ll_parses = 0
+
+    def parse(self, code):
+        t0 = time.perf_counter()
+
+        # Nueva entrada para el lexer; setTokenSource vacia el buffer de tokens
+        self.lexer.inputStream = InputStream(code)
+        self.tokens.setTokenSource(self.lexer)
+        self.tokens.fill()
+        t1 = time.perf_counter()
+
+        parser = self.parser
+
+        # Etapa 1: SLL, abortando al primer error y sin mensajes
+        parser.setTokenStream(self.tokens)
+        parser._interp.predictionMode = PredictionMode.SLL
+        parser._errHandler = BailErrorStrategy()
+        parser.removeErrorListeners()
+        try:
+            tree = parser.program()
+            mode = "SLL"
+            self.sll_parses += 1
+        except ParseCancellationException:
+            # Etapa 2: LL completo sobre los mismos tokens. setTokenStream no
+            # rebobina el flujo (borra _input antes de reset()), asi que se
+            # vuelve al primer token a mano
+            parser.setTokenStream(self.tokens)
+            self.tokens.seek(0)
+            parser._interp.predictionMode = PredictionMode.LL
+            parser._errHandler = DefaultErrorStrategy()
+            parser.addErrorListener(ConsoleErrorListener.INSTANCE)
+            tree = parser.program()
+            mode = "LL"
+            self.ll_parses += 1
+        t2 = time.perf_counter()
+
+        self.last_timing = {
+            "lex": t1 - t0,
+            "parse": t2 - t1,
+            "mode": mode,
+        }
+        return tree
+
+
+# ----------------- Arbol serializable -----------------
+# El arbol se guarda como (clases, raiz): clases es la lista de nombres de
+# clases de contexto usadas, cada regla es (indice en clases, hijos) y cada
+# token (tipo, texto, linea, columna, indice del token).
+
+# Cambia cuando cambia el formato: invalida los arboles guardados en disco
+TREE_FORMAT_VERSION = 1
+
+
+# Devuelve None si el arbol tiene errores de sintaxis: esos no se guardan,
+# para que los mensajes se vuelvan a mostrar en cada ejecucion
+def encode_tree(tree):
+    classes = {}
+
+    def encode(node):
+        if isinstance(node, ErrorNode):
+            return None
+        if isinstance(node, TerminalNodeImpl):
+            t = node.symbol
+            return (t.type, t.text, t.line, t.column, t.tokenIndex)
+        if node.exception is not None:
+            return None
+        children = []
+        for child in node.getChildren():
+            data = encode(child)
+            if data is None:
+                return None
+            children.append(data)
+        name = type(node).__name__
+        return (classes.setdefault(name, len(classes)), children)
+
+    root = encode(tree)
+    if root is None:
+        return None
+    return list(classes), root
+
+
+# Reconstruye el arbol. Los atributos se asignan directamente (los mismos
+# que dejan los constructores de ANTLR), que es varias veces mas rapido
+def decode_tree(data):
+    classes = [getattr(DLangParser, name) for name in data[0]]
+
+    def decode(node, parent):
+        cls = classes[node[0]]
+        ctx = cls.__new__(cls)
+        ctx.parentCtx = parent
+        ctx.invokingState = -1
+        ctx.parser = None
+        ctx.exception = None
+        ctx.start = ctx.stop = None
+        children = ctx.children = []
+        for child in node[1]:
+            if len(child) == 2:
+                sub = decode(child, ctx)
+                if ctx.start is None:
+                    ctx.start = sub.start
+                ctx.stop = sub.stop
+            else:
+                token = CommonToken.__new__(CommonToken)
+                token.type, token._text, token.line, token.column, token.tokenIndex = child
+                token.source, token.channel, token.start, token.stop = _NO_SOURCE, 0, -1, -1
+                sub = TerminalNodeImpl(token)
+                sub.parentCtx = ctx
+                if ctx.start is None:
+                    ctx.start = token
+                if token.type != Token.EOF:
+                    # como ANTLR: stop es el ultimo token antes de EOF
+                    ctx.stop = token
+            children.append(sub)
+        if not children:
+            ctx.children = None
+        return ctx
+
+    return decode(data[1], None)
+
+
+_NO_SOURCE = CommonToken.EMPTY_SOURCE
+
+
+# Texto con los tiempos de un analisis, para mostrar al usuario
+def format_timing(timing):
+    if timing is None:
+        return "analisis: (desde cache)"
+    return (
+        f"lexico: {timing['lex'] * 1000:.2f} ms, "
+        f"sintactico: {timing['parse'] * 1000:.2f} ms ({timing['mode']})"
+    )
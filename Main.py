@@ -1,28 +1,124 @@
 import sys
-from antlr4 import *
-from DLangLexer import DLangLexer
-from DLangParser import DLangParser
+import time
+import argparse
+from Frontend import Frontend, format_timing, encode_tree, decode_tree, TREE_FORMAT_VERSION
 from EvalVisitor import EvalVisitor
+from Compiler import compile_program
+from VMCompiler import compile_bytecode
+from VM import VM, disassemble
+from Optimizer import optimize, dump_program
+import Backend
+from ProgramCache import ProgramCache, cache_dir_for
 
 
-def run_code(code, visitor):
-    input_stream = InputStream(code)
-    lexer = DLangLexer(input_stream)
-    stream = CommonTokenStream(lexer)
-    parser = DLangParser(stream)
-    tree = parser.program()
-    visitor.visit(tree)
+ENGINES = ("compile", "vm", "tree")
+
+# Programas ya analizados / compilados en este proceso
+program_cache = ProgramCache()
+
+# Lexer y parser reutilizados para todos los programas
+frontend = Frontend()
+
+
+def parse_code(code):
+    return frontend.parse(code)
+
+
+def build_bytecode(code, use_opt=True):
+    tree = parse_code(code)
+    return compile_bytecode(tree, optimize(tree) if use_opt else None)
+
+
+# engine: "compile" (por defecto) compila el arbol a closures antes de ejecutar,
+#         "vm" lo compila a bytecode y lo ejecuta en la maquina virtual,
+#         "tree" lo recorre directamente con el EvalVisitor
+# filename: script de origen; el bytecode (motor "vm") o el arbol de analisis
+#           (motores "compile" y "tree") se guarda en __dlcache__ junto a el y
+#           las siguientes ejecuciones no analizan el codigo
+# use_cache: False para analizar siempre desde cero
+# use_opt: False para compilar sin plegado de constantes ni eliminacion de
+#          ramas muertas (el motor "tree" nunca optimiza)
+def run_code(code, visitor, engine="compile", filename=None, use_cache=True, use_opt=True):
+    cache_dir = cache_dir_for(filename) if filename else None
+    if engine == "vm":
+        if use_cache:
+            co = program_cache.get_bytecode(code, lambda c: build_bytecode(c, use_opt), cache_dir,
+                                            variant="opt" if use_opt else "")
+        else:
+            co = build_bytecode(code, use_opt)
+        VM(visitor).run(co)
+        return
+
+    if use_cache:
+        tree = program_cache.get_tree(code, parse_code, cache_dir, encode_tree, decode_tree,
+                                      variant=f"arbol-{TREE_FORMAT_VERSION}")
+    else:
+        tree = parse_code(code)
+    if engine == "tree":
+        visitor.visit(tree)
+    else:
+        program = compile_program(tree, visitor, optimize(tree) if use_opt else None)
+        program()
+
+
+# Imprime el bytecode del programa (y de sus funciones) sin ejecutarlo
+def dis_code(code, use_opt=True):
+    print(disassemble(build_bytecode(code, use_opt)))
+
+
+# Imprime el programa tal como queda despues de optimizarlo, sin ejecutarlo
+def dump_opt_code(code):
+    tree = parse_code(code)
+    print(dump_program(tree, optimize(tree)))
 
 
 def main():
+    arg_parser = argparse.ArgumentParser(description="Interprete de DLang")
+    arg_parser.add_argument("file", nargs="?", help="programa .dl a ejecutar (sin archivo abre el REPL)")
+    arg_parser.add_argument("--engine", choices=ENGINES, default="compile",
+                            help="motor de ejecucion (por defecto: compile)")
+    arg_parser.add_argument("--backend", choices=Backend.BACKENDS, default=None,
+                            help="motor numerico de las bibliotecas (por defecto: DLANG_BACKEND o python)")
+    arg_parser.add_argument("--dis", action="store_true",
+                            help="muestra el bytecode del programa en lugar de ejecutarlo")
+    arg_parser.add_argument("--dump-opt", action="store_true",
+                            help="muestra el programa optimizado en lugar de ejecutarlo")
+    arg_parser.add_argument("--no-opt", action="store_true",
+                            help="compila sin plegado de constantes ni eliminacion de ramas muertas")
+    arg_parser.add_argument("--no-cache", action="store_true",
+                            help="no usa ni guarda programas ya analizados")
+    arg_parser.add_argument("--time", action="store_true",
+                            help="muestra en stderr los tiempos de analisis y ejecucion")
+    args = arg_parser.parse_args()
+
+    if args.backend is not None:
+        try:
+            Backend.set_backend(args.backend)
+        except Exception as e:
+            arg_parser.error(str(e))
+
     visitor = EvalVisitor()
 
-    if len(sys.argv) > 1:
+    def run(code, filename=None):
+        frontend.last_timing = None
+        t0 = time.perf_counter()
+        run_code(code, visitor, args.engine, filename=filename,
+                 use_cache=not args.no_cache, use_opt=not args.no_opt)
+        total = time.perf_counter() - t0
+        if args.time:
+            print(f"[{format_timing(frontend.last_timing)}, total: {total * 1000:.2f} ms]",
+                  file=sys.stderr)
+
+    if args.file:
         # Ejecutar archivo .dl
-        filename = sys.argv[1]
-        with open(filename, "r", encoding="utf-8") as f:
+        with open(args.file, "r", encoding="utf-8") as f:
             code = f.read()
-        run_code(code, visitor)
+        if args.dis:
+            dis_code(code, not args.no_opt)
+        elif args.dump_opt:
+            dump_opt_code(code)
+        else:
+            run(code, filename=args.file)
     else:
         # REPL simple
         print("DLang (lenguaje para operaciones matematicas, matrices y graficas).")
@@ -38,7 +134,12 @@ def main():
             if not line.strip():
                 continue
 
-            run_code(line, visitor)
+            if args.dis:
+                dis_code(line, not args.no_opt)
+            elif args.dump_opt:
+                dump_opt_code(line)
+            else:
+                run(line)
 
 
 if __name__ == "__main__":
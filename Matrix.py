@@ -1,87 +1,441 @@
 # matrix.py
-# Operaciones con matrices usando listas de listas.
+# Operaciones con matrices.
+#
+# Una Matrix guarda todos sus elementos en un solo array('d') (float64
+# contiguos) con su forma y sus pasos (strides): el elemento (i, j) esta en
+# data[offset + i * rstride + j * cstride]. Asi:
+#  - ocupa 8 bytes por elemento, en lugar de un float de Python por casilla
+#    mas las listas de cada fila;
+#  - la traspuesta, una fila o una columna son vistas sobre el mismo buffer,
+#    sin copiar nada;
+#  - las operaciones recorren un buffer plano en lugar de listas anidadas.
+#
+# Todas las funciones aceptan tambien listas de listas (los literales de
+# DLang), que se convierten al entrar.
+
+from array import array
+from itertools import repeat
+import math
+import operator
+
+import Backend
+import ParallelMatrix
+
+
+# Funciones que DLang expone como internas (Builtins.py registra solo estas)
+DL_BUILTINS = [
+    'zeros', 'shape', 'mat_add', 'mat_sub', 'mat_mul', 'mat_transpose',
+    'mat_identity', 'mat_inverse', 'mat_pow', 'mat_add_inplace',
+    'mat_scale_inplace', 'axpy', 'set_workers', 'lu_factor', 'lu_solve',
+    'mat_solve', 'mat_det', 'sparse_from_triplets', 'sparse_from_dense',
+    'sparse_to_dense', 'sparse_nnz',
+]
+
+
+class Matrix:
+    __slots__ = ('data', 'offset', 'rows', 'cols', 'rstride', 'cstride', 'shared')
+
+    def __init__(self, rows, cols, data=None, offset=0, rstride=None, cstride=1):
+        if data is None:
+            data = array('d', bytes(8 * rows * cols))
+        self.data = data
+        self.offset = offset
+        self.rows = rows
+        self.cols = cols
+        self.rstride = cols if rstride is None else rstride
+        self.cstride = cstride
+        # True si otra matriz del programa puede ver el mismo buffer (ver
+        # mat_transpose): las operaciones en el lugar copian antes de escribir
+        self.shared = False
+
+    # Matriz a partir de una lista de filas
+    @classmethod
+    def from_rows(cls, rows):
+        r = len(rows)
+        c = len(rows[0]) if r > 0 else 0
+        data = array('d')
+        for row in rows:
+            if not isinstance(row, (list, tuple)) or len(row) != c:
+                raise ValueError("todas las filas de la matriz deben ser listas del mismo largo")
+            data.extend(row)
+        return cls(r, c, data)
+
+    @property
+    def shape(self):
+        return self.rows, self.cols
+
+    def is_contiguous(self):
+        return self.cstride == 1 and self.rstride == self.cols
+
+    # Elementos por filas en un array contiguo. Si la matriz ya lo es (y ocupa
+    # todo su buffer) se devuelve el propio buffer, sin copiar
+    def flat(self):
+        n = self.rows * self.cols
+        if self.is_contiguous():
+            if self.offset == 0 and len(self.data) == n:
+                return self.data
+            return self.data[self.offset:self.offset + n]
+        # vista (traspuesta, columna...): se copia fila a fila con slices
+        out = array('d')
+        span = self.cols * self.cstride
+        for i in range(self.rows):
+            start = self.offset + i * self.rstride
+            out.extend(self.data[start:start + span:self.cstride])
+        return out
+
+    def copy(self):
+        return Matrix(self.rows, self.cols, array('d', self.flat()))
+
+    # ---------- Vistas (comparten el buffer) ----------
+
+    @property
+    def T(self):
+        return Matrix(self.cols, self.rows, self.data, self.offset, self.cstride, self.rstride)
+
+    def row(self, i):
+        i = self._index(i, self.rows)
+        return Matrix(1, self.cols, self.data, self.offset + i * self.rstride, self.rstride, self.cstride)
+
+    def col(self, j):
+        j = self._index(j, self.cols)
+        return Matrix(self.rows, 1, self.data, self.offset + j * self.cstride, self.rstride, self.cstride)
+
+    # ---------- Acceso ----------
+
+    @staticmethod
+    def _index(i, n):
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("indice fuera de la matriz")
+        return i
+
+    def _row_list(self, i):
+        start = self.offset + i * self.rstride
+        if self.cstride == 1:
+            return self.data[start:start + self.cols].tolist()
+        data, cs = self.data, self.cstride
+        return [data[start + j * cs] for j in range(self.cols)]
+
+    # M[i] -> fila i como lista (copia); M[i, j] -> elemento
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            i, j = key
+            i = self._index(i, self.rows)
+            j = self._index(j, self.cols)
+            return self.data[self.offset + i * self.rstride + j * self.cstride]
+        return self._row_list(self._index(key, self.rows))
+
+    def __setitem__(self, key, value):
+        if not isinstance(key, tuple):
+            raise TypeError("para asignar un elemento use M[i, j] = valor")
+        i, j = key
+        i = self._index(i, self.rows)
+        j = self._index(j, self.cols)
+        self.data[self.offset + i * self.rstride + j * self.cstride] = value
+
+    def __len__(self):
+        return self.rows
+
+    def __iter__(self):
+        for i in range(self.rows):
+            yield self._row_list(i)
+
+    def tolist(self):
+        return [self._row_list(i) for i in range(self.rows)]
+
+    def __eq__(self, other):
+        if isinstance(other, list):
+            return self.tolist() == other
+        if not isinstance(other, Matrix):
+            return NotImplemented
+        return self.shape == other.shape and self.flat() == other.flat()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+
+# Convierte una lista de listas (o una Matrix, o una dispersa) en Matrix
+def as_matrix(A):
+    if isinstance(A, Matrix):
+        return A
+    if isinstance(A, SparseMatrix):
+        return A.to_dense()
+    if isinstance(A, (list, tuple)):
+        return Matrix.from_rows(A)
+    raise ValueError("se esperaba una matriz")
+
 
 def shape(A):
+    if isinstance(A, (Matrix, SparseMatrix)):
+        return A.shape
     rows = len(A)
     cols = len(A[0]) if rows > 0 else 0
     return rows, cols
 
 
 def zeros(rows, cols, value=0.0):
-    return [[value for _ in range(cols)] for _ in range(rows)]
+    M = Matrix(rows, cols)
+    if value != 0.0:
+        M.data = array('d', [value]) * (rows * cols)
+    return M
+
+
+def _elementwise(A, B, op, what):
+    A = as_matrix(A)
+    B = as_matrix(B)
+    if A.shape != B.shape:
+        raise ValueError(f"dimensiones incompatibles para {what}")
+    n = A.rows * A.cols
+    if ParallelMatrix.enabled_for_elementwise(n):
+        return Matrix(A.rows, A.cols, ParallelMatrix.elementwise(op, A.flat(), B.flat()))
+    return Matrix(A.rows, A.cols, array('d', map(_ELEMENTWISE_OPS[op], A.flat(), B.flat())))
+
+
+_ELEMENTWISE_OPS = {"add": operator.add, "sub": operator.sub}
 
 
 def mat_add(A, B):
-    rA, cA = shape(A)
-    rB, cB = shape(B)
-    if rA != rB or cA != cB:
-        raise ValueError("dimensiones incompatibles para suma")
-    C = zeros(rA, cA)
-    for i in range(rA):
-        for j in range(cA):
-            C[i][j] = A[i][j] + B[i][j]
-    return C
+    if isinstance(A, SparseMatrix) or isinstance(B, SparseMatrix):
+        return _sparse_add(A, B, 1.0, "suma")
+    return _elementwise(A, B, "add", "suma")
 
 
 def mat_sub(A, B):
-    rA, cA = shape(A)
-    rB, cB = shape(B)
-    if rA != rB or cA != cB:
-        raise ValueError("dimensiones incompatibles para resta")
-    C = zeros(rA, cA)
+    if isinstance(A, SparseMatrix) or isinstance(B, SparseMatrix):
+        return _sparse_add(A, B, -1.0, "resta")
+    return _elementwise(A, B, "sub", "resta")
+
+
+# ---------- Cadenas de sumas y restas ----------
+# A + B - C + ... en una sola pasada: los map de cada paso se encadenan sin
+# materializar nada y solo se crea el buffer del resultado. El orden de las
+# operaciones por elemento es el mismo que sumando de a pares, asi que el
+# resultado es identico.
+
+# True si v se puede sumar elemento a elemento en una cadena fusionada
+def is_dense(v):
+    return isinstance(v, (Matrix, list))
+
+
+# matrices: [M0, M1, ...] densas; ops: ["add" | "sub", ...] entre cada par
+def mat_add_sub_chain(matrices, ops):
+    first = as_matrix(matrices[0])
+    it = first.flat()
+    for M, op in zip(matrices[1:], ops):
+        M = as_matrix(M)
+        if M.shape != first.shape:
+            raise ValueError(f"dimensiones incompatibles para {'suma' if op == 'add' else 'resta'}")
+        it = map(_ELEMENTWISE_OPS[op], it, M.flat())
+    return Matrix(first.rows, first.cols, array('d', it))
+
+
+# ---------- Operaciones en el lugar ----------
+# Modifican su primer argumento (Matrix o lista de listas) en lugar de crear
+# una matriz nueva, para actualizar pesos en bucles de entrenamiento. Devuelven
+# el mismo objeto.
+
+# Escribe los valores (por filas) en A. Si A comparte su buffer con otra
+# matriz, primero pasa a tener uno propio: escribir en una traspuesta no
+# cambia la original, ni al reves
+def _store(A, values):
+    if isinstance(A, Matrix):
+        if A.shared:
+            A.data = array('d', A.flat())
+            A.offset, A.rstride, A.cstride = 0, A.cols, 1
+            A.shared = False
+        if A.is_contiguous():
+            A.data[A.offset:A.offset + A.rows * A.cols] = array('d', values)
+            return A
+        it = iter(values)
+        span = A.cols * A.cstride
+        for i in range(A.rows):
+            start = A.offset + i * A.rstride
+            A.data[start:start + span:A.cstride] = array('d', [next(it) for _ in range(A.cols)])
+        return A
+    if isinstance(A, list):
+        it = iter(values)
+        for row in A:
+            row[:] = [next(it) for _ in range(len(row))]
+        return A
+    raise ValueError("se esperaba una matriz")
+
+
+def _check_same_shape(A, B, what):
+    if shape(A) != shape(B):
+        raise ValueError(f"dimensiones incompatibles para {what}")
+
+
+# A = A + B
+def mat_add_inplace(A, B):
+    _check_same_shape(A, B, "mat_add_inplace")
+    return _store(A, map(operator.add, as_matrix(A).flat(), as_matrix(B).flat()))
+
+
+# A = alpha * A
+def mat_scale_inplace(A, alpha):
+    return _store(A, map(operator.mul, as_matrix(A).flat(), repeat(float(alpha))))
+
+
+# Y = alpha * X + Y (modifica Y)
+def axpy(alpha, X, Y):
+    _check_same_shape(X, Y, "axpy")
+    scaled = map(operator.mul, as_matrix(X).flat(), repeat(float(alpha)))
+    return _store(Y, map(operator.add, scaled, as_matrix(Y).flat()))
+
+
+# ---------- Multiplicacion ----------
+# Tres algoritmos, todos sobre buffers planos; mat_mul elige segun el tamano.
+# El trabajo pesado lo hacen map/sum de Python (en C) sobre filas completas,
+# en lugar de una suma escalar por cada (i, j, k).
+
+# B (en bytes) a partir del cual se multiplica por bloques de columnas
+TILE_BYTES = 256 * 1024
+# columnas de B^T (filas de C) por bloque; 64 filas de 512 reales = 256 KB
+TILE_COLS = 64
+# con A de pocas columnas conviene acumular filas (i-k-j)
+IKJ_MAX_INNER = 4
+
+
+# Version original (i-j-k con acceso por columnas a B); se conserva como
+# referencia para los benchmarks
+def _matmul_naive(a, b, rA, cA, cB):
+    c = array('d', bytes(8 * rA * cB))
     for i in range(rA):
-        for j in range(cA):
-            C[i][j] = A[i][j] - B[i][j]
-    return C
+        base = i * cA
+        for j in range(cB):
+            s = 0.0
+            for k in range(cA):
+                s += a[base + k] * b[k * cB + j]
+            c[i * cB + j] = s
+    return c
+
+
+# Producto escalar de dos secuencias. math.sumprod (Python 3.12+) lo hace en C
+# en una sola llamada; si no existe, sum(map(mul, ...)) tambien corre en C
+_sumprod = getattr(math, 'sumprod', None)
+if _sumprod is None:
+    def _sumprod(x, y, _mul=operator.mul):
+        return sum(map(_mul, x, y))
+
+
+# Filas de un buffer plano como listas de floats (ya creados: recorrer un
+# array('d') crea un float nuevo por cada lectura)
+def _rows(flat, rows, cols):
+    return [flat[i * cols:(i + 1) * cols].tolist() for i in range(rows)]
+
+
+# i-k-j: la fila i de C acumula aik * (fila k de B). Las filas de B se leen
+# seguidas y los ceros de A se saltan
+def _matmul_ikj(a, b, rA, cA, cB):
+    c = array('d')
+    mul = operator.mul
+    add = operator.add
+    brows = _rows(b, cA, cB)
+    for arow in _rows(a, rA, cA):
+        acc = [0.0] * cB
+        for aik, brow in zip(arow, brows):
+            if aik != 0.0:
+                acc = list(map(add, acc, map(mul, brow, [aik] * cB)))
+        c.extend(acc)
+    return c
+
+
+# Producto escalar fila de A por fila de B^T: C[i][j] = sumprod(fila, columna)
+def _matmul_dot(a, bt, rA, cA, cB):
+    c = array('d')
+    bcols = _rows(bt, cB, cA)
+    for arow in _rows(a, rA, cA):
+        c.extend([_sumprod(arow, bcol) for bcol in bcols])
+    return c
+
+
+# Igual que _matmul_dot pero por bloques de TILE_COLS columnas de C: el bloque
+# de B^T se reutiliza para todas las filas de A mientras sigue en cache
+def _matmul_tiled(a, bt, rA, cA, cB):
+    c = array('d', bytes(8 * rA * cB))
+    arows = _rows(a, rA, cA)
+    bcols = _rows(bt, cB, cA)
+    for j0 in range(0, cB, TILE_COLS):
+        j1 = min(j0 + TILE_COLS, cB)
+        block = bcols[j0:j1]
+        for i, arow in enumerate(arows):
+            c[i * cB + j0:i * cB + j1] = array('d', [_sumprod(arow, bcol) for bcol in block])
+    return c
 
 
 def mat_mul(A, B):
     """
     Multiplicación de matrices (A: r x n, B: n x c).
     """
-    rA, cA = shape(A)
-    rB, cB = shape(B)
+    if isinstance(A, SparseMatrix) or isinstance(B, SparseMatrix):
+        return _sparse_mul(A, B)
+    A = as_matrix(A)
+    B = as_matrix(B)
+    rA, cA = A.shape
+    rB, cB = B.shape
     if cA != rB:
         raise ValueError("dimensiones incompatibles para multiplicación")
-    C = zeros(rA, cB)
-    for i in range(rA):
-        for j in range(cB):
-            s = 0.0
-            for k in range(cA):
-                s += A[i][k] * B[k][j]
-            C[i][j] = s
-    return C
+    fast = Backend.accelerated()
+    if fast is not None:
+        return fast.mat_mul(A, B)
+    a = A.flat()
+    if cA <= IKJ_MAX_INNER:
+        return Matrix(rA, cB, _matmul_ikj(a, B.flat(), rA, cA, cB))
+    kernel = _matmul_tiled if 8 * rB * cB > TILE_BYTES else _matmul_dot
+    if ParallelMatrix.enabled_for_mul(rA, cA, cB):
+        # cada proceso multiplica un bloque de filas de A con el mismo nucleo
+        c = ParallelMatrix.mat_mul(kernel.__name__, a, B.T.flat(), rA, cA, cB)
+    else:
+        c = kernel(a, B.T.flat(), rA, cA, cB)
+    return Matrix(rA, cB, c)
+
 
+# Numero de procesos para las operaciones con matrices grandes (ver
+# ParallelMatrix.py). 0 = tantos como nucleos, 1 = secuencial. Devuelve el
+# numero que queda configurado
+def set_workers(n):
+    return ParallelMatrix.set_workers(n)
 
+
+# Traspuesta: vista sobre el mismo buffer, sin copiar (con cualquier motor).
+# Las dos quedan marcadas como compartidas para las operaciones en el lugar
 def mat_transpose(A):
-    r, c = shape(A)
-    T = zeros(c, r)
-    for i in range(r):
-        for j in range(c):
-            T[j][i] = A[i][j]
+    if isinstance(A, SparseMatrix):
+        return _sparse_transpose(A)
+    A = as_matrix(A)
+    T = A.T
+    A.shared = T.shared = True
     return T
-    
+
+
 # Matriz identidad n x n
 def mat_identity(n):
     I = zeros(n, n)
-    for i in range(n):
-        I[i][i] = 1.0
+    I.data[::n + 1] = array('d', [1.0]) * n
     return I
 
 
 # Inversa de A usando eliminacion Gauss Jordan. A debe ser cuadrada
 def mat_inverse(A):
-    n, m = shape(A)
+    A = as_matrix(A)
+    n, m = A.shape
     if n != m:
         raise ValueError("La inversa solo esta definida para matrices cuadradas")
+    fast = Backend.accelerated()
+    if fast is not None:
+        return fast.mat_inverse(A)
+    if ParallelMatrix.enabled_for_inverse(n):
+        return ParallelMatrix.mat_inverse(A.tolist())
 
     # Copia de A (para no modificar el original)
     # y construcción de la matriz aumentada [A | I]
     # Trabajamos con floats
     aug = []
-    I = mat_identity(n)
     for i in range(n):
-        fila = [float(x) for x in A[i]] + I[i]
+        fila = A[i] + [1.0 if j == i else 0.0 for j in range(n)]
         aug.append(fila)
 
     # Gauss Jordan
@@ -117,10 +471,350 @@ def mat_inverse(A):
                     aug[r][j] -= factor * aug[col][j]
 
     # Extraer la parte derecha, que ahora es A^{-1}
-    inv = []
+    inv = Matrix(n, n)
     for i in range(n):
-        fila_inv = aug[i][n:]
-        inv.append(fila_inv)
+        inv.data[i * n:(i + 1) * n] = array('d', aug[i][n:])
 
     return inv
 
+
+# Potencia A^n (n entero) por cuadrados sucesivos: O(log n) productos con
+# mat_mul en lugar de n - 1. Con n < 0 se eleva la inversa. A debe ser cuadrada
+def mat_pow(A, n):
+    if int(n) != n:
+        raise ValueError("mat_pow espera un exponente entero")
+    n = int(n)
+    rows, cols = shape(A)
+    if rows != cols:
+        raise ValueError("La potencia solo esta definida para matrices cuadradas")
+    if n == 0:
+        return mat_identity(rows)
+    if n < 0:
+        A = mat_inverse(A)
+        n = -n
+    elif isinstance(A, Matrix):
+        A = A.copy()  # A^1 no debe compartir datos con A
+    elif not isinstance(A, SparseMatrix):
+        A = as_matrix(A)
+
+    result = None
+    while True:
+        if n & 1:
+            result = A if result is None else mat_mul(result, A)
+        n >>= 1
+        if not n:
+            return result
+        A = mat_mul(A, A)
+
+
+# ---------- Factorizacion LU ----------
+# P A = L U con pivoteo parcial (en cada columna se elige la fila con mayor
+# valor absoluto). L (diagonal de unos, sin guardar) y U se guardan juntas en
+# una sola matriz n x n: la mitad de memoria que la matriz aumentada [A | I]
+# de mat_inverse.
+#
+# Factorizar cuesta O(n^3) una vez; cada lu_solve despues cuesta O(n^2), asi
+# que un LU guardado en una variable se reutiliza para muchos lados derechos:
+#
+#   F = lu_factor(A)
+#   x1 = lu_solve(F, b1)
+#   x2 = lu_solve(F, b2)
+
+class LU:
+
+    def __init__(self, lu, perm, sign, singular):
+        self.lu = lu              # Matrix n x n con L (bajo la diagonal) y U
+        self.perm = perm          # fila de A que quedo en cada posicion
+        self.sign = sign          # signo de la permutacion (+1 / -1)
+        self.singular = singular  # algun pivote fue 0
+        self.n = lu.rows
+
+    def det(self):
+        if self.singular:
+            return 0.0
+        d = float(self.sign)
+        data, n = self.lu.data, self.n
+        for i in range(n):
+            d *= data[i * n + i]
+        return d
+
+    # Resuelve A x = b para un vector b (lista de n numeros)
+    def solve_vector(self, b):
+        n = self.n
+        if len(b) != n:
+            raise ValueError("dimensiones incompatibles para resolver el sistema")
+        if self.singular:
+            raise ValueError("La matriz es singular, el sistema no tiene solucion unica")
+        data = self.lu.data
+
+        # L y = P b (sustitucion hacia adelante, L con diagonal de unos)
+        y = [float(b[p]) for p in self.perm]
+        for i in range(1, n):
+            y[i] -= _sumprod(data[i * n:i * n + i], y[:i])
+
+        # U x = y (sustitucion hacia atras)
+        x = [0.0] * n
+        for i in range(n - 1, -1, -1):
+            row = i * n
+            x[i] = (y[i] - _sumprod(data[row + i + 1:row + n], x[i + 1:])) / data[row + i]
+        return x
+
+    def __repr__(self):
+        return f"<LU {self.n}x{self.n}>"
+
+
+def lu_factor(A):
+    A = as_matrix(A)
+    n, m = A.shape
+    if n != m:
+        raise ValueError("La factorizacion LU solo esta definida para matrices cuadradas")
+
+    rows = A.tolist()
+    perm = list(range(n))
+    sign = 1
+    singular = False
+    mul = operator.mul
+    sub = operator.sub
+
+    for k in range(n):
+        # pivote: fila con mayor valor absoluto en la columna k
+        pivot_row = k
+        pivot_val = abs(rows[k][k])
+        for r in range(k + 1, n):
+            val = abs(rows[r][k])
+            if val > pivot_val:
+                pivot_val = val
+                pivot_row = r
+        if pivot_row != k:
+            rows[k], rows[pivot_row] = rows[pivot_row], rows[k]
+            perm[k], perm[pivot_row] = perm[pivot_row], perm[k]
+            sign = -sign
+        if pivot_val == 0.0:
+            # columna ya eliminada: la matriz es singular (det = 0)
+            singular = True
+            continue
+
+        pivot = rows[k]
+        tail = pivot[k + 1:]
+        for r in range(k + 1, n):
+            row = rows[r]
+            f = row[k] / pivot[k]
+            if f != 0.0:
+                row[k] = f
+                row[k + 1:] = map(sub, row[k + 1:], map(mul, tail, [f] * len(tail)))
+            else:
+                row[k] = 0.0
+
+    lu = Matrix(n, n)
+    for i in range(n):
+        lu.data[i * n:(i + 1) * n] = array('d', rows[i])
+    return LU(lu, perm, sign, singular)
+
+
+# Resuelve A x = b con una factorizacion ya hecha.
+# b: lista de n numeros (devuelve la lista x) o matriz n x m (devuelve la
+# Matrix X con una columna de solucion por cada columna de b)
+def lu_solve(F, b):
+    if not isinstance(F, LU):
+        raise ValueError("lu_solve espera el resultado de lu_factor")
+    if isinstance(b, (list, tuple)) and not any(isinstance(v, (list, tuple)) for v in b):
+        return F.solve_vector(b)
+    B = as_matrix(b)
+    if B.rows != F.n:
+        raise ValueError("dimensiones incompatibles para resolver el sistema")
+    X = Matrix(B.cols, B.rows)
+    for j, col in enumerate(B.T):
+        X.data[j * B.rows:(j + 1) * B.rows] = array('d', F.solve_vector(col))
+    return X.T.copy()
+
+
+# Resuelve A x = b sin calcular la inversa
+def mat_solve(A, b):
+    return lu_solve(lu_factor(A), b)
+
+
+# Determinante via LU: signo de la permutacion por el producto de la diagonal de U
+def mat_det(A):
+    return lu_factor(A).det()
+
+
+# ---------- Matrices dispersas (CSR) ----------
+# Solo se guardan los elementos distintos de cero, por filas:
+#   values[indptr[i]:indptr[i + 1]]   valores de la fila i
+#   indices[indptr[i]:indptr[i + 1]]  sus columnas (en orden creciente)
+# La memoria y el tiempo de las operaciones dependen del numero de elementos
+# no nulos (nnz), no de filas x columnas.
+#
+# Con los operadores de DLang: dispersa + dispersa y dispersa * dispersa dan
+# una dispersa; si uno de los operandos es denso el resultado es una Matrix.
+
+class SparseMatrix:
+    __slots__ = ('rows', 'cols', 'indptr', 'indices', 'values')
+
+    def __init__(self, rows, cols, indptr=None, indices=None, values=None):
+        self.rows = rows
+        self.cols = cols
+        self.indptr = indptr if indptr is not None else array('q', bytes(8 * (rows + 1)))
+        self.indices = indices if indices is not None else array('q')
+        self.values = values if values is not None else array('d')
+
+    @property
+    def shape(self):
+        return self.rows, self.cols
+
+    @property
+    def nnz(self):
+        return len(self.values)
+
+    def __len__(self):
+        return self.rows
+
+    # (columnas, valores) de la fila i
+    def row_items(self, i):
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:end], self.values[start:end]
+
+    def to_dense(self):
+        M = Matrix(self.rows, self.cols)
+        data, cols = M.data, self.cols
+        for i in range(self.rows):
+            base = i * cols
+            for j, v in zip(*self.row_items(i)):
+                data[base + j] = v
+        return M
+
+    def __repr__(self):
+        return f"<SparseMatrix {self.rows}x{self.cols}, nnz={self.nnz}>"
+
+
+# Arma la CSR a partir de un diccionario por fila {columna: valor},
+# descartando los ceros
+def _csr_from_rows(rows, cols, row_dicts):
+    indptr = array('q', [0])
+    indices = array('q')
+    values = array('d')
+    for entries in row_dicts:
+        for j in sorted(entries):
+            v = entries[j]
+            if v != 0.0:
+                indices.append(j)
+                values.append(v)
+        indptr.append(len(values))
+    return SparseMatrix(rows, cols, indptr, indices, values)
+
+
+# Dispersa rows x cols a partir de una lista de [fila, columna, valor].
+# Los valores repetidos en la misma posicion se suman
+def sparse_from_triplets(rows, cols, triplets):
+    rows = int(rows)
+    cols = int(cols)
+    row_dicts = [{} for _ in range(rows)]
+    for t in triplets:
+        if len(t) != 3:
+            raise ValueError("cada triplete debe ser [fila, columna, valor]")
+        i, j, v = int(t[0]), int(t[1]), float(t[2])
+        if not (0 <= i < rows and 0 <= j < cols):
+            raise ValueError(f"posicion ({i}, {j}) fuera de una matriz {rows}x{cols}")
+        entries = row_dicts[i]
+        entries[j] = entries.get(j, 0.0) + v
+    return _csr_from_rows(rows, cols, row_dicts)
+
+
+def sparse_from_dense(A):
+    if isinstance(A, SparseMatrix):
+        return A
+    A = as_matrix(A)
+    indptr = array('q', [0])
+    indices = array('q')
+    values = array('d')
+    for row in A:
+        for j, v in enumerate(row):
+            if v != 0.0:
+                indices.append(j)
+                values.append(v)
+        indptr.append(len(values))
+    return SparseMatrix(A.rows, A.cols, indptr, indices, values)
+
+
+def sparse_to_dense(S):
+    if isinstance(S, SparseMatrix):
+        return S.to_dense()
+    return as_matrix(S)
+
+
+def sparse_nnz(S):
+    if not isinstance(S, SparseMatrix):
+        raise ValueError("sparse_nnz espera una matriz dispersa")
+    return S.nnz
+
+
+# Traspuesta en O(nnz): cuenta los elementos de cada columna y los reparte
+def _sparse_transpose(S):
+    counts = [0] * (S.cols + 1)
+    for j in S.indices:
+        counts[j + 1] += 1
+    for j in range(S.cols):
+        counts[j + 1] += counts[j]
+    indptr = array('q', counts)
+    nxt = counts[:-1]
+    indices = array('q', bytes(8 * S.nnz))
+    values = array('d', bytes(8 * S.nnz))
+    for i in range(S.rows):
+        for j, v in zip(*S.row_items(i)):
+            pos = nxt[j]
+            indices[pos] = i
+            values[pos] = v
+            nxt[j] = pos + 1
+    return SparseMatrix(S.cols, S.rows, indptr, indices, values)
+
+
+# A + sign * B con al menos una dispersa
+def _sparse_add(A, B, sign, what):
+    if shape(A) != shape(B):
+        raise ValueError(f"dimensiones incompatibles para {what}")
+    if isinstance(A, SparseMatrix) and isinstance(B, SparseMatrix):
+        row_dicts = []
+        for i in range(A.rows):
+            entries = dict(zip(*A.row_items(i)))
+            for j, v in zip(*B.row_items(i)):
+                entries[j] = entries.get(j, 0.0) + sign * v
+            row_dicts.append(entries)
+        return _csr_from_rows(A.rows, A.cols, row_dicts)
+
+    # con un operando denso el resultado es denso
+    return _elementwise(as_matrix(A), as_matrix(B), "add" if sign > 0 else "sub", what)
+
+
+def _sparse_mul(A, B):
+    if shape(A)[1] != shape(B)[0]:
+        raise ValueError("dimensiones incompatibles para multiplicación")
+
+    # densa * dispersa = (B^T A^T)^T
+    if not isinstance(A, SparseMatrix):
+        return _sparse_mul(_sparse_transpose(B), as_matrix(A).T).T.copy()
+
+    if isinstance(B, SparseMatrix):
+        # Gustavson: la fila i de C combina las filas de B indicadas por la fila i de A
+        row_dicts = []
+        for i in range(A.rows):
+            acc = {}
+            for k, a in zip(*A.row_items(i)):
+                for j, b in zip(*B.row_items(k)):
+                    acc[j] = acc.get(j, 0.0) + a * b
+            row_dicts.append(acc)
+        return _csr_from_rows(A.rows, B.cols, row_dicts)
+
+    # dispersa * densa: la fila i de C acumula a_ik * (fila k de B) solo para
+    # los a_ik no nulos
+    B = as_matrix(B)
+    cB = B.cols
+    brows = B.tolist()
+    mul = operator.mul
+    add = operator.add
+    c = array('d')
+    for i in range(A.rows):
+        acc = [0.0] * cB
+        for k, a in zip(*A.row_items(i)):
+            acc = list(map(add, acc, map(mul, brows[k], [a] * cB)))
+        c.extend(acc)
+    return Matrix(A.rows, cB, c)
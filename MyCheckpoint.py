@@ -0,0 +1,180 @@
+# MyCheckpoint.py
+# Guardar y cargar modelos entrenados (MLP, Net, CompetitiveNet y KMeans) en
+# disco:
+#
+#   save_model(model, "xor.dlm")
+#   model = load_model("xor.dlm")
+#
+# Formato binario (little-endian):
+#   cabecera   magic "DLMODEL\0", version, tipo de modelo, cantidad de
+#              dimensiones (uint32), las dimensiones (int64) y la cantidad
+#              de pesos (int64), con relleno hasta multiplo de 8 bytes
+#   pesos      float64 contiguos, en el orden de _encode
+#
+# La carga usa mmap: los pesos se copian del archivo al modelo de una vez,
+# sin interpretar texto. Guardar dos veces el mismo modelo produce el mismo
+# archivo byte a byte, y los pesos cargados son exactamente los guardados.
+# A diferencia de MyFile.py, los modelos se guardan en archivos reales.
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+import MyMLP
+import MyClusterNN
+
+
+# Funciones que DLang expone como internas (Builtins.py registra solo estas)
+DL_BUILTINS = [
+    'save_model', 'load_model',
+]
+
+
+MAGIC = b"DLMODEL\0"
+VERSION = 1
+
+_HEADER = struct.Struct('<8sIII')   # magic, version, tipo, cantidad de dimensiones
+_COUNT = struct.Struct('<q')
+
+KIND_MLP = 1
+KIND_CLUSTER = 2
+KIND_NET = 3
+KIND_KMEANS = 4
+
+# codigo de la activacion de una Net en el archivo
+_NET_ACTIVATIONS = ("sigmoid", "tanh", "relu")
+
+
+def _flat(rows):
+    data = array('d')
+    for row in rows:
+        data.extend(row)
+    return data
+
+
+def _rows(values, start, rows, cols):
+    return [values[start + i * cols:start + (i + 1) * cols].tolist() for i in range(rows)]
+
+
+# (tipo, dimensiones, pesos) de un modelo
+def _encode(model):
+    if isinstance(model, MyMLP.MLP):
+        dims = (model.input_dim, model.hidden_dim, model.output_dim)
+        payload = _flat(model.W1)
+        payload.extend(model.b1)
+        payload.extend(_flat(model.W2))
+        payload.extend(model.b2)
+        return KIND_MLP, dims, payload
+    if isinstance(model, MyMLP.Net):
+        dims = (_NET_ACTIVATIONS.index(model.activation),) + tuple(model.layers)
+        return KIND_NET, dims, model.params
+    # KMeans antes que CompetitiveNet, porque es una subclase: se guardan
+    # tambien la semilla y la inercia de cada iteracion
+    if isinstance(model, MyClusterNN.KMeans):
+        history = array('d', model.inertia_history)
+        dims = (model.input_dim, model.num_clusters, model.seed, len(history))
+        payload = _flat(model.centers)
+        payload.extend(history)
+        return KIND_KMEANS, dims, payload
+    if isinstance(model, MyClusterNN.CompetitiveNet):
+        dims = (model.input_dim, model.num_clusters)
+        return KIND_CLUSTER, dims, _flat(model.centers)
+    raise ValueError("save_model espera un modelo (MLP, Net, red competitiva o k-means)")
+
+
+def _decode(kind, dims, payload, path):
+    def check(expected):
+        if len(payload) != expected:
+            raise ValueError(f"Archivo de modelo danado: {path}")
+
+    if kind == KIND_MLP and len(dims) == 3:
+        n_in, n_hidden, n_out = dims
+        check(n_hidden * n_in + n_hidden + n_out * n_hidden + n_out)
+        model = MyMLP.MLP(n_in, n_hidden, n_out)
+        pos = 0
+        model.W1 = _rows(payload, pos, n_hidden, n_in)
+        pos += n_hidden * n_in
+        model.b1 = payload[pos:pos + n_hidden].tolist()
+        pos += n_hidden
+        model.W2 = _rows(payload, pos, n_out, n_hidden)
+        pos += n_out * n_hidden
+        model.b2 = payload[pos:pos + n_out].tolist()
+        return model
+    if kind == KIND_NET and len(dims) >= 3 and 0 <= dims[0] < len(_NET_ACTIVATIONS):
+        try:
+            return MyMLP.Net(list(dims[1:]), _NET_ACTIVATIONS[dims[0]], payload)
+        except ValueError:
+            raise ValueError(f"Archivo de modelo danado: {path}") from None
+    if kind == KIND_CLUSTER and len(dims) == 2:
+        n_in, k = dims
+        check(n_in * k)
+        model = MyClusterNN.CompetitiveNet(n_in, k)
+        model.centers = _rows(payload, 0, k, n_in)
+        return model
+    if kind == KIND_KMEANS and len(dims) == 4 and dims[0] >= 1 and dims[1] >= 1 and dims[3] >= 0:
+        n_in, k, seed, steps = dims
+        check(n_in * k + steps)
+        model = MyClusterNN.KMeans(n_in, k, seed)
+        model.centers = _rows(payload, 0, k, n_in)
+        model.inertia_history = payload[n_in * k:].tolist()
+        return model
+    raise ValueError(f"Tipo de modelo desconocido en {path}")
+
+
+# Guarda el modelo en path. Se escribe primero a un archivo temporal y luego
+# se renombra: si algo falla a mitad no queda un modelo a medio escribir
+def save_model(model, path):
+    path = str(path)
+    kind, dims, payload = _encode(model)
+    header = (_HEADER.pack(MAGIC, VERSION, kind, len(dims))
+              + struct.pack(f'<{len(dims)}q', *dims)
+              + _COUNT.pack(len(payload)))
+    header += bytes(-len(header) % 8)
+    if sys.byteorder != 'little':
+        payload = array('d', payload)
+        payload.byteswap()
+
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        f.write(header)
+        f.write(payload.tobytes())
+    os.replace(tmp, path)
+
+
+def load_model(path):
+    path = str(path)
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        raise ValueError(f"Archivo no encontrado: {path}") from None
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if size < _HEADER.size:
+            raise ValueError(f"No es un archivo de modelo de DLang: {path}")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, version, kind, ndims = _HEADER.unpack_from(mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"No es un archivo de modelo de DLang: {path}")
+            if version != VERSION:
+                raise ValueError(f"Version de modelo no soportada: {version} (se esperaba {VERSION})")
+
+            pos = _HEADER.size
+            if pos + 8 * ndims + _COUNT.size > size:
+                raise ValueError(f"Archivo de modelo danado: {path}")
+            dims = struct.unpack_from(f'<{ndims}q', mm, pos)
+            pos += 8 * ndims
+            (count,) = _COUNT.unpack_from(mm, pos)
+            pos += _COUNT.size
+            pos += -pos % 8
+            if count < 0 or pos + 8 * count != size:
+                raise ValueError(f"Archivo de modelo danado: {path}")
+
+            payload = array('d')
+            with memoryview(mm) as view:
+                payload.frombytes(view[pos:pos + 8 * count])
+
+    if sys.byteorder != 'little':
+        payload.byteswap()
+    return _decode(kind, dims, payload, path)
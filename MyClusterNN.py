@@ -1,5 +1,20 @@
 # MyClusterNN.py
 # Red competitiva sencilla para AGRUPAMIENTO (clustering)
+# Con el motor "numpy" (Backend.py) _winner y train se vectorizan.
+# predict busca el centro mas cercano con un indice (_CenterIndex).
+
+import operator
+
+import Backend
+import Matrix
+
+
+# Funciones que DLang expone como internas (Builtins.py registra solo estas)
+DL_BUILTINS = [
+    'create_cluster_net', 'train_cluster_net', 'predict_cluster', 'create_kmeans',
+    'train_kmeans', 'inertia_history',
+]
+
 
 # Distancia euclidea al cuadrado entre dos vectores a y b
 # No se usa sqrt porque no hace falta comparar distancies
@@ -13,6 +28,117 @@ def _squared_distance(a, b):
     return s
 
 
+# (indice, distancia al cuadrado) del centro mas cercano a x recorriendo
+# todos los centros (en empate, el menor indice). La suma de cada centro se
+# corta en cuanto supera la mejor distancia: las sumas parciales solo crecen,
+# asi que ese centro ya no puede ganar. Da el mismo resultado que comparar
+# _squared_distance con todos
+def _nearest_scan(centers, x):
+    if len(x) != len(centers[0]):
+        raise ValueError("vectores de distinta longitud en _squared_distance")
+    dims = range(len(x))
+    c = centers[0]
+    best_j = 0
+    best_d = 0.0
+    for i in dims:
+        d = x[i] - c[i]
+        best_d += d * d
+    for j in range(1, len(centers)):
+        c = centers[j]
+        s = 0.0
+        for i in dims:
+            d = x[i] - c[i]
+            s += d * d
+            if s > best_d:
+                break
+        else:
+            if s < best_d:
+                best_d = s
+                best_j = j
+    return best_j, best_d
+
+
+# ----------------- Indice de centros -----------------
+# Arbol k-d sobre los centros para responder muchas consultas de centro mas
+# cercano (predict). Cada nodo parte sus centros por la mediana de la
+# dimension con mas dispersion; las hojas guardan hasta KD_LEAF centros.
+# Una rama se descarta solo si la distancia al cuadrado de x al plano de
+# corte es mayor que la mejor encontrada: esa distancia es una cota inferior
+# de la suma (con redondeo incluido, porque los terminos son >= 0), asi que
+# el resultado es exactamente el de _nearest_scan, empates incluidos.
+#
+# Con muchas dimensiones el arbol casi no descarta ramas; ahi (o con pocos
+# centros) se usa directamente _nearest_scan.
+
+KD_MAX_DIM = 8        # dimensiones hasta las que se usa el arbol
+KD_MIN_CENTERS = 32   # con menos centros el recorrido lineal es mas rapido
+KD_LEAF = 8           # centros por hoja
+
+
+class _CenterIndex:
+
+    def __init__(self, centers):
+        self.centers = [[float(v) for v in c] for c in centers]
+        self.dim = len(self.centers[0])
+        self.root = None
+        if self.dim <= KD_MAX_DIM and len(self.centers) >= KD_MIN_CENTERS:
+            self.root = self._build(list(range(len(self.centers))))
+
+    # Nodo interno: (eje, corte, izquierda, derecha), con los centros de
+    # valor <= corte en el eje a la izquierda y >= corte a la derecha.
+    # Hoja: (None, [(indice, centro), ...])
+    def _build(self, idx):
+        centers = self.centers
+        if len(idx) <= KD_LEAF:
+            return (None, [(j, centers[j]) for j in idx])
+        axis = max(range(self.dim), key=lambda a: max(centers[j][a] for j in idx)
+                   - min(centers[j][a] for j in idx))
+        idx.sort(key=lambda j: (centers[j][axis], j))
+        mid = len(idx) // 2
+        return (axis, centers[idx[mid]][axis], self._build(idx[:mid]), self._build(idx[mid:]))
+
+    def nearest(self, x):
+        return self.query(x)[0]
+
+    # (indice, distancia al cuadrado) del centro mas cercano
+    def query(self, x):
+        if len(x) != self.dim:
+            raise ValueError("vectores de distinta longitud en _squared_distance")
+        if self.root is None:
+            return _nearest_scan(self.centers, x)
+
+        best_j = 0
+        best_d = _squared_distance(x, self.centers[0])
+        dims = range(self.dim)
+        stack = [(self.root, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if bound > best_d:
+                continue
+            # baja por el lado de x y deja pendiente el otro con su cota
+            while node[0] is not None:
+                axis, split, left, right = node
+                d = x[axis] - split
+                if d < 0:
+                    stack.append((right, d * d))
+                    node = left
+                else:
+                    stack.append((left, d * d))
+                    node = right
+            for j, c in node[1]:
+                s = 0.0
+                for i in dims:
+                    t = x[i] - c[i]
+                    s += t * t
+                    if s > best_d:
+                        break
+                else:
+                    if s < best_d or (s == best_d and j < best_j):
+                        best_d = s
+                        best_j = j
+        return best_j, best_d
+
+
 # Red competitiva:
 # Input_dim: dimension de entrada
 # num_clusters: numero de neuronas
@@ -34,14 +160,10 @@ class CompetitiveNet:
             
     # Devuelve el indice del centro mas cercano a x
     def _winner(self, x):
-        best_j = 0
-        best_d = _squared_distance(x, self.centers[0])
-        for j in range(1, self.num_clusters):
-            d = _squared_distance(x, self.centers[j])
-            if d < best_d:
-                best_d = d
-                best_j = j
-        return best_j
+        fast = Backend.accelerated()
+        if fast is not None:
+            return fast.cluster_winner(self, x)
+        return _nearest_scan(self.centers, x)[0]
 
     # Entrenamiento no supervisado:
     # X: lista de ejmplos
@@ -49,6 +171,10 @@ class CompetitiveNet:
     # epcochs: numero de pasadas por todos los datos
     def train(self, X, lr=0.1, epochs=10):
         lr = float(lr)
+        fast = Backend.accelerated()
+        if fast is not None:
+            fast.cluster_train(self, X, lr, epochs)
+            return
         for _ in range(int(epochs)):
             for x in X:
                 # aseguramos floats
@@ -64,12 +190,200 @@ class CompetitiveNet:
         xv = [float(v) for v in x]
         return self._winner(xv)
 
-    # Devuelve la lista de indices de cluster para cada ejemplo en X
+    # Devuelve la lista de indices de cluster para cada ejemplo en X. Los
+    # centros no cambian durante la prediccion: se indexan una vez
     def predict(self, X):
-        labels = []
-        for x in X:
-            labels.append(self.predict_one(x))
-        return labels
+        if Backend.accelerated() is not None:
+            return [self.predict_one(x) for x in X]
+        index = _CenterIndex(self.centers)
+        return [index.nearest([float(v) for v in x]) for x in X]
+
+
+# ----------------- K-means -----------------
+# Agrupamiento por k-means sobre los mismos centros que CompetitiveNet (se
+# predice igual, con predict_cluster):
+#  - Semilla k-means++: el primer centro es un ejemplo al azar y cada
+#    siguiente se elige con probabilidad proporcional a la distancia al
+#    cuadrado al centro mas cercano ya elegido. Con mas de KMEANS_INIT_SAMPLE
+#    ejemplos se siembra sobre una muestra de ese tamano.
+#  - Lloyd (batch_size None o 0): en cada iteracion se asigna cada ejemplo a
+#    su centro mas cercano y cada centro pasa a ser el promedio de sus
+#    ejemplos (un centro sin ejemplos queda donde estaba).
+#  - Mini-lotes (batch_size n): en cada iteracion se toman n ejemplos al azar
+#    y cada centro se mueve al promedio de todos los ejemplos que le tocaron
+#    hasta ahora (tasa 1 / cantidad de ejemplos vistos por el centro).
+#
+# Termina cuando ningun centro se mueve mas de tolerance (distancia al
+# cuadrado) o, con mini-lotes, cuando el promedio movil de la inercia no
+# mejora en KMEANS_PATIENCE iteraciones seguidas.
+# inertia_history: inercia (suma de distancias al cuadrado de cada ejemplo a
+# su centro) de cada iteracion; con mini-lotes es la del lote escalada al
+# tamano de los datos.
+# El azar sale de un generador congruencial con semilla (seed): mismo seed y
+# mismos datos dan los mismos centros, con cualquier motor.
+
+KMEANS_INIT_SAMPLE = 10_000
+KMEANS_PATIENCE = 10
+
+
+# Generador congruencial (los coeficientes de MyMLP.Net._init_weights)
+class _Lcg:
+
+    def __init__(self, seed):
+        self.state = int(seed) % 2147483648
+
+    # real en [0, 1)
+    def random(self):
+        self.state = (self.state * 1103515245 + 12345) % 2147483648
+        return self.state / 2147483648
+
+    # entero en [0, n)
+    def index(self, n):
+        return int(self.random() * n)
+
+
+# Sumas y cantidad de los ejemplos asignados a cada centro, e inercia.
+# rows: lista de ejemplos (listas de floats)
+def _kmeans_sums(centers, rows):
+    k, dim = len(centers), len(centers[0])
+    index = _CenterIndex(centers)
+    sums = [[0.0] * dim for _ in range(k)]
+    counts = [0] * k
+    inertia = 0.0
+    add = operator.add
+    for x in rows:
+        j, d = index.query(x)
+        inertia += d
+        counts[j] += 1
+        sums[j] = list(map(add, sums[j], x))
+    return sums, counts, inertia
+
+
+# Centros iniciales k-means++ elegidos entre rows
+def _kmeans_pp(rows, k, rng):
+    centers = [list(rows[rng.index(len(rows))])]
+    dists = [_squared_distance(x, centers[0]) for x in rows]
+    while len(centers) < k:
+        total = sum(dists)
+        if total > 0.0:
+            target = rng.random() * total
+            acc = 0.0
+            pick = None
+            for i, d in enumerate(dists):
+                acc += d
+                if d > 0.0:
+                    pick = i
+                    if acc > target:
+                        break
+        else:
+            # todos los ejemplos coinciden con algun centro
+            pick = rng.index(len(rows))
+        c = list(rows[pick])
+        centers.append(c)
+        dists = [min(d, _squared_distance(x, c)) for x, d in zip(rows, dists)]
+    return centers
+
+
+class KMeans(CompetitiveNet):
+
+    def __init__(self, input_dim, num_clusters, seed=0):
+        if int(input_dim) < 1 or int(num_clusters) < 1:
+            raise ValueError("create_kmeans espera dimension y cantidad de grupos >= 1")
+        super().__init__(input_dim, num_clusters)
+        self.seed = int(seed)
+        self.inertia_history = []
+
+    # X: lista de ejemplos (o Matrix); iterations: maximo de iteraciones.
+    # No se llama train: CompetitiveNet.train tiene otros parametros
+    def fit(self, X, iterations=100, batch_size=None, tolerance=1e-4):
+        Xm = X if isinstance(X, Matrix.Matrix) else Matrix.Matrix.from_rows(list(X))
+        n = Xm.rows
+        if n < self.num_clusters:
+            raise ValueError(f"k-means necesita al menos {self.num_clusters} ejemplos")
+        if Xm.cols != self.input_dim:
+            raise ValueError("dimension de entrada incorrecta")
+        if batch_size == 0:
+            batch_size = None
+        if batch_size is not None and (int(batch_size) != batch_size or batch_size < 1):
+            raise ValueError("batch_size debe ser un entero >= 1")
+        if tolerance < 0:
+            raise ValueError("tolerance debe ser >= 0")
+
+        rng = _Lcg(self.seed)
+        xs = Xm.flat()
+        dim = self.input_dim
+
+        def pick_rows(indices):
+            return [xs[i * dim:(i + 1) * dim].tolist() for i in indices]
+
+        if n > KMEANS_INIT_SAMPLE:
+            sample = pick_rows([rng.index(n) for _ in range(KMEANS_INIT_SAMPLE)])
+        else:
+            sample = pick_rows(range(n))
+        self.centers = _kmeans_pp(sample, self.num_clusters, rng)
+        self.inertia_history = []
+
+        # el motor solo cambia la asignacion (la parte que recorre los datos)
+        fast = Backend.accelerated()
+        if fast is not None:
+            def assign(indices=None):
+                return fast.kmeans_sums(self.centers, Xm, indices)
+        elif batch_size is None:
+            rows = Xm.tolist()
+
+            def assign():
+                return _kmeans_sums(self.centers, rows)
+        else:
+            def assign(indices):
+                return _kmeans_sums(self.centers, pick_rows(indices))
+
+        if batch_size is None:
+            self._lloyd(assign, int(iterations), tolerance)
+        else:
+            self._minibatch(assign, rng, n, int(iterations), int(batch_size), tolerance)
+
+    def _lloyd(self, assign, iterations, tolerance):
+        for _ in range(iterations):
+            sums, counts, inertia = assign()
+            self.inertia_history.append(inertia)
+            new = [[v / m for v in s] if m else c
+                   for s, m, c in zip(sums, counts, self.centers)]
+            if self._move(new) <= tolerance:
+                break
+
+    def _minibatch(self, assign, rng, n, iterations, batch_size, tolerance):
+        seen = [0] * self.num_clusters
+        alpha = min(1.0, 2.0 * batch_size / (n + 1))
+        smooth = best = None
+        waiting = 0
+        for _ in range(iterations):
+            sums, counts, inertia = assign([rng.index(n) for _ in range(batch_size)])
+            estimate = inertia * n / batch_size
+            self.inertia_history.append(estimate)
+            new = []
+            for j, (s, m, c) in enumerate(zip(sums, counts, self.centers)):
+                if m:
+                    total = seen[j] + m
+                    new.append([(seen[j] * cv + sv) / total for cv, sv in zip(c, s)])
+                    seen[j] = total
+                else:
+                    new.append(c)
+            if self._move(new) <= tolerance:
+                break
+            smooth = estimate if smooth is None else smooth + alpha * (estimate - smooth)
+            if best is None or smooth < best:
+                best = smooth
+                waiting = 0
+            else:
+                waiting += 1
+                if waiting >= KMEANS_PATIENCE:
+                    break
+
+    # Reemplaza los centros; devuelve el mayor desplazamiento (al cuadrado)
+    def _move(self, new):
+        shift = max(_squared_distance(a, b) for a, b in zip(new, self.centers))
+        self.centers = new
+        return shift
 
 
 # Funciones para el lenguaje
@@ -80,9 +394,27 @@ def create_cluster_net(input_dim, num_clusters):
 
 # Entrena la red competitiva con los datos X
 def train_cluster_net(model, X, lr, epochs):
+    if isinstance(model, KMeans):
+        raise ValueError("train_cluster_net no entrena modelos k-means; usar train_kmeans")
     model.train(X, lr, epochs)
     return model
 
 # Devuelve los indices de cluster para cada ejemplo en X
 def predict_cluster(model, X):
     return model.predict(X)
+
+# Crea un modelo k-means de num_clusters grupos; seed fija la semilla
+def create_kmeans(input_dim, num_clusters, seed=0):
+    return KMeans(input_dim, num_clusters, seed)
+
+# Siembra k-means++ y entrena: Lloyd (batch_size 0) o mini-lotes de
+# batch_size ejemplos, hasta iterations iteraciones o convergencia
+def train_kmeans(model, X, iterations=100, batch_size=0, tolerance=1e-4):
+    if not isinstance(model, KMeans):
+        raise ValueError("train_kmeans espera un modelo creado con create_kmeans")
+    model.fit(X, iterations, batch_size, tolerance)
+    return model
+
+# Inercia de cada iteracion del ultimo entrenamiento k-means
+def inertia_history(model):
+    return list(model.inertia_history)
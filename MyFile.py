@@ -2,6 +2,12 @@
 # Diccionario global que actúa como "sistema de archivos"
 FS = {}
 
+
+# Funciones que DLang expone como internas (Builtins.py registra solo estas)
+DL_BUILTINS = [
+    'write_text', 'append_text', 'read_text', 'read_lines',
+]
+
 def write_text(path, content):
     """
     Escribe (o crea) un archivo en el FS simulado.
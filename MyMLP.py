@@ -1,51 +1,156 @@
 # MyMLP.py
 # Perceptron multicapa para clasificacion binaria 
+# Con el motor "numpy" (Backend.py) forward y train se vectorizan.
+# train_mlp(model, X, Y, lr, epochs, batch_size) entrena por mini-lotes con
+# operaciones de matrices (Matrix.py): una actualizacion por lote.
+#
+# Net (create_net) generaliza el MLP: cualquier numero de capas, activacion
+# sigmoide, tanh o relu en las ocultas y salida softmax para varias clases.
 
+import operator
+from array import array
+from itertools import cycle, repeat
 
-# ----------------- Utilidades internas -----------------
+import Backend
+import Matrix
+import ParallelModels
+from MyMath import PI, cos, exp, log, sqrt
 
-# Potencia x^n para n entero
-def _power(x, n):
-    n = int(n)
-    if n == 0:
-        return 1.0
-    if n < 0:
-        return 1.0 / _power(x, -n)
-    res = 1.0
-    for _ in range(n):
-        res *= x
-    return res
-
-
-def _factorial(n):
-    n = int(n)
-    if n < 0:
-        raise ValueError("factorial indefinido para n < 0")
-    res = 1
-    for i in range(2, n + 1):
-        res *= i
-    return res
-
-
-# Aproximacion de e^x usando serie de Taylor con pocos terminos 
-def _exp(x):
-    x = float(x)
-    terms = 10
-    res = 0.0
-    for k in range(terms):
-        res += _power(x, k) / _factorial(k)
-    return res
-
-
-# Funcion de activacion sigmoide
-def _sigmoid(x):
-    return 1.0 / (1.0 + _exp(-x))
+
+# Funciones que DLang expone como internas (Builtins.py registra solo estas)
+DL_BUILTINS = [
+    'create_mlp', 'train_mlp', 'classify_mlp', 'predict_mlp', 'predict_real_mlp',
+    'create_net', 'train_net', 'predict_net', 'predict_real_net', 'loss_history',
+]
 
 
-# Derivada de la sigmoide en funcion del pre-activacion x
-def _sigmoid_deriv(x):
-    s = _sigmoid(x)
-    return s * (1.0 - s)
+# ----------------- Utilidades internas -----------------
+
+# Funcion de activacion sigmoide (e^x de MyMath: precisa para cualquier x)
+def _sigmoid(x):
+    return 1.0 / (1.0 + exp(-x))
+
+
+# Sigmoide de A W^T + b para todas las filas de A a la vez (una capa aplicada
+# a un lote de ejemplos). W: Matrix (salidas x entradas), b: lista
+def _layer(A, W, b):
+    Z = Matrix.mat_mul(A, W.T)
+    values = exp([-(z + bj) for z, bj in zip(Z.flat(), cycle(b))])
+    return Matrix.Matrix(Z.rows, Z.cols, array('d', [1.0 / (1.0 + e) for e in values]))
+
+
+# Suma por columnas de una Matrix contigua (gradiente de los bias)
+def _col_sums(M):
+    data, cols = M.flat(), M.cols
+    return [sum(data[j::cols]) for j in range(cols)]
+
+
+# None o 0 = ejemplo a ejemplo (None); si no, un entero >= 1
+def _check_batch_size(batch_size):
+    if batch_size is None or batch_size == 0:
+        return None
+    if int(batch_size) != batch_size or batch_size < 1:
+        raise ValueError("batch_size debe ser un entero >= 1")
+    return int(batch_size)
+
+
+# X (lista de ejemplos o Matrix) como Matrix de una fila por ejemplo
+def _input_matrix(X, input_dim):
+    if isinstance(X, Matrix.Matrix):
+        Xm = X
+    else:
+        rows = [[float(v) for v in x] for x in X]
+        if not rows:
+            return Matrix.Matrix(0, input_dim)
+        Xm = Matrix.Matrix.from_rows(rows)
+    if Xm.cols != input_dim:
+        raise ValueError("dimension de entrada incorrecta")
+    return Xm
+
+
+# Salidas de model (MLP o Net) para todas las filas de Xm, sin modificar el
+# modelo. Con varios procesos (set_workers) y X grande se reparten las filas
+def _predict_outputs(model, Xm, out_dim):
+    if Backend.accelerated() is None and ParallelModels.enabled_for_predict(Xm.rows):
+        return ParallelModels.outputs(model, Xm, out_dim)
+    return model._outputs(Xm)
+
+
+# ----------------- Plan de entrenamiento -----------------
+# Controla las epocas de un entrenamiento (MLP y Net, con cualquier motor):
+#  - tasa de aprendizaje de cada epoca segun schedule:
+#      None / "constant"    lr fija
+#      "inverse"            lr / (1 + epoca)
+#      "cosine"             de lr a 0 siguiendo medio coseno
+#      un numero d en (0, 1]  lr * d^epoca
+#  - historial de la perdida media de cada epoca (calculada con las salidas
+#    que el entrenamiento ya obtiene, sin otra pasada sobre los datos)
+#  - parada temprana: si durante patience epocas seguidas (5 por defecto) la
+#    perdida no baja mas de tolerance respecto de la mejor, se termina.
+#    Sin tolerance, o con patience = 0, se hacen todas las epocas
+#
+# Uso:
+#     for lr in plan:
+#         loss = ...una epoca con esa lr...
+#         plan.record(loss)
+
+_SCHEDULES = ("constant", "inverse", "cosine")
+
+
+class _Plan:
+
+    def __init__(self, lr, epochs, tolerance=None, patience=None, schedule=None):
+        if schedule is None:
+            schedule = "constant"
+        if isinstance(schedule, str):
+            if schedule not in _SCHEDULES:
+                raise ValueError(f"schedule desconocido: {schedule} (opciones: "
+                                 f"{', '.join(_SCHEDULES)} o un factor entre 0 y 1)")
+        elif not 0 < schedule <= 1:
+            raise ValueError("el factor de decaimiento de lr debe estar entre 0 y 1")
+        if tolerance is not None and tolerance < 0:
+            raise ValueError("tolerance debe ser >= 0")
+        if patience is None:
+            patience = 5
+        if int(patience) != patience or patience < 0:
+            raise ValueError("patience debe ser un entero >= 0")
+
+        self.lr = float(lr)
+        self.epochs = int(epochs)
+        self.schedule = schedule
+        self.tolerance = None if tolerance is None or patience == 0 else float(tolerance)
+        self.patience = int(patience)
+        self.history = []
+        self.best = None
+        self.waiting = 0
+        self.stopped = False
+
+    def rate(self, epoch):
+        if self.schedule == "constant":
+            return self.lr
+        if self.schedule == "inverse":
+            return self.lr / (1 + epoch)
+        if self.schedule == "cosine":
+            return self.lr * 0.5 * (1.0 + cos(PI * epoch / self.epochs))
+        return self.lr * float(self.schedule) ** epoch
+
+    def __iter__(self):
+        for epoch in range(self.epochs):
+            if self.stopped:
+                return
+            yield self.rate(epoch)
+
+    def record(self, loss):
+        self.history.append(loss)
+        if self.tolerance is None:
+            return
+        if self.best is None or self.best - loss > self.tolerance:
+            self.best = loss
+            self.waiting = 0
+        else:
+            self.waiting += 1
+            if self.waiting >= self.patience:
+                self.stopped = True
 
 
 # ----------------- Clase MLP -----------------
@@ -95,6 +200,9 @@ class MLP:
         # Bias capa 2: b2 (output_dim)
         self.b2 = [0.0 for _ in range(self.output_dim)]
 
+        # perdida media por epoca del ultimo entrenamiento
+        self.loss_history = []
+
     # ----------------- Operaciones básicas con listas -----------------
 
     # Producto punto entre dos listas del mismo tamaño
@@ -130,6 +238,24 @@ class MLP:
         if len(x) != self.input_dim:
             raise ValueError("dimension de entrada incorrecta")
 
+        fast = Backend.accelerated()
+        if fast is not None:
+            return fast.mlp_forward(self, x)
+
+        z1, h1, z2, out = self._propagate(x)
+
+        # guardamos para backprop
+        self.last_x = x
+        self.last_z1 = z1
+        self.last_h1 = h1
+        self.last_z2 = z2
+        self.last_out = out
+
+        return out
+
+    # Propagacion sin estado: devuelve (z1, h1, z2, out) sin guardar nada en
+    # el modelo, asi varias predicciones pueden usarlo a la vez
+    def _propagate(self, x):
         # capa oculta: z1 = W1 * x + b1
         z1 = self._mat_vec(self.W1, x)  # len = hidden_dim
         for i in range(self.hidden_dim):
@@ -141,23 +267,30 @@ class MLP:
         for j in range(self.output_dim):
             z2[j] += self.b2[j]
         out = [_sigmoid(z) for z in z2]
+        return z1, h1, z2, out
 
-        # guardamos para backprop
-        self.last_x = x
-        self.last_z1 = z1
-        self.last_h1 = h1
-        self.last_z2 = z2
-        self.last_out = out
-
-        return out
+    # Salidas para un lote (Matrix, una fila por ejemplo), tambien sin estado:
+    # Matrix de filas(X) x output_dim
+    def _outputs(self, Xm):
+        fast = Backend.accelerated()
+        if fast is not None:
+            return fast.mlp_outputs(self, Xm)
+        H1 = _layer(Xm, Matrix.Matrix.from_rows(self.W1), self.b1)
+        return _layer(H1, Matrix.Matrix.from_rows(self.W2), self.b2)
 
     # ----------------- Entrenamiento -----------------
     # X: Lista de ejemplos, cada uno es lista de input_dim
     # Y: Lista de etiquetas. Para binario: 0 o 1
     # lr: learning rate
-    # epochs: numero de pasadas por todo el dataset
-
-    def train(self, X, Y, lr=0.1, epochs=1000):
+    # epochs: numero maximo de pasadas por todo el dataset
+    # batch_size: None o 0 = ejemplo a ejemplo; n = mini-lotes de n ejemplos
+    #             (ver _train_batches)
+    # tolerance, patience, schedule: parada temprana y tasa de aprendizaje
+    #             por epoca (ver _Plan)
+    # La perdida es el error cuadratico 0.5 (out - y)^2, promedio por ejemplo
+
+    def train(self, X, Y, lr=0.1, epochs=1000, batch_size=None,
+              tolerance=None, patience=None, schedule=None):
         # se asegura que Y sea lista de listas si output_dim = 1
         Y_proc = []
         for y in Y:
@@ -166,8 +299,23 @@ class MLP:
             else:
                 raise ValueError("Solo se ha implementado output_dim = 1")
 
-        for _ in range(int(epochs)):
-            for x, y in zip(X, Y_proc):
+        batch_size = _check_batch_size(batch_size)
+        plan = _Plan(lr, epochs, tolerance, patience, schedule)
+
+        fast = Backend.accelerated()
+        if fast is not None:
+            fast.mlp_train(self, X, Y_proc, plan, batch_size)
+        elif batch_size is not None:
+            self._train_batches(X, Y_proc, plan, batch_size)
+        else:
+            self._train_samples(X, Y_proc, plan)
+        self.loss_history = plan.history
+
+    # Descenso por gradiente ejemplo a ejemplo
+    def _train_samples(self, X, Y, plan):
+        for lr in plan:
+            loss = 0.0
+            for x, y in zip(X, Y):
                 # 1) forward
                 out = self.forward(x)   # lista de tamaño output_dim
 
@@ -175,12 +323,14 @@ class MLP:
                 error_out = []
                 for j in range(self.output_dim):
                     error_out.append(out[j] - y[j])
+                    loss += 0.5 * error_out[j] * error_out[j]
 
                 # 2) gradientes capa de salida
-                # dL/dz2_j = error_out_j * sig'(z2_j)
+                # dL/dz2_j = error_out_j * sig'(z2_j), con sig' = s (1 - s) y
+                # s la activacion ya calculada en forward
                 d_z2 = []
                 for j in range(self.output_dim):
-                    d_z2.append(error_out[j] * _sigmoid_deriv(self.last_z2[j]))
+                    d_z2.append(error_out[j] * (out[j] * (1.0 - out[j])))
 
                 # gradientes para W2 y b2
                 # W2: (output_dim x hidden_dim)
@@ -202,9 +352,10 @@ class MLP:
                     d_h1.append(s)
 
                 # dL/dz1_k = d_h1_k * sig'(z1_k)
+                h1 = self.last_h1
                 d_z1 = []
                 for k in range(self.hidden_dim):
-                    d_z1.append(d_h1[k] * _sigmoid_deriv(self.last_z1[k]))
+                    d_z1.append(d_h1[k] * (h1[k] * (1.0 - h1[k])))
 
                 # gradientes para W1 y b1
                 # W1: (hidden_dim x input_dim)
@@ -215,33 +366,354 @@ class MLP:
                         self.W1[k][i] -= lr * grad
                 for k in range(self.hidden_dim):
                     self.b1[k] -= lr * d_z1[k]
+            plan.record(loss / max(len(X), 1))
+
+    # Descenso por gradiente por mini-lotes. Cada lote (batch_size ejemplos
+    # consecutivos, el ultimo puede ser menor) se propaga como una matriz
+    # (filas = ejemplos), se promedian los gradientes del lote y se hace una
+    # sola actualizacion. Las derivadas de la sigmoide salen de las
+    # activaciones ya calculadas. A diferencia del entrenamiento ejemplo a
+    # ejemplo, el gradiente de la capa oculta usa W2 antes de actualizarla
+    def _train_batches(self, X, Y, plan, batch_size):
+        W1 = Matrix.Matrix.from_rows(self.W1)
+        W2 = Matrix.Matrix.from_rows(self.W2)
+        b1 = list(self.b1)
+        b2 = list(self.b2)
+
+        batches = []
+        for start in range(0, len(X), batch_size):
+            Xb = Matrix.Matrix.from_rows([list(map(float, x)) for x in X[start:start + batch_size]])
+            if Xb.cols != self.input_dim:
+                raise ValueError("dimension de entrada incorrecta")
+            Yb = [v for y in Y[start:start + batch_size] for v in y]
+            batches.append((Xb, Yb))
+
+        for lr in plan:
+            loss = 0.0
+            for Xb, Yb in batches:
+                n = Xb.rows
+                H1 = _layer(Xb, W1, b1)     # n x hidden_dim
+                Out = _layer(H1, W2, b2)    # n x output_dim
+                loss += 0.5 * sum([(o - y) * (o - y) for o, y in zip(Out.data, Yb)])
+
+                # dL/dz2 = (out - y) * out * (1 - out)
+                D2 = Matrix.Matrix(n, self.output_dim, array('d', [
+                    (o - y) * o * (1.0 - o) for o, y in zip(Out.data, Yb)]))
+                # dL/dz1 = (dL/dz2 W2) * h1 * (1 - h1)
+                G1 = Matrix.mat_mul(D2, W2)
+                D1 = Matrix.Matrix(n, self.hidden_dim, array('d', [
+                    g * h * (1.0 - h) for g, h in zip(G1.flat(), H1.data)]))
+
+                step = lr / n
+                Matrix.axpy(-step, Matrix.mat_mul(D2.T, H1), W2)
+                b2 = [b - step * g for b, g in zip(b2, _col_sums(D2))]
+                Matrix.axpy(-step, Matrix.mat_mul(D1.T, Xb), W1)
+                b1 = [b - step * g for b, g in zip(b1, _col_sums(D1))]
+            plan.record(loss / max(len(X), 1))
+
+        self.W1 = W1.tolist()
+        self.W2 = W2.tolist()
+        self.b1 = b1
+        self.b2 = b2
 
     # ----------------- Prediccion -----------------
 
-    # Predice una etiqueta 0/1 para un ejemplo x
+    # Predice una etiqueta 0/1 para un ejemplo x; con output_dim > 1 cada
+    # salida (sigmoide independiente) se umbraliza por separado
     def predict_one(self, x):
-        out = self.forward(x)[0]  # output_dim = 1
-        return 1 if out >= 0.5 else 0
+        if len(x) != self.input_dim:
+            raise ValueError("dimension de entrada incorrecta")
+        out = self._propagate(x)[3]
+        if self.output_dim == 1:
+            return 1 if out[0] >= 0.5 else 0
+        return [1 if v >= 0.5 else 0 for v in out]
 
-    # Para una lista de ejemplos X
+    # Para una lista de ejemplos X: todo el lote a la vez, sin estado. Un 0/1
+    # por ejemplo si output_dim = 1, si no una lista de 0/1 por ejemplo
     def predict(self, X):
-        preds = []
-        for x in X:
-            preds.append(self.predict_one(x))
-        return preds
+        if self.output_dim == 1:
+            return [1 if out >= 0.5 else 0 for out in self.predict_real(X)]
+        return [[1 if v >= 0.5 else 0 for v in row] for row in self.predict_real(X)]
+
+    # Salidas reales para una lista de ejemplos X: un numero por ejemplo si
+    # output_dim = 1, si no una lista
+    def predict_real(self, X):
+        Out = _predict_outputs(self, _input_matrix(X, self.input_dim), self.output_dim)
+        if self.output_dim == 1:
+            return Out.flat().tolist()
+        return Out.tolist()
 
 
 # Prediccion numerica (regresion) con perceptron
 # Devuelve los valores reales de salida sin convertir a binario
 def predict_real_mlp(model, X):
-    ys = []
-    for x in X:
-        out = model.forward(x)  # lista de tamaño output_dim
-        if len(out) == 1:
-            ys.append(out[0])
+    return model.predict_real(X)
+
+
+# ----------------- Red por capas -----------------
+# Activaciones sobre todos los valores de una capa a la vez. La derivada se
+# obtiene de la activacion ya calculada (a = f(z)), sin volver a evaluar f
+
+def _sigmoid_vec(zs):
+    return [1.0 / (1.0 + e) for e in exp([-z for z in zs])]
+
+
+def _sigmoid_grad(acts):
+    return [a * (1.0 - a) for a in acts]
+
+
+# tanh(z) = signo(z) (1 - e^(-2|z|)) / (1 + e^(-2|z|)): sin desbordes
+def _tanh_vec(zs):
+    ts = exp([-2.0 * abs(z) for z in zs])
+    return [(1.0 - t) / (1.0 + t) if z >= 0.0 else (t - 1.0) / (1.0 + t) for z, t in zip(zs, ts)]
+
+
+def _tanh_grad(acts):
+    return [1.0 - a * a for a in acts]
+
+
+def _relu_vec(zs):
+    return [z if z > 0.0 else 0.0 for z in zs]
+
+
+def _relu_grad(acts):
+    return [1.0 if a > 0.0 else 0.0 for a in acts]
+
+
+_ACTIVATIONS = {
+    "sigmoid": (_sigmoid_vec, _sigmoid_grad),
+    "tanh": (_tanh_vec, _tanh_grad),
+    "relu": (_relu_vec, _relu_grad),
+}
+
+
+# Softmax de cada fila (cols valores por fila); se resta el maximo de la fila
+# para que e^z no desborde
+def _softmax_rows(zs, cols):
+    out = []
+    for i in range(0, len(zs), cols):
+        row = zs[i:i + cols]
+        top = max(row)
+        es = exp([z - top for z in row])
+        total = sum(es)
+        out.extend([e / total for e in es])
+    return out
+
+
+# Piso para log en la entropia cruzada (una probabilidad de 0 daria -inf)
+_TINY = 1e-300
+
+
+# Red densa con capas de tamanos layers = [entradas, oculta1, ..., salidas].
+#  - Ocultas: activacion sigmoide, tanh o relu.
+#  - Salida: sigmoide si hay una sola neurona (clasificacion binaria) o
+#    softmax si hay varias (una por clase), ambas con entropia cruzada.
+#
+# Todos los pesos y bias viven en un unico array('d') (params), capa por
+# capa: W1 (n1 x n0), b1 (n1), W2 (n2 x n1), b2 (n2), ... Cada capa se usa
+# como una vista Matrix sobre ese buffer (sin copiar), y la actualizacion de
+# los pesos es una sola pasada sobre todo el array.
+
+class Net:
+
+    # params: pesos ya entrenados (array('d') con la disposicion de arriba),
+    # por ejemplo al cargar un modelo guardado; si no se dan, se inicializan
+    def __init__(self, layers, activation="sigmoid", params=None):
+        if not isinstance(layers, (list, tuple)) or len(layers) < 2:
+            raise ValueError("create_net espera una lista con al menos dos tamanos de capa")
+        if any(int(n) != n or n < 1 for n in layers):
+            raise ValueError("los tamanos de capa deben ser enteros >= 1")
+        if activation not in _ACTIVATIONS:
+            raise ValueError(f"Activacion desconocida: {activation} "
+                             f"(opciones: {', '.join(_ACTIVATIONS)})")
+        self.layers = [int(n) for n in layers]
+        self.activation = activation
+        self.softmax = self.layers[-1] > 1
+
+        # (inicio de W, inicio de b) de cada capa dentro de params
+        self.offsets = []
+        size = 0
+        for n_in, n_out in zip(self.layers, self.layers[1:]):
+            self.offsets.append((size, size + n_out * n_in))
+            size += n_out * (n_in + 1)
+        if params is None:
+            self.params = array('d', bytes(8 * size))
+            self._init_weights()
+        else:
+            if len(params) != size:
+                raise ValueError(f"la red necesita {size} parametros, se dieron {len(params)}")
+            self.params = array('d', params)
+
+        # perdida media por epoca del ultimo entrenamiento
+        self.loss_history = []
+
+    # Inicializacion determinista (sin random): generador congruencial con
+    # semilla fija, valores en [-1, 1] escalados por 1 / sqrt(entradas).
+    # Los bias empiezan en 0
+    def _init_weights(self):
+        state = 12345
+        for W, _ in self.layer_views():
+            scale = 1.0 / sqrt(W.cols)
+            for i in range(W.rows):
+                for j in range(W.cols):
+                    state = (state * 1103515245 + 12345) % 2147483648
+                    W[i, j] = scale * (2.0 * state / 2147483648 - 1.0)
+
+    # (W, b) de cada capa como vistas sobre params: W es n_out x n_in y b una
+    # fila de n_out
+    def layer_views(self):
+        views = []
+        for (w_off, b_off), n_in, n_out in zip(self.offsets, self.layers, self.layers[1:]):
+            views.append((Matrix.Matrix(n_out, n_in, self.params, w_off),
+                          Matrix.Matrix(1, n_out, self.params, b_off)))
+        return views
+
+    # ----------------- Datos -----------------
+
+    def _inputs(self, X):
+        return _input_matrix(X, self.layers[0])
+
+    # Y: con softmax, indice de clase (0..salidas-1) o lista de salidas por
+    # ejemplo; con una sola salida, 0/1 (o un numero) por ejemplo
+    def _targets(self, Y, n):
+        if len(Y) != n:
+            raise ValueError("X e Y deben tener la misma cantidad de ejemplos")
+        out = self.layers[-1]
+        data = array('d')
+        for y in Y:
+            if isinstance(y, list):
+                if len(y) != out:
+                    raise ValueError(f"cada salida esperada debe tener {out} valores")
+                data.extend(float(v) for v in y)
+            elif self.softmax:
+                if int(y) != y or not 0 <= y < out:
+                    raise ValueError(f"clase fuera de rango: {y} (hay {out} clases)")
+                row = [0.0] * out
+                row[int(y)] = 1.0
+                data.extend(row)
+            else:
+                data.append(float(y))
+        return Matrix.Matrix(n, out, data)
+
+    # ----------------- Forward -----------------
+
+    # Propaga un lote (Matrix: una fila por ejemplo). Devuelve la activacion
+    # de cada capa, empezando por la propia entrada
+    def _forward(self, A):
+        f, _ = _ACTIVATIONS[self.activation]
+        views = self.layer_views()
+        acts = [A]
+        for l, (W, b) in enumerate(views):
+            Z = Matrix.mat_mul(acts[-1], W.T)
+            zs = [z + bj for z, bj in zip(Z.flat(), cycle(b.flat()))]
+            if l < len(views) - 1:
+                values = f(zs)
+            elif self.softmax:
+                values = _softmax_rows(zs, Z.cols)
+            else:
+                values = _sigmoid_vec(zs)
+            acts.append(Matrix.Matrix(Z.rows, Z.cols, array('d', values)))
+        return acts
+
+    # ----------------- Entrenamiento -----------------
+    # Descenso por gradiente por lotes de batch_size ejemplos consecutivos
+    # (None o 0 = ejemplo a ejemplo), promediando el gradiente de cada lote.
+    # tolerance, patience y schedule como en MLP.train (ver _Plan); la
+    # perdida es la entropia cruzada, promedio por ejemplo
+
+    def train(self, X, Y, lr=0.1, epochs=1000, batch_size=None,
+              tolerance=None, patience=None, schedule=None):
+        Xm = self._inputs(X)
+        Ym = self._targets(Y, Xm.rows)
+        batch_size = _check_batch_size(batch_size) or 1
+        plan = _Plan(lr, epochs, tolerance, patience, schedule)
+
+        fast = Backend.accelerated()
+        if fast is not None:
+            fast.net_train(self, Xm, Ym, plan, batch_size)
+        elif ParallelModels.enabled_for_training(batch_size):
+            ParallelModels.train_net(self, Xm, Ym, plan, batch_size)
         else:
-            ys.append(out)
-    return ys
+            self._train_batches(Xm, Ym, plan, batch_size)
+        self.loss_history = plan.history
+
+    def _train_batches(self, Xm, Ym, plan, batch_size):
+        sub = operator.sub
+        mul = operator.mul
+
+        # los lotes son vistas (filas consecutivas) de X e Y, sin copiar
+        batches = []
+        xs = Xm.flat()
+        for start in range(0, Xm.rows, batch_size):
+            n = min(batch_size, Xm.rows - start)
+            batches.append((Matrix.Matrix(n, Xm.cols, xs, start * Xm.cols),
+                            Matrix.Matrix(n, Ym.cols, Ym.data, start * Ym.cols)))
+
+        for lr in plan:
+            loss = 0.0
+            for Xb, Yb in batches:
+                grads, batch_loss = self._gradient(Xb, Yb)
+                loss += batch_loss
+                # todos los parametros en una sola pasada
+                step = lr / Xb.rows
+                self.params[:] = array('d', map(sub, self.params, map(mul, grads, repeat(step))))
+            plan.record(loss / max(Xm.rows, 1))
+
+    # Entropia cruzada de las salidas A respecto de Yb, sumada sobre las filas
+    def _cross_entropy(self, A, Yb):
+        ys = Yb.flat()
+        if self.softmax:
+            return -sum(map(operator.mul, ys, log([max(a, _TINY) for a in A.data])))
+        return -sum([y * log(max(a, _TINY)) + (1.0 - y) * log(max(1.0 - a, _TINY))
+                     for a, y in zip(A.data, ys)])
+
+    # Suma de los gradientes de las filas de Xb (con la misma disposicion que
+    # params) con los parametros actuales, y la perdida de esas filas, sin
+    # modificar la red
+    def _gradient(self, Xb, Yb):
+        _, grad = _ACTIVATIONS[self.activation]
+        views = self.layer_views()
+        grads = array('d', bytes(8 * len(self.params)))
+        acts = self._forward(Xb)
+
+        # sigmoide o softmax con entropia cruzada: dL/dz = a - y
+        delta = Matrix.Matrix(Yb.rows, Yb.cols, array('d', map(operator.sub, acts[-1].data, Yb.flat())))
+        for l in range(len(views) - 1, -1, -1):
+            W, _ = views[l]
+            w_off, b_off = self.offsets[l]
+            grads[w_off:b_off] = Matrix.mat_mul(delta.T, acts[l]).flat()
+            grads[b_off:b_off + W.rows] = array('d', _col_sums(delta))
+            if l > 0:
+                G = Matrix.mat_mul(delta, W)
+                delta = Matrix.Matrix(G.rows, G.cols, array('d', map(
+                    operator.mul, G.flat(), grad(acts[l].data))))
+        return grads, self._cross_entropy(acts[-1], Yb)
+
+    # ----------------- Prediccion -----------------
+
+    # Salidas de la red: una lista de probabilidades por ejemplo (softmax) o
+    # un numero por ejemplo (una sola salida)
+    def predict_real(self, X):
+        out = _predict_outputs(self, self._inputs(X), self.layers[-1])
+        if self.softmax:
+            return out.tolist()
+        return out.flat().tolist()
+
+    # Salidas para un lote, sin modificar la red
+    def _outputs(self, Xm):
+        fast = Backend.accelerated()
+        if fast is not None:
+            return fast.net_outputs(self, Xm)
+        return self._forward(Xm)[-1]
+
+    # Clase de cada ejemplo: la de mayor probabilidad (softmax) o 0/1
+    def predict(self, X):
+        if self.softmax:
+            return [row.index(max(row)) for row in self.predict_real(X)]
+        return [1 if v >= 0.5 else 0 for v in self.predict_real(X)]
+
+    def __repr__(self):
+        return f"<Net {'-'.join(map(str, self.layers))} {self.activation}>"
 
 
 # ----------------- Funciones para el lenguaje -----------------
@@ -250,8 +722,10 @@ def create_mlp(input_dim, hidden_dim, output_dim):
     return MLP(input_dim, hidden_dim, output_dim)
 
 
-def train_mlp(model, X, Y, lr, epochs):
-    model.train(X, Y, lr, epochs)
+# batch_size 0 = ejemplo a ejemplo; tolerance, patience, schedule: ver _Plan
+def train_mlp(model, X, Y, lr, epochs, batch_size=None,
+              tolerance=None, patience=None, schedule=None):
+    model.train(X, Y, lr, epochs, batch_size, tolerance, patience, schedule)
     return model
 
 
@@ -261,3 +735,29 @@ def classify_mlp(model, X):
 
 def predict_mlp(model, X):
     return model.predict(X)
+
+
+# layers: [entradas, oculta1, ..., salidas]; activation: "sigmoid", "tanh"
+# o "relu" (capas ocultas)
+def create_net(layers, activation="sigmoid"):
+    return Net(layers, activation)
+
+
+def train_net(net, X, Y, lr, epochs, batch_size=None,
+              tolerance=None, patience=None, schedule=None):
+    net.train(X, Y, lr, epochs, batch_size, tolerance, patience, schedule)
+    return net
+
+
+def predict_net(net, X):
+    return net.predict(X)
+
+
+def predict_real_net(net, X):
+    return net.predict_real(X)
+
+
+# Perdida media de cada epoca del ultimo entrenamiento (MLP o Net); si
+# hubo parada temprana tiene menos valores que epochs
+def loss_history(model):
+    return list(model.loss_history)
@@ -1,21 +1,139 @@
 PI = 3.141592653589793
 E  = 2.718281828459045
 
+# sin, cos, tan, sqrt, exp, log y potencia aceptan tambien listas (de numeros o de filas)
+# y matrices, y se aplican elemento a elemento: sin([0, 1, 2]) devuelve una
+# lista y sin(A) una Matrix. Con listas la reduccion de rango y los polinomios
+# se evaluan en una sola pasada, en lugar de una llamada por elemento.
+#
+# Las funciones trascendentes comparten el mismo esquema: tablas de
+# coeficientes calculadas al cargar el modulo, reduccion de rango en O(1)
+# (x = k c + r con r pequeno) y un polinomio corto en r. El error frente al
+# modulo math de Python es de 1 o 2 unidades en el ultimo digito; sin, cos y
+# tan con argumentos grandes usan una reduccion exacta con enteros (ver
+# _reduce_exact), asi que la precision no depende de |x|.
+
+from array import array
+from itertools import repeat
+import operator
+import struct
+from decimal import Decimal, localcontext
+
+import Matrix
+
+
+# Funciones que DLang expone como internas (Builtins.py registra solo estas)
+DL_BUILTINS = [
+    'sin', 'cos', 'tan', 'sqrt', 'exp', 'log', 'factorial', 'binomial', 'potencia',
+    'reducir_angulo',
+]
+
+
+# Tabla de factoriales ya calculados: _FACTORIALS[n] = n!. Crece a medida
+# que se piden valores mayores, hasta _FACTORIAL_MEMO entradas (guardar todos
+# los factoriales enormes ocuparia demasiada memoria); mas alla se sigue
+# multiplicando desde el ultimo guardado
+_FACTORIAL_MEMO = 1024
+_FACTORIALS = [1, 1]
+
 
 def factorial(n):
     n = int(n)
     if n < 0:
         raise ValueError("factorial indefinido para n < 0")
-    res = 1
-    for i in range(2, n + 1):
+    table = _FACTORIALS
+    if n < len(table):
+        return table[n]
+    res = table[-1]
+    for i in range(len(table), n + 1):
         res *= i
+        if i < _FACTORIAL_MEMO:
+            table.append(res)
     return res
 
 
+# Coeficiente binomial C(n, k) exacto (entero); 0 si k > n
+def binomial(n, k):
+    if int(n) != n or int(k) != k:
+        raise ValueError("binomial espera enteros")
+    n = int(n)
+    k = int(k)
+    if n < 0 or k < 0:
+        raise ValueError("binomial indefinido para n < 0 o k < 0")
+    if k > n:
+        return 0
+    if n < len(_FACTORIALS):
+        return _FACTORIALS[n] // (_FACTORIALS[k] * _FACTORIALS[n - k])
+    k = min(k, n - k)
+    res = 1
+    for i in range(k):
+        res = res * (n - i) // (i + 1)
+    return res
+
+
+# ----------------- Tablas y constantes -----------------
+# Todo se calcula una sola vez al cargar el modulo.
+#
+# Coeficientes de Taylor:
+#   sin(r) = r * (s0 + s1 r^2 + s2 r^4 + ...),  sk = (-1)^k / (2k+1)!
+#   cos(r) =      c0 + c1 r^2 + c2 r^4 + ...,   ck = (-1)^k / (2k)!
+#   e^r    = 1 + r + r^2/2! + ...
+#   ln(m)  = 2 s (1 + s^2/3 + s^4/5 + ...),     s = (m - 1) / (m + 1)
+# Con |r| <= pi/4 bastan 8 y 9 terminos para la precision del double
+_SIN_COEFS = tuple((-1) ** k / factorial(2 * k + 1) for k in range(8))
+_COS_COEFS = tuple((-1) ** k / factorial(2 * k) for k in range(9))
+_EXP_COEFS = tuple(1.0 / factorial(k) for k in range(7))
+_LOG_COEFS = tuple(1.0 / (2 * k + 1) for k in range(12))
+
+
+# Separa c en tres partes (Cody-Waite): hi con pocos bits significativos, de
+# modo que n * hi es exacto para n grande, mid el resto del double y tail la
+# diferencia entre el double y el valor real
+def _split(c, tail, bits):
+    scale = 2.0 ** bits
+    hi = int(c * scale) / scale
+    return hi, c - hi, tail
+
+
+# pi/2 = 1.5707963267948966 + 6.123233995736766e-17
+_PIO2 = PI / 2
+_PIO2_HI, _PIO2_MID, _PIO2_TAIL = _split(_PIO2, 6.123233995736766e-17, 20)
+_TWO_OVER_PI = 2 / PI
+_INV_TWO_PI = 1 / (2 * PI)
+
+# ln(2) = 0.6931471805599453 + 2.3190468138462996e-17
+LN2 = 0.6931471805599453
+_LN2_HI, _LN2_MID, _LN2_TAIL = _split(LN2, 2.3190468138462996e-17, 40)
+_SQRT2 = 1.4142135623730951
+
+# Fuera de este rango e^x no es representable (inf / 0.0)
+_EXP_MAX = 709.782712893384
+_EXP_MIN = -745.1332191019412
+
+
+# ----------------- Elemento a elemento -----------------
+
+def _is_vector(x):
+    return isinstance(x, (list, Matrix.Matrix))
+
+
+# Aplica vector_fn (lista de numeros -> lista de resultados) a una lista, una
+# lista de filas o una Matrix, conservando su forma
+def _apply(x, vector_fn):
+    if isinstance(x, Matrix.Matrix):
+        return Matrix.Matrix(x.rows, x.cols, array('d', vector_fn(x.flat())))
+    if x and all(isinstance(v, list) for v in x):
+        return [_apply(row, vector_fn) for row in x]
+    return vector_fn(x)
+
+
 # Potencia x^y.
-# Para enteros usa multiplicación repetida, para otros casos usa el operador ** de Python
+# Para enteros usa cuadrados sucesivos (O(log y) multiplicaciones; exacto con
+# enteros grandes), para otros casos usa el operador ** de Python
 def potencia(x, y):
-    
+    if _is_vector(x):
+        return _apply(x, lambda xs: [potencia(v, y) for v in xs])
+
     # si y es entero
     if int(y) == y:
         y = int(y)
@@ -24,61 +142,275 @@ def potencia(x, y):
         if y < 0:
             return 1 / potencia(x, -y)
         res = 1
-        for _ in range(y):
-            res *= x
-        return res
+        while True:
+            if y & 1:
+                res *= x
+            y >>= 1
+            if not y:
+                return res
+            x *= x
     else:
         return x ** y
 
+# ----------------- Reduccion de rango -----------------
+# x = k (pi/2) + r con |r| <= pi/4.
+#  - |x| <= _REDUCE_ONE_PASS: en O(1), restando k * pi/2 en tres partes
+#    (Cody-Waite). Solo es exacto mientras k * _PIO2_HI y k * _PIO2_MID no
+#    pierden bits, es decir con k chico.
+#  - |x| mayor: reduccion exacta con enteros (_reduce_exact).
+
+_REDUCE_ONE_PASS = 2.0 ** 20
+
+
+# pi con bits fraccionarios, calculado con enteros (formula de Machin:
+# pi = 16 atan(1/5) - 4 atan(1/239))
+def _pi_fixed(bits):
+    one = 1 << (bits + 16)
+
+    def atan_inv(n):
+        total = term = one // n
+        n2 = n * n
+        k = 1
+        while term:
+            term //= n2
+            k += 2
+            total += -(term // k) if k & 2 else term // k
+        return total
+
+    return (16 * atan_inv(5) - 4 * atan_inv(239)) >> 16
+
+
+# 2/pi y pi/2 en punto fijo con _FIXED_BITS bits fraccionarios. Un double
+# llega hasta 2^1024 y un x de ese tamano puede quedar a ~2^-62 de un multiplo
+# de pi/2: con 1200 bits el resto r conserva todos sus digitos
+_FIXED_BITS = 1200
+_PI_FIXED = _pi_fixed(_FIXED_BITS + 64)
+_TWO_OVER_PI_FIXED = (1 << (2 * (_FIXED_BITS + 64) + 1)) // _PI_FIXED >> 64
+_PIO2_FIXED = _PI_FIXED >> 65
+
+
+# Reduccion exacta (al estilo Payne-Hanek, con enteros de Python): x es
+# p / 2^s con p entero, asi que x * (2/pi) en punto fijo es un producto de
+# enteros. k es la parte entera redondeada y la fraccion, multiplicada por
+# pi/2 (tambien en punto fijo), da r con un solo redondeo al final.
+# quarters = 4 reduce por 2 pi en lugar de pi/2 (reducir_angulo)
+def _reduce_exact(x, name, quarters=1):
+    try:
+        p, q = x.as_integer_ratio()
+    except (OverflowError, ValueError):
+        raise ValueError(f"{name} indefinido para x = {x}") from None
+    shift = _FIXED_BITS + q.bit_length() - 1 + (quarters.bit_length() - 1)
+    prod = p * _TWO_OVER_PI_FIXED
+    k = (prod + (1 << (shift - 1))) >> shift
+    frac = prod - (k << shift)
+    return k, frac * _PIO2_FIXED * quarters / (1 << (shift + _FIXED_BITS))
+
+
+def _reduce_quadrant(x, name):
+    if not abs(x) <= _REDUCE_ONE_PASS:
+        return _reduce_exact(x, name)
+    k = round(x * _TWO_OVER_PI)
+    return k, ((x - k * _PIO2_HI) - k * _PIO2_MID) - k * _PIO2_TAIL
+
+
 # Reduce x al rango [-PI, PI] para mejor precision
 def reducir_angulo(x):
-    while x > PI:
-        x -= 2 * PI
-    while x < -PI:
-        x += 2 * PI
-    return x
+    x = float(x)
+    if not abs(x) <= _REDUCE_ONE_PASS:
+        return _reduce_exact(x, "reducir_angulo", 4)[1]
+    k = round(x * _INV_TWO_PI)
+    # 2 pi = 4 (pi/2): multiplicar las tres partes por 4 es exacto
+    return ((x - k * 4 * _PIO2_HI) - k * 4 * _PIO2_MID) - k * 4 * _PIO2_TAIL
+
+
+# Reduccion de todos los elementos en una sola pasada; los argumentos grandes
+# (e inf / nan, que dan error) se reducen uno a uno con _reduce_exact
+
+
+def _reduce_quadrants(xs, name):
+    xs = [float(v) for v in xs]
+    if not xs or max(map(abs, xs)) <= _REDUCE_ONE_PASS:
+        try:
+            ks = list(map(round, map(operator.mul, xs, repeat(_TWO_OVER_PI))))
+        except ValueError:
+            pass    # algun nan
+        else:
+            hi, mid, tail = _PIO2_HI, _PIO2_MID, _PIO2_TAIL
+            rs = [((x - k * hi) - k * mid) - k * tail for x, k in zip(xs, ks)]
+            return ks, rs
+    pairs = [_reduce_quadrant(v, name) for v in xs]
+    return [k for k, _ in pairs], [r for _, r in pairs]
+
+
+# sin de cada elemento a partir de r (|r| <= pi/4) y del cuadrante q:
+#   q = 0: sin r    q = 1: cos r    q = 2: -sin r    q = 3: -cos r
+# cos(x) = sin(x + pi/2) es el mismo calculo con el cuadrante desplazado en 1.
+# Los polinomios van desarrollados (Horner) con los coeficientes de las tablas
+def _sin_quadrants(xs, name, shift):
+    ks, rs = _reduce_quadrants(xs, name)
+    s0, s1, s2, s3, s4, s5, s6, s7 = _SIN_COEFS
+    c0, c1, c2, c3, c4, c5, c6, c7, c8 = _COS_COEFS
+    out = []
+    append = out.append
+    for k, r in zip(ks, rs):
+        q = (k + shift) & 3
+        t = r * r
+        if q & 1:
+            v = c0 + t * (c1 + t * (c2 + t * (c3 + t * (c4 + t * (c5 + t * (c6 + t * (c7 + t * c8)))))))
+        else:
+            v = r * (s0 + t * (s1 + t * (s2 + t * (s3 + t * (s4 + t * (s5 + t * (s6 + t * s7)))))))
+        append(-v if q & 2 else v)
+    return out
+
+
+def _sin_vec(xs):
+    return _sin_quadrants(xs, "sin", 0)
+
+
+def _cos_vec(xs):
+    return _sin_quadrants(xs, "cos", 1)
+
 
 # Aproximacion de sin(x) usando serie de Taylor x en radianes
 def sin(x):
-    x = float(x)
-    x = reducir_angulo(x)
-
-    terms = 10  # mas terminos = mas precision
-    res = 0.0
-    for k in range(terms):
-        num = potencia(-1, k) * potencia(x, 2 * k + 1)
-        den = factorial(2 * k + 1)
-        res += num / den
-    return res
+    if _is_vector(x):
+        return _apply(x, _sin_vec)
+    return _sin_vec([x])[0]
 
 # Aproximacion de cos(x) usando serie de Taylor
 def cos(x):
-    x = float(x)
-    x = reducir_angulo(x)
-
-    terms = 10
-    res = 0.0
-    for k in range(terms):
-        num = potencia(-1, k) * potencia(x, 2 * k)
-        den = factorial(2 * k)
-        res += num / den
-    return res
+    if _is_vector(x):
+        return _apply(x, _cos_vec)
+    return _cos_vec([x])[0]
 
 
-def tan(x):
-    c = cos(x)
-    if c == 0:
+def _tan_vec(xs):
+    cs = _cos_vec(xs)
+    if 0.0 in cs:
         raise ZeroDivisionError("tan indefinido para cos(x) = 0")
-    return sin(x) / c
+    return list(map(operator.truediv, _sin_vec(xs), cs))
 
-# Raíz cuadrada por metodo de Newton-Raphson
-def sqrt(x):
-    x = float(x)
-    if x < 0:
+
+def tan(x):
+    if _is_vector(x):
+        return _apply(x, _tan_vec)
+    return _tan_vec([x])[0]
+
+
+# Raíz cuadrada por metodo de Newton-Raphson (20 iteraciones, todas las
+# componentes a la vez)
+def _sqrt_vec(xs):
+    xs = [float(v) for v in xs]
+    if any(v < 0 for v in xs):
         raise ValueError("sqrt indefinido para x < 0")
-    if x == 0:
-        return 0.0
-    guess = x / 2.0
+    # los ceros arrancan en 1 para no dividir por 0 y se corrigen al final
+    guess = [v / 2.0 if v != 0.0 else 1.0 for v in xs]
+    mul = operator.mul
+    add = operator.add
     for _ in range(20):
-        guess = 0.5 * (guess + x / guess)
-    return guess
+        guess = list(map(mul, repeat(0.5), map(add, guess, map(operator.truediv, xs, guess))))
+    return [g if v != 0.0 else 0.0 for v, g in zip(xs, guess)]
+
+
+def sqrt(x):
+    if _is_vector(x):
+        return _apply(x, _sqrt_vec)
+    return _sqrt_vec([x])[0]
+
+
+# ----------------- Exponencial y logaritmo -----------------
+
+# Potencias de dos exactas: _POW2[k + 1022] = 2^k para los exponentes normales
+_POW2_MIN = -1022
+_POW2 = tuple(2.0 ** k for k in range(_POW2_MIN, 1024))
+
+# e^x = 2^m 2^(j/32) e^r: la tabla guarda 2^(j/32) y el resto es |r| <= ln2/64,
+# donde bastan 7 terminos de la serie
+_EXP_TABLE_BITS = 5
+_EXP_TABLE_SIZE = 1 << _EXP_TABLE_BITS
+
+
+# 2^(j/32) = hi + lo con 40 digitos (decimal), asi el error de redondear la
+# tabla no se suma al del resultado
+def _exp_table():
+    with localcontext() as ctx:
+        ctx.prec = 40
+        for j in range(_EXP_TABLE_SIZE):
+            d = Decimal(2) ** (Decimal(j) / _EXP_TABLE_SIZE)
+            hi = float(d)
+            yield hi, float(d - Decimal(hi))
+
+
+_EXP_TABLE = tuple(_exp_table())
+_LN2_N_HI, _LN2_N_MID, _LN2_N_TAIL = _split(LN2 / _EXP_TABLE_SIZE, 2.3190468138462996e-17 / _EXP_TABLE_SIZE, 32)
+_INV_LN2_N = _EXP_TABLE_SIZE / LN2
+
+
+# Un solo bucle para toda la lista, con el polinomio desarrollado (Horner)
+def _exp_vec(xs):
+    hi, mid, tail = _LN2_N_HI, _LN2_N_MID, _LN2_N_TAIL
+    c1, c2, c3, c4, c5, c6 = _EXP_COEFS[1:7]
+    table = _EXP_TABLE
+    pow2 = _POW2
+    out = []
+    append = out.append
+    for x in xs:
+        x = float(x)
+        if not _EXP_MIN <= x <= _EXP_MAX:
+            # fuera de rango (inf / 0.0) o NaN
+            append(float("inf") if x > _EXP_MAX else 0.0 if x < _EXP_MIN else x)
+            continue
+        k = round(x * _INV_LN2_N)
+        r = ((x - k * hi) - k * mid) - k * tail
+        t_hi, t_lo = table[k & 31]
+        q = r * (c1 + r * (c2 + r * (c3 + r * (c4 + r * (c5 + r * c6)))))  # e^r - 1
+        p = t_hi + (t_lo + t_hi * q)
+        m = k >> _EXP_TABLE_BITS
+        if _POW2_MIN <= m < 1024:
+            append(p * pow2[m - _POW2_MIN])
+        elif m > 0:
+            # m = 1024 (x cerca de _EXP_MAX): 2^m no es representable
+            append(p * 2.0 * pow2[m - 1 - _POW2_MIN])
+        else:
+            # resultado subnormal: 2^m en dos pasos para no perder el rango
+            append(p * pow2[m + 54 - _POW2_MIN] * 2.0 ** -54)
+    return out
+
+
+# ln x = e ln2 + ln m con x = m 2^e, m en [sqrt(1/2), sqrt(2)]
+def _log1(x):
+    x = float(x)
+    if not x > 0:
+        raise ValueError("log indefinido para x <= 0")
+    if x == float("inf"):
+        return x
+    bits = struct.unpack('<q', struct.pack('<d', x))[0]
+    e = (bits >> 52) & 0x7ff
+    if e == 0:
+        # subnormal: se escala a un numero normal
+        return _log1(x * 2.0 ** 54) - 54 * LN2
+    m = struct.unpack('<d', struct.pack('<q', (bits & 0xfffffffffffff) | (1023 << 52)))[0]
+    e -= 1023
+    if m > _SQRT2:
+        m /= 2
+        e += 1
+    s = (m - 1.0) / (m + 1.0)
+    s2 = s * s
+    res = _LOG_COEFS[-1]
+    for c in _LOG_COEFS[-2::-1]:
+        res = res * s2 + c
+    return e * _LN2_HI + (e * (_LN2_MID + _LN2_TAIL) + 2.0 * s * res)
+
+
+# e^x
+def exp(x):
+    if _is_vector(x):
+        return _apply(x, _exp_vec)
+    return _exp_vec([x])[0]
+
+
+# Logaritmo natural
+def log(x):
+    if _is_vector(x):
+        return _apply(x, lambda xs: list(map(_log1, xs)))
+    return _log1(x)
@@ -1,5 +1,13 @@
 #MyPlot.py
 
+
+# Funciones que DLang expone como internas (Builtins.py registra solo estas)
+DL_BUILTINS = [
+    'figure', 'plot', 'scatter', 'title', 'xlabel', 'ylabel', 'show', 'clf',
+    'close',
+]
+
+
 class Figure:    
     def __init__(self, figsize=(50, 15)):
         self.width = figsize[0]
@@ -1,5 +1,18 @@
 # MyRegression.py
-# Regresión lineal simple (y = m*x + b)
+# Regresión lineal simple (y = m*x + b) y regresión múltiple incremental
+
+from array import array
+
+import Matrix
+import MyFile
+
+
+# Funciones que DLang expone como internas (Builtins.py registra solo estas)
+DL_BUILTINS = [
+    'regresion_lineal', 'predecir_lineal', 'crear_regresion', 'ajustar_parcial',
+    'ajustar_archivo', 'combinar_regresion', 'coeficientes_regresion',
+    'predecir_regresion',
+]
 
 # Calcula la recta y=m*x+b que mejor se ajusta a los puntos (xs,ys) en el sentido de minimos cuadrados
 # Devuelve (m,b)
@@ -46,3 +59,196 @@ def predecir_lineal(xs, params):
         x = float(x)
         ys_pred.append(m * x + b)
     return ys_pred
+
+
+# ----------------- Regresion multiple incremental -----------------
+# y = w1*x1 + ... + wd*xd + b por minimos cuadrados, sin tener todos los datos
+# a la vez: los ejemplos se acumulan por partes (listas o archivos) y solo se
+# guardan estadisticos suficientes de tamano fijo:
+#   n        cantidad de ejemplos
+#   mean_x   promedio de cada variable, mean_y promedio de y
+#   sxx      sum (x - mean_x)(x - mean_x)^T   (d x d)
+#   sxy      sum (x - mean_x)(y - mean_y)     (d)
+# Se guardan centrados (en vez de sum x, sum xy, X^T X, X^T y crudos) para
+# que datos con promedio grande no pierdan precision al restar sumas enormes.
+# Dos ajustes parciales (por ejemplo de particiones procesadas por separado)
+# se combinan exactamente con merge. Los coeficientes salen de las ecuaciones
+# normales sxx w = sxy, resueltas con la factorizacion LU de Matrix.py, y
+# b = mean_y - w . mean_x
+
+CHUNK_ROWS = 4096   # ejemplos por bloque al acumular
+
+
+class LinearRegressor:
+
+    def __init__(self, num_features=1):
+        if int(num_features) != num_features or num_features < 1:
+            raise ValueError("la cantidad de variables debe ser un entero >= 1")
+        d = int(num_features)
+        self.num_features = d
+        self.n = 0
+        self.mean_x = [0.0] * d
+        self.mean_y = 0.0
+        self.sxx = [[0.0] * d for _ in range(d)]
+        self.sxy = [0.0] * d
+
+    # Ejemplos como filas de floats: xs es una lista de filas (o de numeros,
+    # con una sola variable)
+    def _rows(self, xs):
+        d = self.num_features
+        rows = []
+        for x in xs:
+            row = [float(v) for v in x] if isinstance(x, (list, tuple)) else [float(x)]
+            if len(row) != d:
+                raise ValueError(f"cada ejemplo debe tener {d} variables")
+            rows.append(row)
+        return rows
+
+    # Agrega los ejemplos (xs, ys) a los estadisticos
+    def partial_fit(self, xs, ys):
+        if isinstance(xs, Matrix.Matrix):
+            xs = xs.tolist()
+        if len(xs) != len(ys):
+            raise ValueError("xs y ys deben tener la misma longitud")
+        for start in range(0, len(xs), CHUNK_ROWS):
+            rows = self._rows(xs[start:start + CHUNK_ROWS])
+            self._add_chunk(rows, [float(y) for y in ys[start:start + CHUNK_ROWS]])
+        return self
+
+    # Estadisticos de un bloque en memoria y combinacion con los acumulados
+    def _add_chunk(self, rows, ys):
+        m, d = len(rows), self.num_features
+        if m == 0:
+            return
+        mean_x = [s / m for s in map(sum, zip(*rows))]
+        mean_y = sum(ys) / m
+        Xc = Matrix.Matrix(m, d, array('d', [v - mu for row in rows for v, mu in zip(row, mean_x)]))
+        yc = Matrix.Matrix(m, 1, array('d', [y - mean_y for y in ys]))
+        chunk = LinearRegressor(d)
+        chunk.n = m
+        chunk.mean_x = mean_x
+        chunk.mean_y = mean_y
+        chunk.sxx = Matrix.mat_mul(Xc.T, Xc).tolist()
+        chunk.sxy = Matrix.mat_mul(Xc.T, yc).flat().tolist()
+        self._absorb(chunk)
+
+    # Acumula los estadisticos de other en self (combinacion de Chan et al.:
+    # los momentos centrados de la union salen de los de cada parte y la
+    # diferencia de sus promedios)
+    def _absorb(self, other):
+        if other.n == 0:
+            return
+        if self.n == 0:
+            self.n = other.n
+            self.mean_x = list(other.mean_x)
+            self.mean_y = other.mean_y
+            self.sxx = [list(row) for row in other.sxx]
+            self.sxy = list(other.sxy)
+            return
+        n = self.n + other.n
+        f = self.n * other.n / n
+        dx = [b - a for a, b in zip(self.mean_x, other.mean_x)]
+        dy = other.mean_y - self.mean_y
+        self.sxx = [[s + t + f * di * dj for s, t, dj in zip(row_a, row_b, dx)]
+                    for row_a, row_b, di in zip(self.sxx, other.sxx, dx)]
+        self.sxy = [s + t + f * di * dy for s, t, di in zip(self.sxy, other.sxy, dx)]
+        self.mean_x = [a + di * other.n / n for a, di in zip(self.mean_x, dx)]
+        self.mean_y += dy * other.n / n
+        self.n = n
+
+    # Nuevo regresor con los ejemplos de self y de other
+    def merge(self, other):
+        if not isinstance(other, LinearRegressor) or other.num_features != self.num_features:
+            raise ValueError("solo se pueden combinar regresiones con la misma cantidad de variables")
+        out = LinearRegressor(self.num_features)
+        out._absorb(self)
+        out._absorb(other)
+        return out
+
+    # Lee ejemplos de un archivo de texto, una linea por ejemplo con las
+    # variables y al final y, separadas por comas o espacios. Si la ruta esta
+    # en el filesystem de MyFile se usa ese archivo; si no, se lee del disco
+    # linea a linea (el archivo no se carga entero). Se ignoran las lineas
+    # vacias, las que empiezan con # y una primera linea de encabezado
+    def fit_file(self, path):
+        if path in MyFile.FS:
+            self._fit_lines(MyFile.FS[path].split("\n"), path)
+            return self
+        try:
+            f = open(path)
+        except FileNotFoundError:
+            raise ValueError(f"Archivo no encontrado: {path}") from None
+        with f:
+            self._fit_lines(f, path)
+        return self
+
+    def _fit_lines(self, lines, path):
+        d = self.num_features
+        rows, ys = [], []
+        first = True
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                values = [float(v) for v in line.replace(",", " ").split()]
+            except ValueError:
+                if first:
+                    first = False
+                    continue
+                raise ValueError(f"Linea {number} invalida en {path}: {line}") from None
+            first = False
+            if len(values) != d + 1:
+                raise ValueError(f"Linea {number} de {path}: se esperaban {d + 1} valores")
+            rows.append(values[:d])
+            ys.append(values[d])
+            if len(rows) == CHUNK_ROWS:
+                self._add_chunk(rows, ys)
+                rows, ys = [], []
+        self._add_chunk(rows, ys)
+
+    # [w1, ..., wd, b]
+    def coefficients(self):
+        d = self.num_features
+        if self.n <= d:
+            raise ValueError(f"No se puede hacer regresion con {self.n} puntos y {d} variables")
+        F = Matrix.lu_factor(self.sxx)
+        if F.singular:
+            raise ValueError("No se puede hacer regresion (variables linealmente dependientes)")
+        w = F.solve_vector(self.sxy)
+        b = self.mean_y - sum(wi * mi for wi, mi in zip(w, self.mean_x))
+        return w + [b]
+
+    def predict(self, xs):
+        params = self.coefficients()
+        w, b = params[:-1], params[-1]
+        return [sum(wi * v for wi, v in zip(w, row)) + b for row in self._rows(xs)]
+
+    def __repr__(self):
+        return f"<LinearRegressor {self.num_features} variables, {self.n} ejemplos>"
+
+
+# Funciones para el lenguaje
+
+# Regresion incremental de num_features variables
+def crear_regresion(num_features=1):
+    return LinearRegressor(num_features)
+
+# Acumula los ejemplos (xs, ys): xs lista de filas (o de numeros con una variable)
+def ajustar_parcial(reg, xs, ys):
+    return reg.partial_fit(xs, ys)
+
+# Acumula los ejemplos de un archivo (ver LinearRegressor.fit_file)
+def ajustar_archivo(reg, path):
+    return reg.fit_file(path)
+
+# Regresion con los ejemplos de a y de b
+def combinar_regresion(a, b):
+    return a.merge(b)
+
+# Devuelve [w1, ..., wd, b]; con una variable es [m, b] como regresion_lineal
+def coeficientes_regresion(reg):
+    return reg.coefficients()
+
+def predecir_regresion(reg, xs):
+    return reg.predict(xs)
@@ -0,0 +1,252 @@
+# NumpyBackend.py
+# Versiones vectorizadas con NumPy de las operaciones pesadas de Matrix.py,
+# MyMLP.py y MyClusterNN.py. Solo se usan con el motor "numpy" (Backend.py).
+#
+# Cada funcion sigue el mismo algoritmo que su version en Python (mismo orden
+# de actualizaciones), asi los resultados coinciden con los del motor de
+# referencia salvo redondeo. test_numpy_backend.py lo comprueba.
+
+from array import array
+
+import numpy as np
+
+import Matrix
+
+
+# ----------------- Matrices -----------------
+
+def to_ndarray(A):
+    A = Matrix.as_matrix(A)
+    return np.frombuffer(A.flat(), dtype=np.float64).reshape(A.rows, A.cols)
+
+
+def from_ndarray(a):
+    data = array('d')
+    data.frombytes(np.ascontiguousarray(a, dtype=np.float64).tobytes())
+    return Matrix.Matrix(a.shape[0], a.shape[1], data)
+
+
+def mat_mul(A, B):
+    return from_ndarray(to_ndarray(A) @ to_ndarray(B))
+
+
+def mat_inverse(A):
+    try:
+        return from_ndarray(np.linalg.inv(to_ndarray(A)))
+    except np.linalg.LinAlgError:
+        raise ValueError("La matriz no es invertible (determinante = 0)") from None
+
+
+# ----------------- MLP -----------------
+
+def _sigmoid(z):
+    with np.errstate(over='ignore'):
+        return 1.0 / (1.0 + np.exp(-z))
+
+
+def _weights(model):
+    return (np.array(model.W1, dtype=np.float64), np.array(model.b1, dtype=np.float64),
+            np.array(model.W2, dtype=np.float64), np.array(model.b2, dtype=np.float64))
+
+
+def _store_weights(model, W1, b1, W2, b2):
+    model.W1 = W1.tolist()
+    model.b1 = b1.tolist()
+    model.W2 = W2.tolist()
+    model.b2 = b2.tolist()
+
+
+def mlp_forward(model, x):
+    W1, b1, W2, b2 = _weights(model)
+    xv = np.asarray(x, dtype=np.float64)
+    z1 = W1 @ xv + b1
+    h1 = _sigmoid(z1)
+    z2 = W2 @ h1 + b2
+    out = _sigmoid(z2)
+
+    model.last_x = x
+    model.last_z1 = z1.tolist()
+    model.last_h1 = h1.tolist()
+    model.last_z2 = z2.tolist()
+    model.last_out = out.tolist()
+    return model.last_out
+
+
+# Salidas de un lote (Matrix), sin modificar el modelo
+def mlp_outputs(model, Xm):
+    W1, b1, W2, b2 = _weights(model)
+    return from_ndarray(_sigmoid(_sigmoid(to_ndarray(Xm) @ W1.T + b1) @ W2.T + b2))
+
+
+# Descenso por gradiente ejemplo a ejemplo, igual que MLP.train, o por
+# mini-lotes si se da batch_size (igual que MLP._train_batches). Y: lista de
+# listas de output_dim; plan: tasa por epoca, historial de perdida y parada
+# temprana (MyMLP._Plan)
+def mlp_train(model, X, Y, plan, batch_size=None):
+    W1, b1, W2, b2 = _weights(model)
+    Xa = np.asarray([list(x) for x in X], dtype=np.float64)
+    Ya = np.asarray(Y, dtype=np.float64)
+    count = max(len(Xa), 1)
+
+    if batch_size is not None:
+        batches = [(Xa[s:s + batch_size], Ya[s:s + batch_size])
+                   for s in range(0, len(Xa), batch_size)]
+        for lr in plan:
+            loss = 0.0
+            for Xb, Yb in batches:
+                H1 = _sigmoid(Xb @ W1.T + b1)
+                Out = _sigmoid(H1 @ W2.T + b2)
+                loss += 0.5 * float(np.sum((Out - Yb) ** 2))
+                D2 = (Out - Yb) * Out * (1.0 - Out)
+                D1 = (D2 @ W2) * H1 * (1.0 - H1)
+                step = lr / len(Xb)
+                W2 -= step * (D2.T @ H1)
+                b2 -= step * D2.sum(axis=0)
+                W1 -= step * (D1.T @ Xb)
+                b1 -= step * D1.sum(axis=0)
+            plan.record(loss / count)
+        _store_weights(model, W1, b1, W2, b2)
+        return
+
+    for lr in plan:
+        loss = 0.0
+        for x, y in zip(Xa, Ya):
+            h1 = _sigmoid(W1 @ x + b1)
+            out = _sigmoid(W2 @ h1 + b2)
+            loss += 0.5 * float((out - y) @ (out - y))
+
+            d_z2 = (out - y) * out * (1.0 - out)
+            W2 -= lr * np.outer(d_z2, h1)
+            b2 -= lr * d_z2
+
+            # como en la version de Python, con W2 ya actualizada
+            d_z1 = (W2.T @ d_z2) * h1 * (1.0 - h1)
+            W1 -= lr * np.outer(d_z1, x)
+            b1 -= lr * d_z1
+        plan.record(loss / count)
+
+    _store_weights(model, W1, b1, W2, b2)
+
+
+# ----------------- Red por capas (MyMLP.Net) -----------------
+
+_NET_ACTIVATIONS = {
+    "sigmoid": (_sigmoid, lambda a: a * (1.0 - a)),
+    "tanh": (np.tanh, lambda a: 1.0 - a * a),
+    "relu": (lambda z: np.maximum(z, 0.0), lambda a: (a > 0.0).astype(np.float64)),
+}
+
+
+def _softmax(Z):
+    E = np.exp(Z - Z.max(axis=1, keepdims=True))
+    return E / E.sum(axis=1, keepdims=True)
+
+
+# Vistas (W, b) de cada capa sobre net.params, sin copiar: las
+# actualizaciones escriben directamente en el buffer de la red
+def _net_views(net):
+    P = np.frombuffer(net.params, dtype=np.float64)
+    views = []
+    for (w_off, b_off), n_in, n_out in zip(net.offsets, net.layers, net.layers[1:]):
+        views.append((P[w_off:b_off].reshape(n_out, n_in), P[b_off:b_off + n_out]))
+    return P, views
+
+
+def _net_forward(net, views, A):
+    f, _ = _NET_ACTIVATIONS[net.activation]
+    acts = [A]
+    for l, (W, b) in enumerate(views):
+        Z = acts[-1] @ W.T + b
+        if l < len(views) - 1:
+            acts.append(f(Z))
+        elif net.softmax:
+            acts.append(_softmax(Z))
+        else:
+            acts.append(_sigmoid(Z))
+    return acts
+
+
+def net_outputs(net, Xm):
+    return from_ndarray(_net_forward(net, _net_views(net)[1], to_ndarray(Xm))[-1])
+
+
+# Entropia cruzada de las salidas A respecto de Yb, sumada sobre las filas
+# (como Net._cross_entropy)
+def _cross_entropy(net, A, Yb):
+    tiny = 1e-300
+    if net.softmax:
+        return -float(np.sum(Yb * np.log(np.maximum(A, tiny))))
+    return -float(np.sum(Yb * np.log(np.maximum(A, tiny))
+                         + (1.0 - Yb) * np.log(np.maximum(1.0 - A, tiny))))
+
+
+# Mismo algoritmo que Net.train: gradiente promedio de cada lote y una sola
+# actualizacion de todos los parametros
+def net_train(net, X, Y, plan, batch_size):
+    _, grad = _NET_ACTIVATIONS[net.activation]
+    P, views = _net_views(net)
+    Xa = to_ndarray(X)
+    Ya = to_ndarray(Y)
+    G = np.zeros_like(P)
+    for lr in plan:
+        loss = 0.0
+        for s in range(0, len(Xa), batch_size):
+            Xb = Xa[s:s + batch_size]
+            Yb = Ya[s:s + batch_size]
+            acts = _net_forward(net, views, Xb)
+            loss += _cross_entropy(net, acts[-1], Yb)
+            delta = acts[-1] - Yb
+            for l in range(len(views) - 1, -1, -1):
+                W, _ = views[l]
+                w_off, b_off = net.offsets[l]
+                G[w_off:b_off] = (delta.T @ acts[l]).ravel()
+                G[b_off:b_off + W.shape[0]] = delta.sum(axis=0)
+                if l > 0:
+                    delta = (delta @ W) * grad(acts[l])
+            P -= (lr / len(Xb)) * G
+        plan.record(loss / max(len(Xa), 1))
+
+
+# ----------------- Red competitiva -----------------
+
+# Indice del centro mas cercano a x (en empate, el menor indice)
+def cluster_winner(model, x):
+    C = np.asarray(model.centers, dtype=np.float64)
+    d = C - np.asarray(x, dtype=np.float64)
+    return int(np.argmin(np.einsum('ij,ij->i', d, d)))
+
+
+def cluster_train(model, X, lr, epochs):
+    C = np.asarray(model.centers, dtype=np.float64)
+    Xa = np.asarray([list(x) for x in X], dtype=np.float64)
+    lr = float(lr)
+    for _ in range(int(epochs)):
+        for x in Xa:
+            d = C - x
+            j = np.argmin(np.einsum('ij,ij->i', d, d))
+            C[j] += lr * (x - C[j])
+    model.centers = C.tolist()
+
+
+# Como MyClusterNN._kmeans_sums: sumas y cantidad de ejemplos de cada centro
+# e inercia, para todas las filas de X (Matrix) o solo las de indices
+def kmeans_sums(centers, X, indices=None):
+    C = np.asarray(centers, dtype=np.float64)
+    Xa = to_ndarray(X)
+    if indices is not None:
+        Xa = Xa[np.asarray(indices, dtype=np.intp)]
+    k, dim = C.shape
+    labels = np.zeros(len(Xa), dtype=np.intp)
+    best = None
+    for j in range(k):
+        d = Xa - C[j]
+        dist = np.einsum('ij,ij->i', d, d)
+        if best is None:
+            best = dist
+        else:
+            # estrictamente menor: en empate gana el menor indice
+            closer = dist < best
+            labels[closer] = j
+            best = np.where(closer, dist, best)
+    sums = np.stack([np.bincount(labels, weights=Xa[:, i], minlength=k) for i in range(dim)], axis=1)
+    return sums.tolist(), np.bincount(labels, minlength=k).tolist(), float(best.sum())
@@ -0,0 +1,162 @@
+# Operators.py
+# Semantica de los operadores de DLang.
+# La comparten el interprete (EvalVisitor) y el compilador a closures (Compiler),
+# asi ambos motores dan exactamente los mismos resultados.
+
+import MyMath
+import Matrix
+
+
+# Verdad de un valor del lenguaje: 0, "", None y listas vacias son falsos
+def is_true(v):
+    if isinstance(v, (int, float)):
+        return v != 0
+    if isinstance(v, str):
+        return v != ""
+    if v is None:
+        return False
+    return bool(v)
+
+
+# ---------- Aritmetica ----------
+# Dos matrices (Matrix, SparseMatrix o literales de listas, que se
+# convierten) usan las operaciones de Matrix.py
+
+_MATRIX_TYPES = (list, Matrix.Matrix, Matrix.SparseMatrix)
+
+
+def op_add(left, right):
+    if isinstance(left, _MATRIX_TYPES) and isinstance(right, _MATRIX_TYPES):
+        return Matrix.mat_add(left, right)
+    return left + right
+
+
+def op_sub(left, right):
+    if isinstance(left, _MATRIX_TYPES) and isinstance(right, _MATRIX_TYPES):
+        return Matrix.mat_sub(left, right)
+    return left - right
+
+
+def op_mul(left, right):
+    if isinstance(left, _MATRIX_TYPES) and isinstance(right, _MATRIX_TYPES):
+        return Matrix.mat_mul(left, right)
+    return left * right
+
+
+def op_div(left, right):
+    return left / right
+
+
+def op_mod(left, right):
+    return left % right
+
+
+# Una matriz (Matrix, SparseMatrix o lista de filas) elevada a un entero es
+# la potencia de matrices (A ^ 3 = A * A * A); el resto, incluidas las listas
+# de numeros, usa potencia elemento a elemento
+def op_pow(base, expo):
+    if _is_matrix(base):
+        return Matrix.mat_pow(base, expo)
+    return MyMath.potencia(base, expo)
+
+
+def _is_matrix(v):
+    if isinstance(v, (Matrix.Matrix, Matrix.SparseMatrix)):
+        return True
+    return isinstance(v, list) and len(v) > 0 and all(isinstance(row, list) for row in v)
+
+
+# ---------- Unarios ----------
+
+def op_neg(v):
+    return -v
+
+
+def op_pos(v):
+    return +v
+
+
+def op_not(v):
+    return not is_true(v)
+
+
+# ---------- Relacionales ----------
+
+def op_eq(left, right):
+    return left == right
+
+
+def op_ne(left, right):
+    return left != right
+
+
+def op_lt(left, right):
+    return left < right
+
+
+def op_le(left, right):
+    return left <= right
+
+
+def op_gt(left, right):
+    return left > right
+
+
+def op_ge(left, right):
+    return left >= right
+
+
+# Tablas operador (texto de la gramatica) -> funcion
+ARITH_OPS = {
+    '+': op_add,
+    '-': op_sub,
+    '*': op_mul,
+    '/': op_div,
+    '%': op_mod,
+}
+
+REL_OPS = {
+    '==': op_eq,
+    '!=': op_ne,
+    '<': op_lt,
+    '<=': op_le,
+    '>': op_gt,
+    '>=': op_ge,
+}
+
+
+# ---------- Cadenas de sumas y restas ----------
+# a + b - c + ... con matrices densas se calcula en una sola pasada, sin
+# matrices intermedias (Matrix.mat_add_sub_chain). Los terminos llegan de uno
+# en uno (terms es un iterable perezoso de (operador, valor)), asi cada motor
+# los evalua en el mismo orden que sin fusionar. En cuanto aparece un termino
+# que no es una matriz densa se sigue de a pares con op_add / op_sub.
+
+_CHAIN_OPS = {'+': "add", '-': "sub"}
+
+
+def add_sub_chain(first, terms):
+    acc = first
+    matrices = [first] if Matrix.is_dense(first) else None
+    ops = []
+    for op, value in terms:
+        if matrices is not None:
+            if Matrix.is_dense(value):
+                matrices.append(value)
+                ops.append(op)
+                continue
+            acc = _flush_chain(matrices, ops)
+            matrices = None
+        acc = ARITH_OPS[op](acc, value)
+    if matrices is not None:
+        acc = _flush_chain(matrices, ops)
+    return acc
+
+
+def _flush_chain(matrices, ops):
+    if len(matrices) == 1:
+        return matrices[0]
+    if len(matrices) == 2:
+        # un solo paso: op_add / op_sub (que pueden usar varios procesos)
+        return ARITH_OPS[ops[0]](matrices[0], matrices[1])
+    return Matrix.mat_add_sub_chain(matrices, [_CHAIN_OPS[op] for op in ops])
@@ -0,0 +1,456 @@
+# Optimizer.py
+# Optimizacion del arbol de un programa DLang antes de compilarlo.
+#
+#  - Plegado de constantes: expresiones aritmeticas, relacionales y logicas
+#    con operandos constantes (2 + 3 * 5, "a" == "a", not true, ...) y
+#    llamadas a funciones internas puras con argumentos constantes (sqrt(2)).
+#    Se usan las mismas funciones que en ejecucion (Operators, MyMath), asi el
+#    resultado es identico al de evaluar la expresion en cada pasada.
+#  - Ramas muertas: un 'if' con condicion constante conserva solo el bloque que
+#    se ejecuta, y un 'while' con condicion falsa desaparece. El codigo de una
+#    rama muerta no se recorre, asi que tampoco se pliega nada dentro de ella.
+#  - Limites: no se pliegan resultados mayores que MAX_FOLD_BITS (enteros) o
+#    MAX_FOLD_CHARS (textos), ni operaciones que con seguridad los superan
+#    (2 ^ 100000, factorial(200000)); esas se calculan al ejecutar, como sin
+#    optimizar. Asi el plegado nunca hace mas lento un programa valido.
+#
+# El arbol de ANTLR no se modifica: el resultado son anotaciones por nodo que
+# consultan los compiladores (Compiler, VMCompiler). dump_program muestra el
+# programa optimizado como codigo DLang, para comparar con el original.
+
+import math
+from decimal import Decimal
+
+from DLangVisitor import DLangVisitor
+from DLangParser import DLangParser
+
+import Builtins
+from Operators import is_true, op_pow, op_mul, op_not, ARITH_OPS, REL_OPS
+
+
+# Resultado de una expresion que no es constante
+NOT_CONST = object()
+
+# Tamano maximo de una constante plegada
+MAX_FOLD_BITS = 4096        # enteros (unos 1230 digitos)
+MAX_FOLD_CHARS = 4096       # textos
+# Argumentos enteros mayores hacen que una funcion interna no se pliegue
+# (factorial, binomial y potencia crecen muy rapido con ellos)
+MAX_FOLD_INT_ARG = 10000
+
+
+# Solo se pliegan valores que se pueden volver a escribir como literal de DLang
+def _foldable(value):
+    if isinstance(value, bool):
+        return True
+    if isinstance(value, int):
+        return value.bit_length() <= MAX_FOLD_BITS
+    if isinstance(value, float):
+        return math.isfinite(value)
+    if isinstance(value, str):
+        return len(value) <= MAX_FOLD_CHARS and not ('"' in value and "'" in value)
+    return False
+
+
+def _integral(v):
+    return isinstance(v, (int, float)) and math.isfinite(v) and int(v) == v
+
+
+# Las operaciones que darian un resultado demasiado grande fallan antes de
+# calcularlo; _apply deja entonces la expresion para la ejecucion
+def _too_large():
+    raise OverflowError("resultado demasiado grande para plegar")
+
+
+def _fold_pow(base, expo):
+    if isinstance(base, int) and _integral(expo):
+        if base.bit_length() * abs(int(expo)) > MAX_FOLD_BITS:
+            _too_large()
+    return op_pow(base, expo)
+
+
+def _fold_mul(left, right):
+    for text, times in ((left, right), (right, left)):
+        if isinstance(text, str) and isinstance(times, int) and len(text) * times > MAX_FOLD_CHARS:
+            _too_large()
+    return op_mul(left, right)
+
+
+def _fold_call(func, *args):
+    if any(_integral(v) and abs(v) > MAX_FOLD_INT_ARG for v in args):
+        _too_large()
+    return func(*args)
+
+
+class Optimizer(DLangVisitor):
+
+    def __init__(self):
+        self.constants = {}     # nodo de expresion -> valor constante
+        self.branches = {}      # IfStmt con condicion constante -> bloque elegido (0, 1 o None)
+        self.dead_loops = set() # WhileStmt con condicion constante falsa
+
+    def optimize(self, tree):
+        self.visit(tree)
+        return self
+
+    def _fold(self, ctx, value):
+        if value is NOT_CONST or not _foldable(value):
+            return NOT_CONST
+        self.constants[ctx] = value
+        return value
+
+    # Aplica op a valores constantes; si falla (1 / 0, tipos invalidos...) el
+    # error se deja para el momento de ejecucion
+    def _apply(self, ctx, op, *values):
+        if any(v is NOT_CONST for v in values):
+            return NOT_CONST
+        try:
+            result = op(*values)
+        except Exception:
+            return NOT_CONST
+        return self._fold(ctx, result)
+
+    # ---------- Sentencias ----------
+
+    def visitProgram(self, ctx: DLangParser.ProgramContext):
+        for st in ctx.statement():
+            self.visit(st)
+        return NOT_CONST
+
+    def visitAssignStmt(self, ctx: DLangParser.AssignStmtContext):
+        self.visit(ctx.expr())
+        return NOT_CONST
+
+    def visitPrintStmt(self, ctx: DLangParser.PrintStmtContext):
+        self.visit(ctx.expr())
+        return NOT_CONST
+
+    def visitReturnStmt(self, ctx: DLangParser.ReturnStmtContext):
+        if ctx.expr() is not None:
+            self.visit(ctx.expr())
+        return NOT_CONST
+
+    # Con condicion constante solo se recorre el bloque que se ejecuta
+    def visitIfStmt(self, ctx: DLangParser.IfStmtContext):
+        cond = self.visit(ctx.expr())
+        if cond is NOT_CONST:
+            self.visit(ctx.block(0))
+            if ctx.block(1) is not None:
+                self.visit(ctx.block(1))
+            return NOT_CONST
+        if is_true(cond):
+            self.branches[ctx] = 0
+        else:
+            self.branches[ctx] = 1 if ctx.block(1) is not None else None
+        if self.branches[ctx] is not None:
+            self.visit(ctx.block(self.branches[ctx]))
+        return NOT_CONST
+
+    def visitWhileStmt(self, ctx: DLangParser.WhileStmtContext):
+        cond = self.visit(ctx.expr())
+        if cond is not NOT_CONST and not is_true(cond):
+            self.dead_loops.add(ctx)
+        else:
+            self.visit(ctx.block())
+        return NOT_CONST
+
+    def visitBlockStmt(self, ctx: DLangParser.BlockStmtContext):
+        for st in ctx.statement():
+            self.visit(st)
+        return NOT_CONST
+
+    def visitFuncDefStmt(self, ctx: DLangParser.FuncDefStmtContext):
+        self.visit(ctx.block())
+        return NOT_CONST
+
+    # ---------- Llamadas ----------
+
+    def visitFuncCallExpr(self, ctx: DLangParser.FuncCallExprContext):
+        args = [self.visit(e) for e in ctx.argList().expr()] if ctx.argList() else []
+        builtin = Builtins.lookup(ctx.ID().getText())
+        if builtin is None or not builtin.pure or not builtin.accepts(len(args)):
+            return NOT_CONST
+        return self._apply(ctx, lambda *vs: _fold_call(builtin.func, *vs), *args)
+
+    def visitFuncCallPrimary(self, ctx: DLangParser.FuncCallPrimaryContext):
+        return self._apply(ctx, lambda v: v, self.visit(ctx.funcCall()))
+
+    # ---------- Literales ----------
+
+    def visitNumberLiteralExpr(self, ctx: DLangParser.NumberLiteralExprContext):
+        text = ctx.NUMBER().getText()
+        return self._fold(ctx, float(text) if '.' in text else int(text))
+
+    def visitStringLiteralExpr(self, ctx: DLangParser.StringLiteralExprContext):
+        return self._fold(ctx, ctx.STRING().getText()[1:-1])
+
+    def visitTrueLiteralExpr(self, ctx: DLangParser.TrueLiteralExprContext):
+        return self._fold(ctx, True)
+
+    def visitFalseLiteralExpr(self, ctx: DLangParser.FalseLiteralExprContext):
+        return self._fold(ctx, False)
+
+    def visitIdentifierExpr(self, ctx: DLangParser.IdentifierExprContext):
+        return NOT_CONST
+
+    def visitParenExpr(self, ctx: DLangParser.ParenExprContext):
+        return self._apply(ctx, lambda v: v, self.visit(ctx.expr()))
+
+    # Las listas no se pliegan: son mutables y cada evaluacion crea una nueva
+    def visitListLiteralNode(self, ctx: DLangParser.ListLiteralNodeContext):
+        for e in ctx.expr():
+            self.visit(e)
+        return NOT_CONST
+
+    def visitListLiteralExpr(self, ctx: DLangParser.ListLiteralExprContext):
+        self.visit(ctx.listLiteral())
+        return NOT_CONST
+
+    # ---------- Logicos ----------
+
+    def visitOrOp(self, ctx: DLangParser.OrOpContext):
+        left = self.visit(ctx.expr())
+        right = self.visit(ctx.andExpr())
+        if left is not NOT_CONST and is_true(left):
+            # la parte derecha nunca se evalua
+            return self._fold(ctx, True)
+        return self._apply(ctx, lambda a, b: is_true(a) or is_true(b), left, right)
+
+    def visitAndOp(self, ctx: DLangParser.AndOpContext):
+        left = self.visit(ctx.andExpr())
+        right = self.visit(ctx.relExpr())
+        if left is not NOT_CONST and not is_true(left):
+            return self._fold(ctx, False)
+        return self._apply(ctx, lambda a, b: is_true(a) and is_true(b), left, right)
+
+    def visitRelOpExpr(self, ctx: DLangParser.RelOpExprContext):
+        left = self.visit(ctx.addExpr(0))
+        if ctx.relOp() is None:
+            return self._apply(ctx, lambda v: v, left)
+        right = self.visit(ctx.addExpr(1))
+        return self._apply(ctx, REL_OPS[ctx.relOp().getText()], left, right)
+
+    # ---------- Aritmetica ----------
+
+    def visitAddSubExpr(self, ctx: DLangParser.AddSubExprContext):
+        left = self.visit(ctx.addExpr())
+        right = self.visit(ctx.mulExpr())
+        return self._apply(ctx, ARITH_OPS[ctx.getChild(1).getText()], left, right)
+
+    def visitMulDivExpr(self, ctx: DLangParser.MulDivExprContext):
+        left = self.visit(ctx.mulExpr())
+        right = self.visit(ctx.powExpr())
+        op = ARITH_OPS[ctx.getChild(1).getText()]
+        return self._apply(ctx, _fold_mul if op is op_mul else op, left, right)
+
+    def visitPowerOp(self, ctx: DLangParser.PowerOpContext):
+        values = [self.visit(e) for e in ctx.unaryExpr()]
+        if any(v is NOT_CONST for v in values):
+            return NOT_CONST
+
+        def chain(*vs):
+            result = vs[0]
+            for expo in vs[1:]:
+                result = _fold_pow(result, expo)
+            return result
+        return self._apply(ctx, chain, *values)
+
+    # ---------- Unarios ----------
+
+    def visitUnaryMinusExpr(self, ctx: DLangParser.UnaryMinusExprContext):
+        return self._apply(ctx, lambda v: -v, self.visit(ctx.unaryExpr()))
+
+    def visitUnaryPlusExpr(self, ctx: DLangParser.UnaryPlusExprContext):
+        return self._apply(ctx, lambda v: +v, self.visit(ctx.unaryExpr()))
+
+    def visitUnaryNotExpr(self, ctx: DLangParser.UnaryNotExprContext):
+        return self._apply(ctx, op_not, self.visit(ctx.unaryExpr()))
+
+    def visitPrimaryExpr(self, ctx: DLangParser.PrimaryExprContext):
+        return self._apply(ctx, lambda v: v, self.visit(ctx.primary()))
+
+    # Nodos intermedios de la gramatica (expr -> andExpr -> ...): el valor
+    # del unico hijo
+    def visitAndExprRoot(self, ctx):
+        return self._apply(ctx, lambda v: v, self.visit(ctx.andExpr()))
+
+    def visitRelExprRoot(self, ctx):
+        return self._apply(ctx, lambda v: v, self.visit(ctx.relExpr()))
+
+    def visitMulRoot(self, ctx):
+        return self._apply(ctx, lambda v: v, self.visit(ctx.mulExpr()))
+
+    def visitPowRoot(self, ctx):
+        return self._apply(ctx, lambda v: v, self.visit(ctx.powExpr()))
+
+
+def optimize(tree):
+    return Optimizer().optimize(tree)
+
+
+# ----------------- Volcado del programa optimizado -----------------
+
+# Literal de DLang para una constante plegada
+def format_constant(value):
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, str):
+        return f"'{value}'" if '"' in value else f'"{value}"'
+    if isinstance(value, float):
+        # la gramatica no admite exponentes: se escriben todos los digitos
+        text = format(Decimal(repr(abs(value))), 'f')
+        if '.' not in text:
+            text += ".0"
+    else:
+        text = str(abs(value))
+    return f"(-{text})" if value < 0 else text
+
+
+class _Printer(DLangVisitor):
+
+    def __init__(self, opt):
+        self.opt = opt
+        self.lines = []
+        self.depth = 0
+
+    def visit(self, tree):
+        if tree in self.opt.constants:
+            return format_constant(self.opt.constants[tree])
+        return tree.accept(self)
+
+    def _line(self, text):
+        self.lines.append("    " * self.depth + text)
+
+    def _statements(self, statements):
+        for st in statements:
+            self.visit(st)
+
+    def _block(self, block_ctx):
+        self.depth += 1
+        self._statements(block_ctx.statement())
+        self.depth -= 1
+
+    # ---------- Sentencias ----------
+
+    def visitProgram(self, ctx):
+        self._statements(ctx.statement())
+
+    def visitSimpleStatement(self, ctx):
+        child = ctx.getChild(0)
+        text = self.visit(child)
+        if isinstance(child, DLangParser.FuncCallExprContext):
+            self._line(text)
+
+    def visitAssignStmt(self, ctx):
+        self._line(f"{ctx.ID().getText()} = {self.visit(ctx.expr())}")
+
+    def visitPrintStmt(self, ctx):
+        self._line(f"print({self.visit(ctx.expr())})")
+
+    def visitReturnStmt(self, ctx):
+        if ctx.expr() is None:
+            self._line("return")
+        else:
+            self._line(f"return {self.visit(ctx.expr())}")
+
+    def visitIfStmt(self, ctx):
+        if ctx in self.opt.branches:
+            chosen = self.opt.branches[ctx]
+            if chosen is not None:
+                # los bloques no crean ambito: se pueden escribir en linea
+                self._statements(ctx.block(chosen).statement())
+            return
+        self._line(f"if ({self.visit(ctx.expr())}) {{")
+        self._block(ctx.block(0))
+        if ctx.block(1) is not None:
+            self._line("} else {")
+            self._block(ctx.block(1))
+        self._line("}")
+
+    def visitWhileStmt(self, ctx):
+        if ctx in self.opt.dead_loops:
+            return
+        self._line(f"while ({self.visit(ctx.expr())}) {{")
+        self._block(ctx.block())
+        self._line("}")
+
+    def visitFuncDefStmt(self, ctx):
+        params = ", ".join(p.getText() for p in ctx.paramList().ID()) if ctx.paramList() else ""
+        self._line(f"def {ctx.ID().getText()}({params}) {{")
+        self._block(ctx.block())
+        self._line("}")
+
+    # ---------- Expresiones ----------
+
+    def visitFuncCallExpr(self, ctx):
+        args = ", ".join(self.visit(e) for e in ctx.argList().expr()) if ctx.argList() else ""
+        return f"{ctx.ID().getText()}({args})"
+
+    def visitFuncCallPrimary(self, ctx):
+        return self.visit(ctx.funcCall())
+
+    def visitIdentifierExpr(self, ctx):
+        return ctx.ID().getText()
+
+    def visitParenExpr(self, ctx):
+        return f"({self.visit(ctx.expr())})"
+
+    def visitListLiteralNode(self, ctx):
+        return "[" + ", ".join(self.visit(e) for e in ctx.expr()) + "]"
+
+    def visitListLiteralExpr(self, ctx):
+        return self.visit(ctx.listLiteral())
+
+    def visitOrOp(self, ctx):
+        return f"{self.visit(ctx.expr())} or {self.visit(ctx.andExpr())}"
+
+    def visitAndOp(self, ctx):
+        return f"{self.visit(ctx.andExpr())} and {self.visit(ctx.relExpr())}"
+
+    def visitRelOpExpr(self, ctx):
+        left = self.visit(ctx.addExpr(0))
+        if ctx.relOp() is None:
+            return left
+        return f"{left} {ctx.relOp().getText()} {self.visit(ctx.addExpr(1))}"
+
+    def visitAddSubExpr(self, ctx):
+        return f"{self.visit(ctx.addExpr())} {ctx.getChild(1).getText()} {self.visit(ctx.mulExpr())}"
+
+    def visitMulDivExpr(self, ctx):
+        return f"{self.visit(ctx.mulExpr())} {ctx.getChild(1).getText()} {self.visit(ctx.powExpr())}"
+
+    def visitPowerOp(self, ctx):
+        return " ^ ".join(self.visit(e) for e in ctx.unaryExpr())
+
+    def visitUnaryMinusExpr(self, ctx):
+        return f"-{self.visit(ctx.unaryExpr())}"
+
+    def visitUnaryPlusExpr(self, ctx):
+        return f"+{self.visit(ctx.unaryExpr())}"
+
+    def visitUnaryNotExpr(self, ctx):
+        return f"not {self.visit(ctx.unaryExpr())}"
+
+    def visitPrimaryExpr(self, ctx):
+        return self.visit(ctx.primary())
+
+    def visitAndExprRoot(self, ctx):
+        return self.visit(ctx.andExpr())
+
+    def visitRelExprRoot(self, ctx):
+        return self.visit(ctx.relExpr())
+
+    def visitMulRoot(self, ctx):
+        return self.visit(ctx.mulExpr())
+
+    def visitPowRoot(self, ctx):
+        return self.visit(ctx.powExpr())
+
+
+# Devuelve el codigo DLang del programa con las optimizaciones aplicadas
+def dump_program(tree, opt):
+    printer = _Printer(opt)
+    printer.visit(tree)
+    return "\n".join(printer.lines)
@@ -0,0 +1,235 @@
+# ParallelMatrix.py
+# Reparte las operaciones de Matrix.py sobre matrices grandes entre varios
+# procesos (ProcessPoolExecutor), por bloques de filas.
+#
+# Los operandos y el resultado viven en memoria compartida
+# (multiprocessing.shared_memory): cada tarea recibe solo los nombres de los
+# bloques y su rango de filas, no las matrices serializadas. Cada proceso
+# calcula sus filas con los mismos nucleos que la version secuencial, asi el
+# resultado es identico.
+#
+# Por defecto se usa un solo proceso (todo secuencial). Desde DLang:
+#   set_workers(8)    # hasta 8 procesos
+#   set_workers(0)    # tantos como nucleos
+#   set_workers(1)    # volver a secuencial
+
+import os
+import operator
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import Matrix
+
+
+# Tamanos a partir de los cuales compensa repartir el trabajo
+MIN_MUL_WORK = 150 ** 3         # filas(A) * columnas(A) * columnas(B)
+MIN_ELEMENTWISE = 1_000_000     # elementos de la suma / resta
+MIN_INVERSE = 200               # orden n de la matriz a invertir
+
+_workers = 1
+_executor = None
+
+
+def set_workers(n):
+    global _workers, _executor
+    n = int(n)
+    if n < 0:
+        raise ValueError("set_workers espera un numero de procesos >= 0")
+    if n == 0:
+        n = os.cpu_count() or 1
+    if n != _workers and _executor is not None:
+        _executor.shutdown()
+        _executor = None
+    _workers = n
+    return n
+
+
+def get_workers():
+    return _workers
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=_workers)
+    return _executor
+
+
+def enabled_for_mul(rA, cA, cB):
+    return _workers > 1 and rA > 1 and rA * cA * cB >= MIN_MUL_WORK
+
+
+def enabled_for_elementwise(n):
+    return _workers > 1 and n >= MIN_ELEMENTWISE
+
+
+def enabled_for_inverse(n):
+    return _workers > 1 and n >= MIN_INVERSE
+
+
+# ----------------- Memoria compartida -----------------
+
+def _share(data):
+    shm = shared_memory.SharedMemory(create=True, size=max(8, 8 * len(data)))
+    if len(data):
+        shm.buf[:8 * len(data)] = memoryview(data).cast('B')
+    return shm
+
+
+def _empty(n):
+    return shared_memory.SharedMemory(create=True, size=max(8, 8 * n))
+
+
+def _read(shm, start, end):
+    out = array('d')
+    out.frombytes(shm.buf[8 * start:8 * end])
+    return out
+
+
+def _write(shm, start, data):
+    shm.buf[8 * start:8 * (start + len(data))] = memoryview(data).cast('B')
+
+
+def _release(*blocks):
+    for shm in blocks:
+        shm.close()
+        shm.unlink()
+
+
+# Rangos de filas [r0, r1) para repartir rows filas entre los procesos
+def _row_blocks(rows):
+    parts = min(_workers, rows)
+    size, extra = divmod(rows, parts)
+    blocks = []
+    r0 = 0
+    for p in range(parts):
+        r1 = r0 + size + (1 if p < extra else 0)
+        blocks.append((r0, r1))
+        r0 = r1
+    return blocks
+
+
+def _run(fn, tasks):
+    pool = _pool()
+    for future in [pool.submit(fn, *task) for task in tasks]:
+        future.result()
+
+
+# ----------------- Tareas (se ejecutan en los procesos) -----------------
+
+def _attach(name):
+    return shared_memory.SharedMemory(name=name)
+
+
+def _mul_task(kernel, a_name, bt_name, c_name, r0, r1, cA, cB):
+    a_shm, bt_shm, c_shm = _attach(a_name), _attach(bt_name), _attach(c_name)
+    try:
+        a = _read(a_shm, r0 * cA, r1 * cA)
+        bt = _read(bt_shm, 0, cB * cA)
+        c = getattr(Matrix, kernel)(a, bt, r1 - r0, cA, cB)
+        _write(c_shm, r0 * cB, c)
+    finally:
+        a_shm.close()
+        bt_shm.close()
+        c_shm.close()
+
+
+def _elementwise_task(op, a_name, b_name, c_name, start, end):
+    a_shm, b_shm, c_shm = _attach(a_name), _attach(b_name), _attach(c_name)
+    try:
+        a = _read(a_shm, start, end)
+        b = _read(b_shm, start, end)
+        _write(c_shm, start, array('d', map(Matrix._ELEMENTWISE_OPS[op], a, b)))
+    finally:
+        a_shm.close()
+        b_shm.close()
+        c_shm.close()
+
+
+# Paso de eliminacion de Gauss-Jordan sobre las filas [r0, r1) de la matriz
+# aumentada (n x 2n): hace cero la columna col en todas salvo la del pivote
+def _eliminate_task(aug_name, n, col, r0, r1):
+    shm = _attach(aug_name)
+    try:
+        width = 2 * n
+        pivot = _read(shm, col * width, (col + 1) * width).tolist()
+        mul = operator.mul
+        sub = operator.sub
+        for r in range(r0, r1):
+            if r == col:
+                continue
+            row = _read(shm, r * width, (r + 1) * width).tolist()
+            factor = row[col]
+            if factor != 0.0:
+                row = list(map(sub, row, map(mul, [factor] * width, pivot)))
+                _write(shm, r * width, array('d', row))
+    finally:
+        shm.close()
+
+
+# ----------------- Operaciones -----------------
+
+# C = A B con las filas de A repartidas; bt es B traspuesta (contigua)
+def mat_mul(kernel, a, bt, rA, cA, cB):
+    a_shm, bt_shm, c_shm = _share(a), _share(bt), _empty(rA * cB)
+    try:
+        _run(_mul_task, [(kernel, a_shm.name, bt_shm.name, c_shm.name, r0, r1, cA, cB)
+                         for r0, r1 in _row_blocks(rA)])
+        return _read(c_shm, 0, rA * cB)
+    finally:
+        _release(a_shm, bt_shm, c_shm)
+
+
+def elementwise(op, a, b):
+    n = len(a)
+    a_shm, b_shm, c_shm = _share(a), _share(b), _empty(n)
+    try:
+        _run(_elementwise_task, [(op, a_shm.name, b_shm.name, c_shm.name, s, e)
+                                 for s, e in _row_blocks(n)])
+        return _read(c_shm, 0, n)
+    finally:
+        _release(a_shm, b_shm, c_shm)
+
+
+# Inversa por Gauss-Jordan: la busqueda del pivote, el intercambio y la
+# normalizacion los hace este proceso; la eliminacion en las demas filas se
+# reparte. rows: filas de A como listas de floats
+def mat_inverse(rows):
+    n = len(rows)
+    width = 2 * n
+    aug = array('d')
+    for i in range(n):
+        aug.extend(rows[i])
+        aug.extend([1.0 if j == i else 0.0 for j in range(n)])
+
+    shm = _share(aug)
+    del aug
+    try:
+        blocks = _row_blocks(n)
+        for col in range(n):
+            pivot_row = None
+            pivot_val = 0.0
+            with shm.buf.cast('d') as values:
+                for r in range(col, n):
+                    val = abs(values[r * width + col])
+                    if val > pivot_val:
+                        pivot_val = val
+                        pivot_row = r
+            if pivot_row is None or pivot_val == 0.0:
+                raise ValueError("La matriz no es invertible (determinante = 0)")
+
+            pivot = _read(shm, pivot_row * width, (pivot_row + 1) * width)
+            if pivot_row != col:
+                _write(shm, pivot_row * width, _read(shm, col * width, (col + 1) * width))
+            p = pivot[col]
+            _write(shm, col * width, array('d', [v / p for v in pivot]))
+
+            _run(_eliminate_task, [(shm.name, n, col, r0, r1) for r0, r1 in blocks])
+
+        inv = Matrix.Matrix(n, n)
+        for i in range(n):
+            inv.data[i * n:(i + 1) * n] = _read(shm, i * width + n, (i + 1) * width)
+        return inv
+    finally:
+        _release(shm)
@@ -0,0 +1,128 @@
+# ParallelModels.py
+# Prediccion y entrenamiento de los modelos de MyMLP.py repartidos entre los
+# procesos de ParallelMatrix.py (mismo set_workers, mismo pool).
+#
+#  - Prediccion: las filas de X se reparten por bloques; cada proceso calcula
+#    las salidas de su bloque con la propagacion sin estado del modelo.
+#  - Entrenamiento de Net (paralelismo de datos, sincronico): cada lote se
+#    reparte entre los procesos, cada uno calcula la suma de los gradientes
+#    de sus filas con los parametros actuales y este proceso los suma, hace
+#    la actualizacion y publica los nuevos parametros antes del siguiente
+#    lote. Da el mismo resultado que el entrenamiento secuencial salvo
+#    redondeo (cambia el orden de las sumas). Cada proceso devuelve tambien
+#    la perdida de sus filas, para el historial y la parada temprana.
+#
+# X, Y, los parametros y los gradientes viven en memoria compartida, como en
+# ParallelMatrix.
+
+import operator
+from array import array
+
+import Matrix
+import ParallelMatrix
+from ParallelMatrix import _attach, _empty, _read, _release, _row_blocks, _run, _share, _write
+
+
+# Tamanos a partir de los cuales compensa repartir el trabajo
+MIN_PREDICT_ROWS = 20_000     # filas de X a predecir
+MIN_TRAIN_BATCH = 2_048       # ejemplos por lote
+
+
+def enabled_for_predict(rows):
+    return ParallelMatrix.get_workers() > 1 and rows >= MIN_PREDICT_ROWS
+
+
+def enabled_for_training(batch_size):
+    return ParallelMatrix.get_workers() > 1 and batch_size >= MIN_TRAIN_BATCH
+
+
+# ----------------- Tareas (se ejecutan en los procesos) -----------------
+
+def _outputs_task(model, x_name, out_name, r0, r1, cols, out_dim):
+    x_shm, out_shm = _attach(x_name), _attach(out_name)
+    try:
+        Xb = Matrix.Matrix(r1 - r0, cols, _read(x_shm, r0 * cols, r1 * cols))
+        _write(out_shm, r0 * out_dim, model._outputs(Xb).flat())
+    finally:
+        x_shm.close()
+        out_shm.close()
+
+
+# Una Net por proceso y arquitectura: en cada lote solo se le copian los
+# parametros actuales
+_worker_nets = {}
+
+
+def _worker_net(layers, activation):
+    key = (tuple(layers), activation)
+    net = _worker_nets.get(key)
+    if net is None:
+        import MyMLP
+        net = _worker_nets[key] = MyMLP.Net(layers, activation)
+    return net
+
+
+def _gradient_task(layers, activation, names, r0, r1, slot):
+    blocks = [_attach(name) for name in names]
+    x_shm, y_shm, p_shm, g_shm = blocks
+    try:
+        net = _worker_net(layers, activation)
+        n = len(net.params)
+        cols_in, cols_out = layers[0], layers[-1]
+        net.params[:] = _read(p_shm, 0, n)
+        Xb = Matrix.Matrix(r1 - r0, cols_in, _read(x_shm, r0 * cols_in, r1 * cols_in))
+        Yb = Matrix.Matrix(r1 - r0, cols_out, _read(y_shm, r0 * cols_out, r1 * cols_out))
+        grads, loss = net._gradient(Xb, Yb)
+        # el slot tiene n gradientes y la perdida al final
+        grads.append(loss)
+        _write(g_shm, slot * (n + 1), grads)
+    finally:
+        for shm in blocks:
+            shm.close()
+
+
+# ----------------- Operaciones -----------------
+
+# Salidas de model (MLP o Net) para todas las filas de Xm (Matrix). Devuelve
+# una Matrix de filas(X) x out_dim
+def outputs(model, Xm, out_dim):
+    rows, cols = Xm.shape
+    x_shm, out_shm = _share(Xm.flat()), _empty(rows * out_dim)
+    try:
+        _run(_outputs_task, [(model, x_shm.name, out_shm.name, r0, r1, cols, out_dim)
+                             for r0, r1 in _row_blocks(rows)])
+        return Matrix.Matrix(rows, out_dim, _read(out_shm, 0, rows * out_dim))
+    finally:
+        _release(x_shm, out_shm)
+
+
+# Mismo algoritmo que Net.train (lotes de batch_size filas consecutivas,
+# gradiente promedio, una actualizacion por lote, plan de MyMLP) con cada
+# lote repartido
+def train_net(net, Xm, Ym, plan, batch_size):
+    n = len(net.params)
+    parts = ParallelMatrix.get_workers()
+    x_shm, y_shm = _share(Xm.flat()), _share(Ym.flat())
+    p_shm, g_shm = _share(net.params), _empty(parts * (n + 1))
+    names = (x_shm.name, y_shm.name, p_shm.name, g_shm.name)
+    sub = operator.sub
+    add = operator.add
+    try:
+        for lr in plan:
+            loss = 0.0
+            for start in range(0, Xm.rows, batch_size):
+                end = min(start + batch_size, Xm.rows)
+                blocks = _row_blocks(end - start)
+                _run(_gradient_task, [(net.layers, net.activation, names, start + r0, start + r1, slot)
+                                      for slot, (r0, r1) in enumerate(blocks)])
+                # suma de los gradientes de cada bloque, siempre en el mismo orden
+                grads = _read(g_shm, 0, n + 1)
+                for slot in range(1, len(blocks)):
+                    grads = array('d', map(add, grads, _read(g_shm, slot * (n + 1), (slot + 1) * (n + 1))))
+                loss += grads.pop()
+                step = lr / (end - start)
+                net.params[:] = array('d', map(sub, net.params, map(operator.mul, grads, [step] * n)))
+                _write(p_shm, 0, net.params)
+            plan.record(loss / Xm.rows)
+    finally:
+        _release(x_shm, y_shm, p_shm, g_shm)
@@ -0,0 +1,178 @@
+# ProgramCache.py
+# Cache de programas DLang ya analizados, para no volver a pasar por el lexer y
+# el parser de ANTLR cuando se ejecuta varias veces el mismo codigo.
+#
+#  - En memoria: arbol de analisis y bytecode, por clave del codigo fuente.
+#  - En disco: el bytecode de la VM y el arbol de analisis que usan los
+#    motores compile y tree (en forma de tuplas, ver Frontend.encode_tree),
+#    serializados con pickle en una carpeta __dlcache__ junto al script,
+#    parecido a __pycache__ de Python. Con el arbol guardado una ejecucion
+#    nueva no pasa por el lexer ni el parser; el plegado de constantes y la
+#    compilacion a closures se vuelven a hacer (son recorridos rapidos del
+#    arbol y las closures no se pueden guardar).
+#
+# La clave es un hash del codigo fuente, de la gramatica (DLang.g4), de la
+# version del formato de bytecode y del codigo de las funciones puras que el
+# optimizador evalua al compilar (el bytecode guarda sus resultados como
+# constantes), asi un cambio en cualquiera de ellos invalida lo guardado.
+
+import os
+import pickle
+import hashlib
+from collections import OrderedDict
+
+import Builtins
+from VM import BYTECODE_VERSION
+
+
+CACHE_DIR_NAME = "__dlcache__"
+CACHE_SUFFIX = ".dlc"
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_GRAMMAR_FILE = os.path.join(_HERE, "DLang.g4")
+
+
+def _grammar_version():
+    try:
+        with open(_GRAMMAR_FILE, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return "sin-gramatica"
+
+
+GRAMMAR_VERSION = _grammar_version()
+
+
+# Archivos cuyo codigo decide las constantes plegadas: los modulos de las
+# funciones puras (Builtins.PURE_BUILTINS), la semantica de los operadores y
+# el propio optimizador
+def _folding_files():
+    modules = {Builtins.REGISTRY[name].module_name for name in Builtins.PURE_BUILTINS}
+    modules.update(("Operators", "Optimizer"))
+    return [os.path.join(_HERE, name + ".py") for name in sorted(modules)]
+
+
+def _files_version(paths):
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(os.path.basename(path).encode("utf-8"))
+        try:
+            with open(path, "rb") as f:
+                h.update(f.read())
+        except OSError:
+            h.update(b"sin-archivo")
+    return h.hexdigest()
+
+
+BUILTINS_VERSION = _files_version(_folding_files())
+
+
+# Clave de cache de un codigo fuente. variant distingue versiones compiladas
+# de forma distinta del mismo codigo (por ejemplo, con y sin optimizar)
+def source_key(code, variant=""):
+    h = hashlib.sha256()
+    h.update(GRAMMAR_VERSION.encode("ascii"))
+    h.update(BUILTINS_VERSION.encode("ascii"))
+    h.update(f"bytecode-{BYTECODE_VERSION}-{variant}".encode("ascii"))
+    h.update(code.encode("utf-8"))
+    return h.hexdigest()
+
+
+class ProgramCache:
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.trees = OrderedDict()      # clave -> arbol de analisis
+        self.bytecode = OrderedDict()   # clave -> CodeObject
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, table, key, value):
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > self.max_entries:
+            table.popitem(last=False)
+
+    # Arbol de analisis de code. Se busca en memoria, despues en cache_dir
+    # (si se da) y por ultimo se construye con build(code). En disco se
+    # guarda encode(arbol) y se lee con decode(datos); si encode devuelve
+    # None (un arbol con errores de sintaxis) no se guarda
+    def get_tree(self, code, build, cache_dir=None, encode=None, decode=None, variant=""):
+        if encode is None or decode is None:
+            cache_dir = None
+        return self._get(self.trees, source_key(code, variant), code, build, cache_dir, encode, decode)
+
+    # Bytecode de code. Se busca en memoria, despues en cache_dir (si se da)
+    # y por ultimo se construye con build(code) y se guarda en ambos sitios
+    def get_bytecode(self, code, build, cache_dir=None, variant=""):
+        return self._get(self.bytecode, source_key(code, variant), code, build, cache_dir)
+
+    def _get(self, table, key, code, build, cache_dir, encode=None, decode=None):
+        value = table.get(key)
+        if value is not None:
+            self.hits += 1
+            table.move_to_end(key)
+            return value
+
+        if cache_dir is not None:
+            value = _load(_cache_path(cache_dir, key))
+            if value is not None and decode is not None:
+                value = _decode(decode, value)
+        if value is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            value = build(code)
+            if cache_dir is not None:
+                data = value if encode is None else encode(value)
+                if data is not None:
+                    _store(_cache_path(cache_dir, key), data)
+        self._remember(table, key, value)
+        return value
+
+    def clear(self):
+        self.trees.clear()
+        self.bytecode.clear()
+
+
+# Carpeta de cache para un script: __dlcache__ junto al archivo
+def cache_dir_for(filename):
+    return os.path.join(os.path.dirname(os.path.abspath(filename)), CACHE_DIR_NAME)
+
+
+def _cache_path(cache_dir, key):
+    return os.path.join(cache_dir, key + CACHE_SUFFIX)
+
+
+def _load(path):
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # archivo corrupto o de otra version: se ignora y se vuelve a compilar
+        return None
+
+
+# Datos guardados que no se pueden reconstruir (de otra version del parser,
+# por ejemplo) se tratan como si no estuvieran
+def _decode(decode, data):
+    try:
+        return decode(data)
+    except Exception:
+        return None
+
+
+def _store(path, co):
+    # se escribe en un temporal y se renombra, para que otro proceso nunca
+    # lea un archivo a medio escribir
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(co, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        # sin permisos de escritura: simplemente no se guarda
+        pass
@@ -0,0 +1,68 @@
+# Scope.py
+# Ambitos de las funciones de DLang.
+#
+# Reglas (iguales en los tres motores):
+#  - Los parametros son siempre locales a la llamada.
+#  - Leer un nombre busca primero en el marco local y despues en las globales.
+#  - Asignar escribe en el ambito donde el nombre ya existe: si ya es local se
+#    actualiza el local, si no lo es pero existe como global se actualiza la
+#    global, y si no existe en ninguno se crea como local de la llamada.
+#
+# Para los compiladores, cada nombre que una funcion puede tener como local
+# (parametros y nombres asignados en su cuerpo) recibe un indice fijo (slot)
+# en el arreglo de locales del marco.
+
+from DLangParser import DLangParser
+
+
+# Valor de un slot local que todavia no tiene valor en esta llamada
+class _Unset:
+    def __repr__(self):
+        return "<sin valor>"
+
+
+UNSET = _Unset()
+
+
+class Scope:
+
+    def __init__(self, params, block):
+        self.slots = {}
+        for p in params:
+            self._add(p)
+        for name in _assigned_names(block):
+            self._add(name)
+        # slot de cada parametro, en orden (un nombre repetido comparte slot)
+        self.param_slots = [self.slots[p] for p in params]
+
+    def _add(self, name):
+        if name not in self.slots:
+            self.slots[name] = len(self.slots)
+
+    # Indice del slot local de name, o None si en esta funcion es siempre global
+    def slot(self, name):
+        return self.slots.get(name)
+
+    @property
+    def names(self):
+        return list(self.slots)
+
+    def __len__(self):
+        return len(self.slots)
+
+
+# Nombres asignados dentro de un bloque, sin entrar en funciones anidadas
+def _assigned_names(ctx):
+    names = []
+    pending = [ctx]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, DLangParser.FuncDefStmtContext) and node is not ctx:
+            continue
+        if isinstance(node, DLangParser.AssignStmtContext):
+            names.append(node.ID().getText())
+        for i in range(node.getChildCount() - 1, -1, -1):
+            child = node.getChild(i)
+            if child.getChildCount() > 0:
+                pending.append(child)
+    return names
@@ -0,0 +1,304 @@
+# VM.py
+# Maquina virtual de pila para el bytecode de DLang.
+#
+# El bytecode lo genera VMCompiler a partir del arbol de ANTLR. Cada CodeObject
+# guarda sus instrucciones en una lista plana [op, arg, op, arg, ...]; los
+# saltos apuntan a posiciones de esa lista. Este modulo no depende de ANTLR.
+
+import Builtins
+from Operators import op_add, op_sub, op_mul, op_div, op_mod, op_pow, op_not, REL_OPS
+
+
+# Version del formato de bytecode: se incrementa al cambiar las instrucciones,
+# invalida el bytecode guardado en disco por ProgramCache
+BYTECODE_VERSION = 1
+
+
+# ----------------- Codigos de operacion -----------------
+
+LOAD_CONST = 0      # arg: indice en consts
+LOAD_NAME = 1       # arg: indice en names (variable global)
+STORE_NAME = 2      # arg: indice en names (variable global)
+BINARY_ADD = 3
+BINARY_SUB = 4
+BINARY_MUL = 5
+BINARY_DIV = 6
+BINARY_MOD = 7
+BINARY_POW = 8
+COMPARE_OP = 9      # arg: indice en COMPARE_OPS
+UNARY_NEG = 10
+UNARY_POS = 11
+UNARY_NOT = 12
+TO_BOOL = 13
+BUILD_LIST = 14     # arg: numero de elementos
+JUMP = 15           # arg: destino
+JUMP_IF_FALSE = 16  # arg: destino (saca el valor de la pila)
+JUMP_IF_TRUE = 17   # arg: destino (saca el valor de la pila)
+POP_TOP = 18
+PRINT = 19
+CALL = 20           # arg: indice en call_sites -> (nombre, num. argumentos)
+                    #      y en call_cache (destino ya resuelto)
+MAKE_FUNCTION = 21  # arg: indice en names; la funcion esta en la cima de la pila
+RETURN = 22
+LOAD_FAST = 23      # arg: slot local (si no tiene valor, se lee la global)
+STORE_FAST = 24     # arg: slot local (ver reglas de ambito en Scope.py)
+
+OPNAMES = [
+    'LOAD_CONST', 'LOAD_NAME', 'STORE_NAME',
+    'BINARY_ADD', 'BINARY_SUB', 'BINARY_MUL', 'BINARY_DIV', 'BINARY_MOD', 'BINARY_POW',
+    'COMPARE_OP', 'UNARY_NEG', 'UNARY_POS', 'UNARY_NOT', 'TO_BOOL', 'BUILD_LIST',
+    'JUMP', 'JUMP_IF_FALSE', 'JUMP_IF_TRUE', 'POP_TOP', 'PRINT',
+    'CALL', 'MAKE_FUNCTION', 'RETURN', 'LOAD_FAST', 'STORE_FAST',
+]
+
+COMPARE_OPS = ['==', '!=', '<', '<=', '>', '>=']
+
+
+# ----------------- Objetos de codigo -----------------
+
+# Marca de un sitio de llamada resuelto a una funcion del DSL
+_USER_FUNCTION = object()
+
+# Valor de un slot local que todavia no tiene valor en esta llamada
+_UNSET = object()
+
+
+class CodeObject:
+
+    def __init__(self, name, params=None):
+        self.name = name
+        self.params = list(params) if params else []
+        self.varnames = []    # nombre de cada slot local
+        self.param_slots = [] # slot de cada parametro, en orden
+        self.code = []        # [op, arg, op, arg, ...]
+        self.consts = []
+        self.names = []
+        self.call_sites = []  # (nombre, num. argumentos)
+        self.call_cache = []  # por sitio: funcion interna, _USER_FUNCTION o None
+
+    def add_call_site(self, name, argc):
+        self.call_sites.append((name, argc))
+        self.call_cache.append(None)
+        return len(self.call_sites) - 1
+
+    # Al serializar (cache en disco) no se guardan los destinos ya resueltos
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['call_cache'] = [None] * len(self.call_sites)
+        return state
+
+    def __repr__(self):
+        return f"<code {self.name}>"
+
+
+# Funcion de usuario ya definida (resultado de MAKE_FUNCTION)
+class Function:
+
+    def __init__(self, name, code):
+        self.name = name
+        self.code = code
+
+    def __repr__(self):
+        return f"<funcion {self.name}>"
+
+
+# ----------------- Maquina virtual -----------------
+
+class VM:
+
+    # Comparte las globales y la tabla de funciones con el EvalVisitor recibido
+    def __init__(self, visitor):
+        self.env = visitor.env
+        self.funcs = visitor.funcs
+
+    def run(self, code_obj):
+        env = self.env
+        funcs = self.funcs
+        rel_ops = [REL_OPS[op] for op in COMPARE_OPS]
+
+        # Pila de marcos de las funciones en curso: (codigo, pc, pila, locales).
+        # Cada llamada tiene su propio arreglo de locales; las globales no se copian
+        frames = []
+        fast = None
+
+        co = code_obj
+        code = co.code
+        consts = co.consts
+        names = co.names
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+
+        while True:
+            op = code[pc]
+            arg = code[pc + 1]
+            pc += 2
+
+            if op == LOAD_FAST:
+                value = fast[arg]
+                if value is _UNSET:
+                    name = co.varnames[arg]
+                    try:
+                        value = env[name]
+                    except KeyError:
+                        raise Exception(f"Variable no definida: {name}") from None
+                push(value)
+            elif op == LOAD_NAME:
+                name = names[arg]
+                try:
+                    push(env[name])
+                except KeyError:
+                    raise Exception(f"Variable no definida: {name}") from None
+            elif op == LOAD_CONST:
+                push(consts[arg])
+            elif op == STORE_NAME:
+                env[names[arg]] = pop()
+            elif op == STORE_FAST:
+                value = pop()
+                # un nombre que aun no es local pero ya existe como global
+                # actualiza la global
+                if fast[arg] is _UNSET and co.varnames[arg] in env:
+                    env[co.varnames[arg]] = value
+                else:
+                    fast[arg] = value
+            elif op == BINARY_ADD:
+                right = pop()
+                stack[-1] = op_add(stack[-1], right)
+            elif op == COMPARE_OP:
+                right = pop()
+                stack[-1] = rel_ops[arg](stack[-1], right)
+            elif op == JUMP_IF_FALSE:
+                if not pop():
+                    pc = arg
+            elif op == JUMP:
+                pc = arg
+            elif op == BINARY_SUB:
+                right = pop()
+                stack[-1] = op_sub(stack[-1], right)
+            elif op == BINARY_MUL:
+                right = pop()
+                stack[-1] = op_mul(stack[-1], right)
+            elif op == BINARY_DIV:
+                right = pop()
+                stack[-1] = op_div(stack[-1], right)
+            elif op == BINARY_MOD:
+                right = pop()
+                stack[-1] = op_mod(stack[-1], right)
+            elif op == BINARY_POW:
+                right = pop()
+                stack[-1] = op_pow(stack[-1], right)
+            elif op == JUMP_IF_TRUE:
+                if pop():
+                    pc = arg
+            elif op == CALL:
+                name, argc = co.call_sites[arg]
+                if argc:
+                    args = stack[-argc:]
+                    del stack[-argc:]
+                else:
+                    args = []
+
+                # 1) Funciones internas: el sitio de llamada se resuelve la
+                #    primera vez y queda guardado en call_cache
+                target = co.call_cache[arg]
+                if target is None:
+                    target = Builtins.resolve(name, argc)
+                    if target is None:
+                        target = _USER_FUNCTION
+                    co.call_cache[arg] = target
+                if target is not _USER_FUNCTION:
+                    push(target(*args))
+                    continue
+
+                # 2) Funciones del DSL: se apila un marco nuevo, sin recursion en Python
+                if name not in funcs:
+                    raise Exception(f"Funcion no definida: {name}")
+                func = funcs[name]
+                frames.append((co, pc, stack, fast))
+                co = func.code
+                fast = [_UNSET] * len(co.varnames)
+                for slot, a in zip(co.param_slots, args):
+                    fast[slot] = a
+                code = co.code
+                consts = co.consts
+                names = co.names
+                stack = []
+                push = stack.append
+                pop = stack.pop
+                pc = 0
+            elif op == RETURN:
+                value = pop()
+                if not frames:
+                    return value
+                co, pc, stack, fast = frames.pop()
+                code = co.code
+                consts = co.consts
+                names = co.names
+                push = stack.append
+                pop = stack.pop
+                push(value)
+            elif op == POP_TOP:
+                pop()
+            elif op == PRINT:
+                print(pop())
+            elif op == UNARY_NEG:
+                stack[-1] = -stack[-1]
+            elif op == UNARY_POS:
+                stack[-1] = +stack[-1]
+            elif op == UNARY_NOT:
+                stack[-1] = op_not(stack[-1])
+            elif op == TO_BOOL:
+                stack[-1] = bool(stack[-1])
+            elif op == BUILD_LIST:
+                if arg:
+                    items = stack[-arg:]
+                    del stack[-arg:]
+                else:
+                    items = []
+                push(items)
+            elif op == MAKE_FUNCTION:
+                func_code = pop()
+                funcs[names[arg]] = Function(names[arg], func_code)
+            else:
+                raise Exception(f"Instruccion desconocida: {op}")
+
+
+# ----------------- Desensamblador -----------------
+
+def _describe_arg(co, op, arg):
+    if op == LOAD_CONST:
+        return repr(co.consts[arg])
+    if op in (LOAD_NAME, STORE_NAME, MAKE_FUNCTION):
+        return co.names[arg]
+    if op in (LOAD_FAST, STORE_FAST):
+        return co.varnames[arg]
+    if op == COMPARE_OP:
+        return COMPARE_OPS[arg]
+    if op == CALL:
+        name, argc = co.call_sites[arg]
+        return f"{name}/{argc}"
+    return ""
+
+
+# Devuelve el listado del bytecode de co y de todas las funciones que define
+def disassemble(co):
+    lines = []
+    pending = [co]
+    while pending:
+        co = pending.pop(0)
+        params = ", ".join(co.params)
+        lines.append(f"Desensamblado de {co.name}({params}):")
+        for pc in range(0, len(co.code), 2):
+            op = co.code[pc]
+            arg = co.code[pc + 1]
+            desc = _describe_arg(co, op, arg)
+            if desc:
+                lines.append(f"  {pc:5d} {OPNAMES[op]:<15} {arg:4d} ({desc})")
+            else:
+                lines.append(f"  {pc:5d} {OPNAMES[op]}")
+        lines.append("")
+        for c in co.consts:
+            if isinstance(c, CodeObject):
+                pending.append(c)
+    return "\n".join(lines)
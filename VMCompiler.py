@@ -0,0 +1,297 @@
+# VMCompiler.py
+# Traduce el arbol de ANTLR de un programa DLang a bytecode para VM.py.
+#
+# Cada metodo visit emite las instrucciones de su nodo en el CodeObject actual.
+# Las expresiones dejan exactamente un valor en la pila; las sentencias la
+# dejan como estaba.
+#
+# Con un Optimizer las expresiones constantes se emiten como un solo LOAD_CONST
+# y los 'if' / 'while' con condicion constante no generan saltos.
+
+from DLangVisitor import DLangVisitor
+from DLangParser import DLangParser
+
+from VM import (
+    CodeObject, COMPARE_OPS,
+    LOAD_CONST, LOAD_NAME, STORE_NAME,
+    BINARY_ADD, BINARY_SUB, BINARY_MUL, BINARY_DIV, BINARY_MOD, BINARY_POW,
+    COMPARE_OP, UNARY_NEG, UNARY_POS, UNARY_NOT, TO_BOOL, BUILD_LIST,
+    JUMP, JUMP_IF_FALSE, JUMP_IF_TRUE, POP_TOP, PRINT,
+    CALL, MAKE_FUNCTION, RETURN, LOAD_FAST, STORE_FAST,
+)
+from Scope import Scope
+
+
+BINARY_OPS = {
+    '+': BINARY_ADD,
+    '-': BINARY_SUB,
+    '*': BINARY_MUL,
+    '/': BINARY_DIV,
+    '%': BINARY_MOD,
+}
+
+
+class BytecodeCompiler(DLangVisitor):
+
+    def __init__(self, optimizer=None):
+        self.co = None
+        self.scope = None   # Scope de la funcion que se esta compilando
+        self.constants = optimizer.constants if optimizer else {}
+        self.branches = optimizer.branches if optimizer else {}
+        self.dead_loops = optimizer.dead_loops if optimizer else set()
+
+    def compile(self, tree):
+        self.co = CodeObject("<programa>")
+        self.visit(tree)
+        return self.co
+
+    def visit(self, tree):
+        if tree in self.constants:
+            self._emit(LOAD_CONST, self._const(self.constants[tree]))
+            return None
+        return tree.accept(self)
+
+    # ---------- Emision ----------
+
+    # Agrega una instruccion y devuelve su posicion (para parchear saltos)
+    def _emit(self, op, arg=0):
+        pos = len(self.co.code)
+        self.co.code.append(op)
+        self.co.code.append(arg)
+        return pos
+
+    def _patch(self, pos, target):
+        self.co.code[pos + 1] = target
+
+    def _here(self):
+        return len(self.co.code)
+
+    def _const(self, value):
+        consts = self.co.consts
+        for i, c in enumerate(consts):
+            # no mezclar 1, 1.0 y True, que son iguales con ==
+            if type(c) is type(value) and c == value:
+                return i
+        consts.append(value)
+        return len(consts) - 1
+
+    # Slot local de name en la funcion actual, o None si es global
+    def _slot(self, name):
+        return self.scope.slot(name) if self.scope is not None else None
+
+    def _name(self, name):
+        names = self.co.names
+        if name not in names:
+            names.append(name)
+        return names.index(name)
+
+    # ---------- Programa ----------
+
+    def visitProgram(self, ctx: DLangParser.ProgramContext):
+        for st in ctx.statement():
+            self.visit(st)
+        self._emit(LOAD_CONST, self._const(None))
+        self._emit(RETURN)
+
+    # ---------- Sentencias ----------
+
+    def visitSimpleStatement(self, ctx: DLangParser.SimpleStatementContext):
+        child = ctx.getChild(0)
+        self.visit(child)
+        if isinstance(child, DLangParser.FuncCallExprContext):
+            # llamada como sentencia: se descarta el valor devuelto
+            self._emit(POP_TOP)
+
+    def visitAssignStmt(self, ctx: DLangParser.AssignStmtContext):
+        self.visit(ctx.expr())
+        name = ctx.ID().getText()
+        slot = self._slot(name)
+        if slot is None:
+            self._emit(STORE_NAME, self._name(name))
+        else:
+            self._emit(STORE_FAST, slot)
+
+    def visitPrintStmt(self, ctx: DLangParser.PrintStmtContext):
+        self.visit(ctx.expr())
+        self._emit(PRINT)
+
+    def visitReturnStmt(self, ctx: DLangParser.ReturnStmtContext):
+        if ctx.expr() is not None:
+            self.visit(ctx.expr())
+        else:
+            self._emit(LOAD_CONST, self._const(None))
+        self._emit(RETURN)
+
+    # ---------- Control de flujo ----------
+
+    def visitIfStmt(self, ctx: DLangParser.IfStmtContext):
+        if ctx in self.branches:
+            if self.branches[ctx] is not None:
+                self.visit(ctx.block(self.branches[ctx]))
+            return
+
+        self.visit(ctx.expr())
+        jump_else = self._emit(JUMP_IF_FALSE)
+        self.visit(ctx.block(0))
+        if ctx.block(1) is None:
+            self._patch(jump_else, self._here())
+            return
+        jump_end = self._emit(JUMP)
+        self._patch(jump_else, self._here())
+        self.visit(ctx.block(1))
+        self._patch(jump_end, self._here())
+
+    def visitWhileStmt(self, ctx: DLangParser.WhileStmtContext):
+        if ctx in self.dead_loops:
+            return
+
+        start = self._here()
+        self.visit(ctx.expr())
+        jump_end = self._emit(JUMP_IF_FALSE)
+        self.visit(ctx.block())
+        self._emit(JUMP, start)
+        self._patch(jump_end, self._here())
+
+    def visitBlockStmt(self, ctx: DLangParser.BlockStmtContext):
+        for st in ctx.statement():
+            self.visit(st)
+
+    # ---------- Funciones ----------
+
+    def visitFuncDefStmt(self, ctx: DLangParser.FuncDefStmtContext):
+        name = ctx.ID().getText()
+        params = [p.getText() for p in ctx.paramList().ID()] if ctx.paramList() else []
+
+        outer, outer_scope = self.co, self.scope
+        self.co = CodeObject(name, params)
+        self.scope = Scope(params, ctx.block())
+        self.co.varnames = self.scope.names
+        self.co.param_slots = self.scope.param_slots
+        try:
+            self.visit(ctx.block())
+            self._emit(LOAD_CONST, self._const(None))
+            self._emit(RETURN)
+            func_code = self.co
+        finally:
+            self.co, self.scope = outer, outer_scope
+
+        self.co.consts.append(func_code)
+        self._emit(LOAD_CONST, len(self.co.consts) - 1)
+        self._emit(MAKE_FUNCTION, self._name(name))
+
+    def visitFuncCallExpr(self, ctx: DLangParser.FuncCallExprContext):
+        name = ctx.ID().getText()
+        args = ctx.argList().expr() if ctx.argList() else []
+        for e in args:
+            self.visit(e)
+        self._emit(CALL, self.co.add_call_site(name, len(args)))
+
+    def visitFuncCallPrimary(self, ctx: DLangParser.FuncCallPrimaryContext):
+        self.visit(ctx.funcCall())
+
+    # ---------- Literales y variables ----------
+
+    def visitNumberLiteralExpr(self, ctx: DLangParser.NumberLiteralExprContext):
+        text = ctx.NUMBER().getText()
+        self._emit(LOAD_CONST, self._const(float(text) if '.' in text else int(text)))
+
+    def visitStringLiteralExpr(self, ctx: DLangParser.StringLiteralExprContext):
+        self._emit(LOAD_CONST, self._const(ctx.STRING().getText()[1:-1]))
+
+    def visitTrueLiteralExpr(self, ctx: DLangParser.TrueLiteralExprContext):
+        self._emit(LOAD_CONST, self._const(True))
+
+    def visitFalseLiteralExpr(self, ctx: DLangParser.FalseLiteralExprContext):
+        self._emit(LOAD_CONST, self._const(False))
+
+    def visitIdentifierExpr(self, ctx: DLangParser.IdentifierExprContext):
+        name = ctx.ID().getText()
+        slot = self._slot(name)
+        if slot is None:
+            self._emit(LOAD_NAME, self._name(name))
+        else:
+            self._emit(LOAD_FAST, slot)
+
+    def visitParenExpr(self, ctx: DLangParser.ParenExprContext):
+        self.visit(ctx.expr())
+
+    # ---------- Listas / matrices ----------
+
+    def visitListLiteralNode(self, ctx: DLangParser.ListLiteralNodeContext):
+        items = ctx.expr()
+        for e in items:
+            self.visit(e)
+        self._emit(BUILD_LIST, len(items))
+
+    def visitListLiteralExpr(self, ctx: DLangParser.ListLiteralExprContext):
+        self.visit(ctx.listLiteral())
+
+    # ---------- Logicos ----------
+
+    def visitOrOp(self, ctx: DLangParser.OrOpContext):
+        self.visit(ctx.expr())
+        jump_true = self._emit(JUMP_IF_TRUE)
+        self.visit(ctx.andExpr())
+        self._emit(TO_BOOL)
+        jump_end = self._emit(JUMP)
+        self._patch(jump_true, self._here())
+        self._emit(LOAD_CONST, self._const(True))
+        self._patch(jump_end, self._here())
+
+    def visitAndOp(self, ctx: DLangParser.AndOpContext):
+        self.visit(ctx.andExpr())
+        jump_false = self._emit(JUMP_IF_FALSE)
+        self.visit(ctx.relExpr())
+        self._emit(TO_BOOL)
+        jump_end = self._emit(JUMP)
+        self._patch(jump_false, self._here())
+        self._emit(LOAD_CONST, self._const(False))
+        self._patch(jump_end, self._here())
+
+    def visitRelOpExpr(self, ctx: DLangParser.RelOpExprContext):
+        self.visit(ctx.addExpr(0))
+        if ctx.relOp() is None:
+            return
+        self.visit(ctx.addExpr(1))
+        self._emit(COMPARE_OP, COMPARE_OPS.index(ctx.relOp().getText()))
+
+    # ---------- Aritmetica ----------
+
+    def visitAddSubExpr(self, ctx: DLangParser.AddSubExprContext):
+        self.visit(ctx.addExpr())
+        self.visit(ctx.mulExpr())
+        self._emit(BINARY_OPS[ctx.getChild(1).getText()])
+
+    def visitMulDivExpr(self, ctx: DLangParser.MulDivExprContext):
+        self.visit(ctx.mulExpr())
+        self.visit(ctx.powExpr())
+        self._emit(BINARY_OPS[ctx.getChild(1).getText()])
+
+    def visitPowerOp(self, ctx: DLangParser.PowerOpContext):
+        self.visit(ctx.unaryExpr(0))
+        for i in range(1, len(ctx.unaryExpr())):
+            self.visit(ctx.unaryExpr(i))
+            self._emit(BINARY_POW)
+
+    # ---------- Unarios ----------
+
+    def visitUnaryMinusExpr(self, ctx: DLangParser.UnaryMinusExprContext):
+        self.visit(ctx.unaryExpr())
+        self._emit(UNARY_NEG)
+
+    def visitUnaryPlusExpr(self, ctx: DLangParser.UnaryPlusExprContext):
+        self.visit(ctx.unaryExpr())
+        self._emit(UNARY_POS)
+
+    def visitUnaryNotExpr(self, ctx: DLangParser.UnaryNotExprContext):
+        self.visit(ctx.unaryExpr())
+        self._emit(UNARY_NOT)
+
+    def visitPrimaryExpr(self, ctx: DLangParser.PrimaryExprContext):
+        self.visit(ctx.primary())
+
+
+# Compila el arbol de un programa y devuelve su CodeObject.
+# optimizer: resultado de Optimizer.optimize(tree), o None para no optimizar
+def compile_bytecode(tree, optimizer=None):
+    return BytecodeCompiler(optimizer).compile(tree)
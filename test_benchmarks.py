@@ -0,0 +1,23 @@
+# test_benchmarks.py
+# Linea de comandos de Benchmarks.py (sin correr las mediciones)
+#
+#   python -m pytest -q
+
+import pytest
+
+import Benchmarks
+
+
+def test_sin_argumentos_corre_todos():
+    assert Benchmarks.parse_args([]).bench == sorted(Benchmarks.BENCHMARKS)
+
+
+def test_elegir_benchmarks():
+    args = Benchmarks.parse_args(["mathfn", "--samples", "10"])
+    assert args.bench == ["mathfn"] and args.samples == 10
+
+
+def test_benchmark_desconocido_es_error(capsys):
+    with pytest.raises(SystemExit):
+        Benchmarks.parse_args(["matmul", "nope"])
+    assert "nope" in capsys.readouterr().err
@@ -0,0 +1,74 @@
+# test_builtins.py
+# Registro de funciones internas (Builtins.py)
+#
+#   python -m pytest -q
+
+import contextlib
+import io
+import types
+
+import pytest
+
+import Builtins
+
+
+def test_registro_tiene_solo_lo_exportado():
+    expected = set()
+    for module in Builtins.BUILTIN_MODULES:
+        expected.update(module.DL_BUILTINS)
+    assert set(Builtins.REGISTRY) == expected
+
+
+@pytest.mark.parametrize("name", [
+    "Matrix", "SparseMatrix", "LU", "MLP", "Net", "CompetitiveNet", "KMeans",
+    "LinearRegressor", "Figure", "is_dense", "as_matrix", "mat_add_sub_chain",
+])
+def test_clases_y_utilidades_no_son_internas(name):
+    assert Builtins.lookup(name) is None
+    assert Builtins.resolve(name, 1) is None
+
+
+def test_aridad_con_opcionales():
+    builtin = Builtins.lookup("train_mlp")
+    assert builtin.accepts(5) and builtin.accepts(9)
+    assert not builtin.accepts(4) and not builtin.accepts(10)
+    with pytest.raises(Exception):
+        Builtins.resolve("sqrt", 2)
+
+
+def _module(name, **funcs):
+    module = types.ModuleType(name)
+    for fname, func in funcs.items():
+        func.__module__ = name
+        setattr(module, fname, func)
+    module.DL_BUILTINS = list(funcs)
+    return module
+
+
+def test_nombre_duplicado_es_error():
+    a = _module("mod_a", f=lambda x: x)
+    b = _module("mod_b", f=lambda x: x)
+    with pytest.raises(Exception, match="duplicada"):
+        Builtins.build_registry((a, b))
+
+
+def test_exportar_algo_que_no_es_funcion_es_error():
+    a = _module("mod_a", f=lambda x: x)
+    a.DL_BUILTINS.append("no_existe")
+    with pytest.raises(Exception, match="no_existe"):
+        Builtins.build_registry((a,))
+
+
+# Una funcion del usuario con el nombre de una utilidad no exportada se
+# llama normalmente, con cualquier motor
+@pytest.mark.parametrize("engine", ["tree", "compile", "vm"])
+def test_funcion_del_usuario_no_queda_tapada(engine):
+    pytest.importorskip("DLangParser")
+    import Main
+    from EvalVisitor import EvalVisitor
+
+    code = "def is_dense(n) {\n    return n * 2\n}\nprint(is_dense(21))\n"
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        Main.run_code(code, EvalVisitor(), engine=engine, use_cache=False)
+    assert out.getvalue().strip() == "42"
@@ -0,0 +1,74 @@
+# test_compiler.py
+# Motor "compile" (Compiler.py): mismos resultados y errores que el motor
+# "tree" (EvalVisitor). Se saltea si no esta el parser generado por ANTLR.
+#
+#   python -m pytest -q
+
+import contextlib
+import io
+
+import pytest
+
+pytest.importorskip("DLangParser")
+
+import Main
+from Compiler import compile_program
+from EvalVisitor import EvalVisitor
+
+
+PROGRAMS = {
+    "recursion": "def fib(n) {\n    if (n < 2) {\n        return n\n    }\n    return fib(n - 1) + fib(n - 2)\n}\nprint(fib(15))\n",
+    "while": "i = 0\ns = 0\nwhile (i < 100) {\n    s = s + i * 2 % 7 - 1\n    i = i + 1\n}\nprint(s)\n",
+    "operadores": "print(2 ^ 10)\nprint(7 / 2)\nprint(7 % 3)\nprint(-2.5 + +1)\nprint(not (1 < 2) or 3 >= 3 and \"a\" == \"a\")\n",
+    "textos_y_listas": "L = [1, [2, 3], \"s\"]\nprint(L)\nprint(\"ab\" + 'cd')\nprint([[1, 2], [3, 4]] * [[1, 0], [0, 1]])\n",
+    "if_else": "if (0) {\n    print(\"no\")\n} else {\n    print(\"si\")\n}\nif (\"\") {\n    print(1)\n}\n",
+    "return_vacio": "def g() {\n    return\n}\nprint(g())\n",
+    "internas": "print(sqrt(16))\nprint(factorial(10))\nprint(mat_transpose([[1, 2], [3, 4]]))\n",
+    "definida_despues": "def a(n) {\n    return b(n) + 1\n}\ndef b(n) {\n    return n * 10\n}\nprint(a(4))\n",
+}
+
+ERRORS = {
+    "variable": ("print(nada)\n", "Variable no definida: nada"),
+    "funcion": ("print(nada(1))\n", "Funcion no definida: nada"),
+    "aridad": ("print(sqrt(1, 2))\n", "sqrt"),
+}
+
+
+def _run(code, engine, visitor=None):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        Main.run_code(code, visitor or EvalVisitor(), engine=engine, use_cache=False)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("name", sorted(PROGRAMS))
+def test_igual_que_el_interprete(name):
+    code = PROGRAMS[name]
+    assert _run(code, "compile") == _run(code, "tree")
+
+
+@pytest.mark.parametrize("name", sorted(ERRORS))
+@pytest.mark.parametrize("engine", ["tree", "compile"])
+def test_mismos_errores(name, engine):
+    code, message = ERRORS[name]
+    with pytest.raises(Exception, match=message):
+        _run(code, engine)
+
+
+# El estado (globales y funciones) se conserva entre programas, como en el REPL
+def test_estado_entre_programas():
+    visitor = EvalVisitor()
+    _run("x = 5\ndef doble(n) {\n    return n * 2\n}\n", "compile", visitor)
+    assert _run("print(doble(x))\n", "compile", visitor) == "10\n"
+
+
+# Un programa compilado se puede ejecutar varias veces
+def test_programa_compilado_se_reutiliza():
+    visitor = EvalVisitor()
+    program = compile_program(Main.parse_code("n = n + 1\nprint(n)\n"), visitor)
+    visitor.env["n"] = 0
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        program()
+        program()
+    assert out.getvalue() == "1\n2\n"
@@ -0,0 +1,135 @@
+# test_frontend.py
+# Analisis en dos etapas (Frontend.py): el arbol y los errores deben ser los
+# mismos que con un parser nuevo en modo LL, como se hacia antes de Frontend.
+# Se saltea si no esta el parser generado por ANTLR.
+#
+#   python -m pytest -q
+
+import contextlib
+import io
+
+import pytest
+
+pytest.importorskip("DLangParser")
+
+from antlr4 import InputStream, CommonTokenStream
+from antlr4.error.Errors import ParseCancellationException
+from antlr4.error.ErrorStrategy import BailErrorStrategy
+
+import Frontend
+from DLangLexer import DLangLexer
+from DLangParser import DLangParser
+
+
+VALID = "def f(n) {\n    return n * 2\n}\nx = [1, 2, f(3)]\nif (x == 1) {\n    print(x)\n}\n"
+ERRORS = [
+    "x = 1\ny = (2 + \nprint(x)\n",
+    "print(1)\nx = = 3\n",
+    "a = [1, 2\nb = 3\n",
+]
+
+
+def _tree(tree):
+    return tree.toStringTree(recog=DLangParser(None))
+
+
+# Posicion (linea:columna) de cada error informado
+def _positions(stderr):
+    return [line.split(" ")[1] for line in stderr.splitlines() if line.startswith("line ")]
+
+
+# Analisis como antes de Frontend: un parser nuevo, prediccion LL
+def _reference(code):
+    err = io.StringIO()
+    with contextlib.redirect_stderr(err):
+        parser = DLangParser(CommonTokenStream(DLangLexer(InputStream(code))))
+        tree = parser.program()
+    return _tree(tree), _positions(err.getvalue())
+
+
+def _parse(frontend, code):
+    err = io.StringIO()
+    with contextlib.redirect_stderr(err):
+        tree = frontend.parse(code)
+    return _tree(tree), _positions(err.getvalue())
+
+
+def test_programa_valido_usa_sll():
+    frontend = Frontend.Frontend()
+    assert _parse(frontend, VALID) == _reference(VALID)
+    assert frontend.last_timing["mode"] == "SLL"
+
+
+@pytest.mark.parametrize("code", ERRORS)
+def test_error_de_sintaxis_igual_que_antes(code):
+    frontend = Frontend.Frontend()
+    tree, positions = _parse(frontend, code)
+    assert frontend.last_timing["mode"] == "LL"
+    assert (tree, positions) == _reference(code)
+    assert positions
+
+
+# La etapa 1 se corta a mitad del programa: la etapa 2 debe empezar desde el
+# primer token y dar el mismo arbol que un analisis LL completo
+class _BailMidway(BailErrorStrategy):
+
+    def sync(self, recognizer):
+        if recognizer.getCurrentToken().tokenIndex > 10:
+            raise ParseCancellationException("corte de prueba")
+
+
+def test_etapa_ll_empieza_desde_el_primer_token(monkeypatch):
+    monkeypatch.setattr(Frontend, "BailErrorStrategy", _BailMidway)
+    frontend = Frontend.Frontend()
+    tree, positions = _parse(frontend, VALID)
+    assert frontend.last_timing["mode"] == "LL"
+    assert (tree, positions) == _reference(VALID)
+    assert positions == []
+
+
+def test_reutilizar_despues_de_un_error():
+    frontend = Frontend.Frontend()
+    for code in ERRORS:
+        _parse(frontend, code)
+    assert _parse(frontend, VALID) == _reference(VALID)
+    assert frontend.last_timing["mode"] == "SLL"
+
+
+# ---------- Arbol serializable (cache en disco) ----------
+
+def test_arbol_serializado_es_el_mismo():
+    frontend = Frontend.Frontend()
+    tree = frontend.parse(VALID)
+    copy = Frontend.decode_tree(Frontend.encode_tree(tree))
+    assert _tree(copy) == _tree(tree)
+    assert copy.getText() == tree.getText()
+    assert (copy.start.line, copy.stop.type) == (tree.start.line, tree.stop.type)
+
+
+@pytest.mark.parametrize("code", ERRORS)
+def test_arbol_con_errores_no_se_serializa(code):
+    with contextlib.redirect_stderr(io.StringIO()):
+        tree = Frontend.Frontend().parse(code)
+    assert Frontend.encode_tree(tree) is None
+
+
+def test_segunda_ejecucion_no_analiza(tmp_path, monkeypatch):
+    import Main
+    import ProgramCache
+    from EvalVisitor import EvalVisitor
+
+    script = tmp_path / "f.dl"
+    script.write_text("def f(n) {\n    return n * 2\n}\nprint(f(21) + sqrt(4))\n")
+    frontend = Frontend.Frontend()
+    monkeypatch.setattr(Main, "frontend", frontend)
+    outputs = []
+    for _ in range(2):
+        # un cache en memoria nuevo, como en un proceso nuevo
+        monkeypatch.setattr(Main, "program_cache", ProgramCache.ProgramCache())
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            Main.run_code(script.read_text(), EvalVisitor(), filename=str(script))
+        outputs.append(out.getvalue())
+    assert outputs == ["44.0\n", "44.0\n"]
+    assert frontend.sll_parses + frontend.ll_parses == 1
+    assert len(list((tmp_path / "__dlcache__").iterdir())) == 1
@@ -0,0 +1,245 @@
+# test_matrix.py
+# Operaciones de matrices (Matrix.py)
+#
+#   python -m pytest -q
+
+import contextlib
+import io
+import random
+
+import pytest
+
+import Matrix
+
+
+def _m(rows):
+    return Matrix.Matrix.from_rows(rows)
+
+
+def _close(A, B, tol=1e-9):
+    A = A.tolist() if isinstance(A, Matrix.Matrix) else A
+    B = B.tolist() if isinstance(B, Matrix.Matrix) else B
+    if A and isinstance(A[0], list):
+        return all(_close(a, b, tol) for a, b in zip(A, B)) and len(A) == len(B)
+    return len(A) == len(B) and all(abs(a - b) <= tol for a, b in zip(A, B))
+
+
+# ---------- Factorizacion LU ----------
+
+S = [[4.0, -2.0, 1.0], [-2.0, 4.0, -2.0], [1.0, -2.0, 4.0]]
+
+
+def test_mat_solve():
+    x = Matrix.mat_solve(S, [11, -16, 17])
+    assert _close(x, [1.0, -2.0, 3.0])
+
+
+def test_lu_se_reutiliza_y_acepta_matrices():
+    F = Matrix.lu_factor(S)
+    for b in ([1, 0, 0], [0, 1, 0], [3, 2, 1]):
+        x = Matrix.lu_solve(F, b)
+        assert _close(Matrix.mat_mul(S, [[v] for v in x]).tolist(), [[v] for v in b])
+    X = Matrix.lu_solve(F, Matrix.mat_identity(3))
+    assert _close(X, Matrix.mat_inverse(S))
+
+
+def test_mat_det_con_pivoteo():
+    assert Matrix.mat_det([[2, 0, 0], [0, 3, 0], [0, 0, 4]]) == 24
+    assert Matrix.mat_det([[0, 1], [1, 0]]) == -1
+    assert abs(Matrix.mat_det(S) - 36.0) < 1e-9
+
+
+def test_matriz_singular():
+    F = Matrix.lu_factor([[1, 2], [2, 4]])
+    assert F.det() == 0.0
+    with pytest.raises(ValueError, match="singular"):
+        Matrix.lu_solve(F, [1, 2])
+
+
+@pytest.mark.parametrize("call", [
+    lambda: Matrix.lu_factor([[1, 2, 3], [4, 5, 6]]),
+    lambda: Matrix.mat_solve(S, [1, 2]),
+    lambda: Matrix.lu_solve([[1]], [1]),
+])
+def test_errores_de_lu(call):
+    with pytest.raises(ValueError):
+        call()
+
+
+# ---------- Potencia de matrices ----------
+
+def test_potencia_fibonacci():
+    F = Matrix.mat_pow([[1, 1], [1, 0]], 10)
+    assert F.tolist() == [[89.0, 55.0], [55.0, 34.0]]
+
+
+def test_potencia_cero_y_uno():
+    A = _m([[2, 1], [0, 3]])
+    assert Matrix.as_matrix(Matrix.mat_pow(A, 0)).tolist() == [[1.0, 0.0], [0.0, 1.0]]
+    P = Matrix.mat_pow(A, 1)
+    assert P.tolist() == A.tolist()
+    assert P.data is not A.data
+
+
+def test_potencia_negativa_usa_la_inversa():
+    A = [[2.0, 1.0], [1.0, 1.0]]
+    P = Matrix.mat_pow(A, -3)
+    assert _close(Matrix.mat_mul(P, Matrix.mat_pow(A, 3)), [[1.0, 0.0], [0.0, 1.0]])
+
+
+def test_potencia_invalida():
+    with pytest.raises(ValueError):
+        Matrix.mat_pow([[1, 2, 3], [4, 5, 6]], 2)
+    with pytest.raises(ValueError):
+        Matrix.mat_pow([[1, 2], [3, 4]], 1.5)
+
+
+# ---------- Matrices dispersas (CSR) ----------
+
+def _random_sparse_rows(r, c, seed, density=0.2):
+    rng = random.Random(seed)
+    return [[rng.uniform(-2, 2) if rng.random() < density else 0.0 for _ in range(c)] for _ in range(r)]
+
+
+A_SP = _random_sparse_rows(9, 7, 1)
+B_SP = _random_sparse_rows(7, 6, 2)
+C_SP = _random_sparse_rows(9, 7, 3)
+
+
+def test_dispersa_ida_y_vuelta():
+    S = Matrix.sparse_from_dense(A_SP)
+    assert Matrix.sparse_nnz(S) == sum(v != 0.0 for row in A_SP for v in row)
+    assert Matrix.sparse_to_dense(S).tolist() == A_SP
+    assert Matrix.mat_transpose(S).to_dense().tolist() == Matrix.mat_transpose(A_SP).tolist()
+
+
+def test_tripletes_suman_repetidos_y_descartan_ceros():
+    S = Matrix.sparse_from_triplets(2, 3, [[0, 1, 2.0], [0, 1, 3.0], [1, 2, 4.0], [1, 0, 1.0], [1, 0, -1.0]])
+    assert Matrix.sparse_nnz(S) == 2
+    assert S.to_dense().tolist() == [[0.0, 5.0, 0.0], [0.0, 0.0, 4.0]]
+    with pytest.raises(ValueError, match="fuera"):
+        Matrix.sparse_from_triplets(2, 2, [[2, 0, 1.0]])
+
+
+@pytest.mark.parametrize("sparse_a, sparse_b", [(True, True), (True, False), (False, True)])
+def test_productos_dispersos_igual_que_densos(sparse_a, sparse_b):
+    A = Matrix.sparse_from_dense(A_SP) if sparse_a else A_SP
+    B = Matrix.sparse_from_dense(B_SP) if sparse_b else B_SP
+    C = Matrix.mat_mul(A, B)
+    assert isinstance(C, Matrix.SparseMatrix) == (sparse_a and sparse_b)
+    assert _close(Matrix.sparse_to_dense(C), Matrix.mat_mul(A_SP, B_SP))
+
+
+def test_suma_y_resta_dispersas():
+    A = Matrix.sparse_from_dense(A_SP)
+    C = Matrix.sparse_from_dense(C_SP)
+    total = Matrix.mat_add(A, C)
+    assert isinstance(total, Matrix.SparseMatrix)
+    assert _close(total.to_dense(), Matrix.mat_add(A_SP, C_SP))
+    diff = Matrix.mat_sub(A, C_SP)
+    assert isinstance(diff, Matrix.Matrix)
+    assert _close(diff, Matrix.mat_sub(A_SP, C_SP))
+    assert Matrix.sparse_nnz(Matrix.mat_sub(A, A)) == 0
+
+
+def test_errores_de_dispersas():
+    with pytest.raises(ValueError):
+        Matrix.mat_mul(Matrix.sparse_from_dense(A_SP), A_SP)
+    with pytest.raises(ValueError):
+        Matrix.mat_add(Matrix.sparse_from_dense(A_SP), B_SP)
+    with pytest.raises(ValueError):
+        Matrix.sparse_nnz(A_SP)
+
+
+# ---------- Cadenas de sumas y restas ----------
+
+def test_cadena_fusionada_igual_que_de_a_pares():
+    rng = random.Random(4)
+    Ms = [[[rng.uniform(-1, 1) for _ in range(5)] for _ in range(4)] for _ in range(4)]
+    fused = Matrix.mat_add_sub_chain(Ms, ["add", "sub", "add"])
+    pairwise = Matrix.mat_add(Matrix.mat_sub(Matrix.mat_add(Ms[0], Ms[1]), Ms[2]), Ms[3])
+    assert fused.tolist() == pairwise.tolist()
+    with pytest.raises(ValueError, match="resta"):
+        Matrix.mat_add_sub_chain([Ms[0], Ms[1], [[1.0]]], ["add", "sub"])
+
+
+def test_cadena_con_terminos_que_no_son_densos():
+    import Operators
+
+    A = [[1.0, 2.0], [3.0, 4.0]]
+    S = Matrix.sparse_from_dense([[0.0, 1.0], [0.0, 0.0]])
+    terms = [('+', A), ('-', S), ('+', A)]
+    result = Operators.add_sub_chain(A, iter(terms))
+    assert Matrix.as_matrix(result).tolist() == [[3.0, 5.0], [9.0, 12.0]]
+    assert Operators.add_sub_chain(1, iter([('+', 2), ('-', 5)])) == -2
+
+
+@pytest.mark.parametrize("engine", ["tree", "compile", "vm"])
+def test_cadena_en_dlang(engine):
+    pytest.importorskip("DLangParser")
+    import Main
+    from EvalVisitor import EvalVisitor
+
+    code = ("A = [[1, 2], [3, 4]]\n"
+            "B = [[0, 1], [1, 0]]\n"
+            "D = [[1, 1], [1, 1]]\n"
+            "print(A + B + D - A + B)\n")
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        Main.run_code(code, EvalVisitor(), engine=engine, use_cache=False)
+    assert out.getvalue().strip() == "[[1.0, 3.0], [3.0, 1.0]]"
+
+
+# ---------- Operaciones en el lugar ----------
+
+def test_operaciones_en_el_lugar():
+    A = _m([[1, 2], [3, 4]])
+    assert Matrix.mat_add_inplace(A, [[1, 1], [1, 1]]) is A
+    assert A.tolist() == [[2, 3], [4, 5]]
+    Matrix.mat_scale_inplace(A, 2)
+    assert A.tolist() == [[4, 6], [8, 10]]
+    Y = [[1.0, 1.0], [1.0, 1.0]]
+    assert Matrix.axpy(0.5, A, Y) is Y
+    assert Y == [[3.0, 4.0], [5.0, 6.0]]
+    with pytest.raises(ValueError):
+        Matrix.mat_add_inplace(A, [[1, 2, 3]])
+
+
+def test_escribir_en_la_traspuesta_no_cambia_la_original():
+    M = Matrix.mat_mul(_m([[1, 2], [3, 4]]), Matrix.mat_identity(2))
+    T = Matrix.mat_transpose(M)
+    Matrix.mat_scale_inplace(T, 10)
+    assert M.tolist() == [[1, 2], [3, 4]]
+    assert T.tolist() == [[10, 30], [20, 40]]
+
+
+def test_escribir_en_la_original_no_cambia_la_traspuesta():
+    M = _m([[1, 2], [3, 4]])
+    T = Matrix.mat_transpose(M)
+    Matrix.axpy(1, [[1, 1], [1, 1]], M)
+    Matrix.mat_add_inplace(M, [[1, 1], [1, 1]])
+    assert M.tolist() == [[3, 4], [5, 6]]
+    assert T.tolist() == [[1, 3], [2, 4]]
+
+
+def test_sin_traspuesta_no_se_copia():
+    A = _m([[1, 2], [3, 4]])
+    data = A.data
+    Matrix.mat_scale_inplace(A, 3)
+    assert A.data is data
+
+
+@pytest.mark.parametrize("engine", ["tree", "compile", "vm"])
+def test_traspuesta_en_dlang(engine):
+    pytest.importorskip("DLangParser")
+    import Main
+    from EvalVisitor import EvalVisitor
+
+    code = ("M = mat_mul([[1, 2], [3, 4]], mat_identity(2))\n"
+            "T = mat_transpose(M)\n"
+            "mat_scale_inplace(T, 10)\n"
+            "print(M)\n")
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        Main.run_code(code, EvalVisitor(), engine=engine, use_cache=False)
+    assert out.getvalue().strip() == "[[1.0, 2.0], [3.0, 4.0]]"
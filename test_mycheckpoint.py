@@ -0,0 +1,134 @@
+# test_mycheckpoint.py
+# Guardar y cargar modelos (MyCheckpoint.py)
+#
+#   python -m pytest -q
+
+import pytest
+
+import MyCheckpoint
+import MyClusterNN
+import MyMLP
+
+
+X = [[0.0, 0.1], [0.2, 0.0], [5.0, 5.1], [5.2, 4.9], [9.8, 0.2], [10.0, 0.0]]
+
+
+def test_mlp_ida_y_vuelta(tmp_path):
+    model = MyMLP.create_mlp(2, 3, 1)
+    MyMLP.train_mlp(model, X, [0, 0, 1, 1, 1, 1], 0.5, 5)
+    path = tmp_path / "mlp.dlm"
+    MyCheckpoint.save_model(model, path)
+    loaded = MyCheckpoint.load_model(path)
+    assert (loaded.W1, loaded.b1, loaded.W2, loaded.b2) == (model.W1, model.b1, model.W2, model.b2)
+
+
+def test_red_competitiva_sigue_siendo_red_competitiva(tmp_path):
+    net = MyClusterNN.create_cluster_net(2, 3)
+    MyClusterNN.train_cluster_net(net, X, 0.2, 3)
+    path = tmp_path / "red.dlm"
+    MyCheckpoint.save_model(net, path)
+    loaded = MyCheckpoint.load_model(path)
+    assert type(loaded) is MyClusterNN.CompetitiveNet
+    assert loaded.centers == net.centers
+
+
+@pytest.mark.parametrize("batch_size", [None, 2])
+def test_kmeans_ida_y_vuelta(tmp_path, batch_size):
+    model = MyClusterNN.create_kmeans(2, 3, 11)
+    MyClusterNN.train_kmeans(model, X, 10, batch_size)
+    path = tmp_path / "kmeans.dlm"
+    MyCheckpoint.save_model(model, path)
+    loaded = MyCheckpoint.load_model(path)
+    assert type(loaded) is MyClusterNN.KMeans
+    assert loaded.seed == 11
+    assert loaded.centers == model.centers
+    assert MyClusterNN.inertia_history(loaded) == MyClusterNN.inertia_history(model)
+    assert MyClusterNN.predict_cluster(loaded, X) == MyClusterNN.predict_cluster(model, X)
+
+    # el modelo cargado se guarda igual byte a byte
+    again = tmp_path / "otra_vez.dlm"
+    MyCheckpoint.save_model(loaded, again)
+    assert again.read_bytes() == path.read_bytes()
+
+
+def test_kmeans_sin_entrenar(tmp_path):
+    model = MyClusterNN.create_kmeans(3, 2)
+    path = tmp_path / "vacio.dlm"
+    MyCheckpoint.save_model(model, path)
+    loaded = MyCheckpoint.load_model(path)
+    assert type(loaded) is MyClusterNN.KMeans
+    assert loaded.centers == model.centers and loaded.inertia_history == []
+
+
+@pytest.mark.parametrize("activation", ["sigmoid", "tanh", "relu"])
+def test_net_ida_y_vuelta(tmp_path, activation):
+    net = MyMLP.create_net([2, 4, 3], activation)
+    MyMLP.train_net(net, X, [0, 0, 1, 1, 2, 2], 0.3, 5, batch_size=2)
+    path = tmp_path / "net.dlm"
+    MyCheckpoint.save_model(net, path)
+    loaded = MyCheckpoint.load_model(path)
+    assert type(loaded) is MyMLP.Net
+    assert (loaded.layers, loaded.activation) == ([2, 4, 3], activation)
+    assert loaded.params == net.params
+    assert MyMLP.predict_real_net(loaded, X) == MyMLP.predict_real_net(net, X)
+
+
+def test_guardar_dos_veces_da_el_mismo_archivo(tmp_path):
+    model = MyMLP.create_mlp(2, 3, 1)
+    MyCheckpoint.save_model(model, tmp_path / "a.dlm")
+    MyCheckpoint.save_model(model, tmp_path / "b.dlm")
+    data = (tmp_path / "a.dlm").read_bytes()
+    assert data == (tmp_path / "b.dlm").read_bytes()
+    assert data.startswith(MyCheckpoint.MAGIC) and len(data) % 8 == 0
+    assert not (tmp_path / "a.dlm.tmp").exists()
+
+
+def _saved(tmp_path):
+    path = tmp_path / "modelo.dlm"
+    MyCheckpoint.save_model(MyMLP.create_mlp(2, 3, 1), path)
+    return path
+
+
+def test_archivo_no_encontrado(tmp_path):
+    with pytest.raises(ValueError, match="^Archivo no encontrado"):
+        MyCheckpoint.load_model(tmp_path / "no_existe.dlm")
+
+
+@pytest.mark.parametrize("data", [b"", b"hola", b"NOMODEL\0" + bytes(40)])
+def test_no_es_un_modelo(tmp_path, data):
+    path = tmp_path / "otro.dlm"
+    path.write_bytes(data)
+    with pytest.raises(ValueError, match="^No es un archivo de modelo"):
+        MyCheckpoint.load_model(path)
+
+
+def test_version_no_soportada(tmp_path):
+    path = _saved(tmp_path)
+    data = bytearray(path.read_bytes())
+    data[8] = MyCheckpoint.VERSION + 1
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="^Version de modelo no soportada"):
+        MyCheckpoint.load_model(path)
+
+
+@pytest.mark.parametrize("cut", [24, 100, -8])
+def test_archivo_danado(tmp_path, cut):
+    path = _saved(tmp_path)
+    data = path.read_bytes()
+    path.write_bytes(data[:cut] if cut > 0 else data + bytes(-cut))
+    with pytest.raises(ValueError, match="^Archivo de modelo danado"):
+        MyCheckpoint.load_model(path)
+
+
+def test_tipo_desconocido(tmp_path):
+    path = _saved(tmp_path)
+    data = bytearray(path.read_bytes())
+    data[12] = 99
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="^Tipo de modelo desconocido"):
+        MyCheckpoint.load_model(path)
+
+
+def test_guardar_algo_que_no_es_modelo(tmp_path):
+    with pytest.raises(ValueError, match="^save_model espera un modelo"):
+        MyCheckpoint.save_model([1, 2, 3], tmp_path / "lista.dlm")
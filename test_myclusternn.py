@@ -0,0 +1,88 @@
+# test_myclusternn.py
+# Red competitiva y k-means (MyClusterNN.py)
+#
+#   python -m pytest -q
+
+import random
+
+import pytest
+
+import MyClusterNN
+
+
+X = [[0.0, 0.1], [0.2, 0.0], [5.0, 5.1], [5.2, 4.9], [9.8, 0.2], [10.0, 0.0]]
+
+
+def test_kmeans_entrena_y_agrupa():
+    model = MyClusterNN.create_kmeans(2, 3, 5)
+    MyClusterNN.train_kmeans(model, X, 20)
+    history = MyClusterNN.inertia_history(model)
+    assert history[-1] == pytest.approx(0.105)
+    labels = MyClusterNN.predict_cluster(model, X)
+    assert labels[0] == labels[1] and labels[2] == labels[3] and labels[4] == labels[5]
+    assert len(set(labels)) == 3
+
+
+def test_train_cluster_net_rechaza_kmeans():
+    model = MyClusterNN.create_kmeans(2, 3)
+    with pytest.raises(ValueError, match="train_kmeans"):
+        MyClusterNN.train_cluster_net(model, X, 0.2, 5)
+
+
+def test_train_kmeans_rechaza_red_competitiva():
+    net = MyClusterNN.create_cluster_net(2, 3)
+    with pytest.raises(ValueError, match="create_kmeans"):
+        MyClusterNN.train_kmeans(net, X, 20)
+
+
+def test_red_competitiva_mueve_los_centros():
+    net = MyClusterNN.create_cluster_net(2, 3)
+    before = [list(c) for c in net.centers]
+    MyClusterNN.train_cluster_net(net, X, 0.2, 5)
+    assert net.centers != before
+
+
+# ---------- Centro mas cercano (arbol k-d y recorrido lineal) ----------
+
+def _brute_force(centers, X):
+    return [min(range(len(centers)), key=lambda j: (MyClusterNN._squared_distance(x, centers[j]), j))
+            for x in X]
+
+
+def _net_with(centers):
+    net = MyClusterNN.create_cluster_net(len(centers[0]), len(centers))
+    net.centers = centers
+    return net
+
+
+@pytest.mark.parametrize("dim, k", [(1, 50), (2, 300), (3, 100), (8, 64), (12, 100), (2, 5)])
+def test_prediccion_igual_que_fuerza_bruta(dim, k):
+    rng = random.Random(dim * 1000 + k)
+    centers = [[rng.gauss(0, 3) for _ in range(dim)] for _ in range(k)]
+    X = [[rng.gauss(0, 4) for _ in range(dim)] for _ in range(400)]
+    index = MyClusterNN._CenterIndex(centers)
+    uses_tree = dim <= MyClusterNN.KD_MAX_DIM and k >= MyClusterNN.KD_MIN_CENTERS
+    assert (index.root is not None) == uses_tree
+    assert MyClusterNN.predict_cluster(_net_with(centers), X) == _brute_force(centers, X)
+
+
+def test_empates_gana_el_menor_indice():
+    # reticula de enteros (en orden desordenado, con un centro repetido):
+    # los puntos medios estan a la misma distancia exacta de 2 o 4 centros
+    rng = random.Random(7)
+    centers = [[float(i), float(j)] for i in range(8) for j in range(8)]
+    rng.shuffle(centers)
+    centers.append(list(centers[10]))
+    X = [[i + 0.5, j + 0.5] for i in range(7) for j in range(7)]
+    X += [[i + 0.5, float(j)] for i in range(7) for j in range(8)]
+    assert MyClusterNN._CenterIndex(centers).root is not None
+    labels = MyClusterNN.predict_cluster(_net_with(centers), X)
+    assert labels == _brute_force(centers, X)
+    assert MyClusterNN.predict_cluster(_net_with(centers), [centers[10]]) == [10]
+
+
+@pytest.mark.parametrize("k", [5, 64])
+def test_dimension_incorrecta_al_predecir(k):
+    net = _net_with([[float(j), 0.0] for j in range(k)])
+    with pytest.raises(ValueError):
+        MyClusterNN.predict_cluster(net, [[1.0, 2.0, 3.0]])
@@ -0,0 +1,81 @@
+# test_mymath.py
+# Funciones matematicas (MyMath.py) contra el modulo math de Python, en
+# particular la reduccion de rango con argumentos grandes
+#
+#   python -m pytest -q
+
+import math
+
+import pytest
+
+import MyMath
+
+
+ULP = 4e-16
+
+
+@pytest.mark.parametrize("x", [
+    0.5, -2.0, 100.0, 2.0 ** 20, 2.0 ** 20 + 1, 1e9, -1e10, 1e15, 1e22, 1e100, -1e300,
+])
+def test_sin_cos_con_argumentos_grandes(x):
+    assert abs(MyMath.sin(x) - math.sin(x)) <= ULP
+    assert abs(MyMath.cos(x) - math.cos(x)) <= ULP
+
+
+def test_tan_con_argumento_grande():
+    x = 1e22
+    assert abs(MyMath.tan(x) - math.tan(x)) <= ULP * abs(math.tan(x)) * 4
+
+
+def test_lista_mezcla_argumentos_chicos_y_grandes():
+    xs = [0.1, 1e22, -3.0, 1e300]
+    assert all(abs(a - math.sin(x)) <= ULP for a, x in zip(MyMath.sin(xs), xs))
+
+
+@pytest.mark.parametrize("x", [3.0, 1e7, 1e22])
+def test_reducir_angulo(x):
+    r = MyMath.reducir_angulo(x)
+    assert -math.pi <= r <= math.pi
+    assert abs(math.sin(r) - math.sin(x)) <= ULP
+    assert abs(math.cos(r) - math.cos(x)) <= ULP
+
+
+@pytest.mark.parametrize("x", [math.inf, -math.inf, math.nan])
+def test_no_finito_es_error(x):
+    with pytest.raises(ValueError):
+        MyMath.sin(x)
+
+
+# ---------- Potencia, factorial y binomial ----------
+
+@pytest.mark.parametrize("x, y", [(3, 0), (3, 1), (2, 10), (-3, 7), (1.5, 5), (7, 200)])
+def test_potencia_entera(x, y):
+    assert MyMath.potencia(x, y) == x ** y
+
+
+def test_potencia_negativa_y_fraccionaria():
+    assert MyMath.potencia(2, -3) == 0.125
+    assert MyMath.potencia(9, 0.5) == 3.0
+    assert MyMath.potencia([1, 2, 3], 2) == [1, 4, 9]
+
+
+def test_factorial_exacto_y_memorizado():
+    for n in (0, 1, 5, 20, 100, 1500):
+        assert MyMath.factorial(n) == math.factorial(n)
+    # Los valores pedidos quedan en la tabla, hasta el limite
+    assert len(MyMath._FACTORIALS) == MyMath._FACTORIAL_MEMO
+    assert MyMath._FACTORIALS[100] == math.factorial(100)
+    with pytest.raises(ValueError):
+        MyMath.factorial(-1)
+
+
+@pytest.mark.parametrize("n, k", [(0, 0), (5, 2), (10, 10), (52, 5), (3000, 40), (4, 7)])
+def test_binomial(n, k):
+    assert MyMath.binomial(n, k) == math.comb(n, k)
+
+
+def test_binomial_invalido():
+    with pytest.raises(ValueError):
+        MyMath.binomial(5, -1)
+    with pytest.raises(ValueError):
+        MyMath.binomial(5.5, 2)
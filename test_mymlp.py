@@ -0,0 +1,223 @@
+# test_mymlp.py
+# Perceptron (MyMLP.py): prediccion con una y varias salidas y entrenamiento
+#
+#   python -m pytest -q
+
+import copy
+import math
+
+import pytest
+
+import MyMLP
+
+
+X = [[0.0, 0.0], [0.0, 1.0], [1.0, 0.0], [1.0, 1.0]]
+
+
+def test_una_salida_da_un_0_1_por_ejemplo():
+    model = MyMLP.create_mlp(2, 3, 1)
+    labels = MyMLP.predict_mlp(model, X)
+    assert len(labels) == len(X)
+    assert all(label in (0, 1) for label in labels)
+    assert labels == [1 if v >= 0.5 else 0 for v in MyMLP.predict_real_mlp(model, X)]
+
+
+def test_dos_salidas_se_umbralizan_por_separado():
+    model = MyMLP.create_mlp(2, 3, 2)
+    # salidas fijas: sigmoide(5) > 0.5 y sigmoide(-5) < 0.5
+    model.W2 = [[0.0] * 3 for _ in range(2)]
+    model.b2 = [5.0, -5.0]
+    assert MyMLP.predict_mlp(model, X) == [[1, 0]] * len(X)
+    assert MyMLP.classify_mlp(model, X) == [[1, 0]] * len(X)
+    assert model.predict_one(X[0]) == [1, 0]
+
+
+def test_dos_salidas_coinciden_con_las_salidas_reales():
+    model = MyMLP.create_mlp(2, 4, 2)
+    real = MyMLP.predict_real_mlp(model, X)
+    labels = MyMLP.predict_mlp(model, X)
+    assert [len(row) for row in real] == [2] * len(X)
+    assert labels == [[1 if v >= 0.5 else 0 for v in row] for row in real]
+    assert labels == [model.predict_one(x) for x in X]
+
+
+# ---------- Entrenamiento por mini-lotes ----------
+
+Y_XOR = [0, 1, 1, 0]
+
+
+def _mean_loss(model, X, Y):
+    outs = MyMLP.predict_real_mlp(model, X)
+    return sum(0.5 * (o - y) ** 2 for o, y in zip(outs, Y)) / len(X)
+
+
+def test_un_lote_completo_es_un_paso_de_gradiente():
+    # Con batch_size = len(X) y una epoca, el cambio de cada peso es
+    # -lr * (derivada de la perdida media), que se compara con diferencias finitas
+    model = MyMLP.create_mlp(2, 3, 1)
+    before = copy.deepcopy(model)
+    lr, h = 0.01, 1e-6
+    MyMLP.train_mlp(model, X, Y_XOR, lr, 1, batch_size=len(X))
+    for name in ("W1", "W2"):
+        for r, row in enumerate(getattr(before, name)):
+            for c in range(len(row)):
+                probe = copy.deepcopy(before)
+                getattr(probe, name)[r][c] += h
+                up = _mean_loss(probe, X, Y_XOR)
+                getattr(probe, name)[r][c] -= 2 * h
+                grad = (up - _mean_loss(probe, X, Y_XOR)) / (2 * h)
+                step = getattr(model, name)[r][c] - row[c]
+                assert abs(step + lr * grad) < 1e-9
+
+
+def test_mini_lotes_aprenden_xor():
+    # lotes de 3: el ultimo de cada epoca tiene un solo ejemplo
+    model = MyMLP.create_mlp(2, 4, 1)
+    MyMLP.train_mlp(model, X, Y_XOR, 2.0, 2000, batch_size=3)
+    assert len(model.loss_history) == 2000
+    assert model.loss_history[-1] < 0.01 < model.loss_history[0]
+    assert MyMLP.predict_mlp(model, X) == Y_XOR
+
+
+def test_batch_size_cero_es_ejemplo_a_ejemplo():
+    a = MyMLP.train_mlp(MyMLP.create_mlp(2, 3, 1), X, Y_XOR, 0.3, 20)
+    b = MyMLP.train_mlp(MyMLP.create_mlp(2, 3, 1), X, Y_XOR, 0.3, 20, batch_size=0)
+    assert (a.W1, a.W2, a.b1, a.b2) == (b.W1, b.W2, b.b1, b.b2)
+
+
+@pytest.mark.parametrize("batch_size", [-1, 1.5])
+def test_batch_size_invalido(batch_size):
+    with pytest.raises(ValueError, match="batch_size"):
+        MyMLP.train_mlp(MyMLP.create_mlp(2, 3, 1), X, Y_XOR, 0.1, 1, batch_size=batch_size)
+
+
+# ---------- Red por capas (Net) ----------
+
+# Tres grupos de puntos en el plano, uno por clase
+X3 = [[0.0, 0.0], [0.2, 0.1], [0.1, 0.3], [2.0, 2.0], [2.2, 1.9], [1.8, 2.1],
+      [0.0, 2.0], [0.1, 2.2], [-0.2, 1.9]]
+Y3 = [0, 0, 0, 1, 1, 1, 2, 2, 2]
+
+
+def test_parametros_en_un_solo_buffer():
+    net = MyMLP.create_net([2, 4, 3, 3])
+    assert len(net.params) == 4 * 3 + 3 * 5 + 3 * 4
+    W, b = net.layer_views()[1]
+    assert (W.rows, W.cols, b.cols) == (3, 4, 3)
+    W[0, 0] = 7.0
+    assert net.params[net.offsets[1][0]] == 7.0
+    assert all(v == 0.0 for _, b in net.layer_views() for v in b.flat())
+
+
+def test_softmax_suma_uno_sin_desbordes():
+    net = MyMLP.create_net([2, 3])
+    W, _ = net.layer_views()[0]
+    W[0, 0] = 1000.0
+    rows = MyMLP.predict_real_net(net, X3 + [[5.0, -5.0]])
+    assert all(abs(sum(row) - 1.0) < 1e-12 for row in rows)
+    assert rows[-1][0] == 1.0
+
+
+def _mean_cross_entropy(net, X, Y):
+    probs = MyMLP.predict_real_net(net, X)
+    return -sum(math.log(p[y]) for p, y in zip(probs, Y)) / len(X)
+
+
+@pytest.mark.parametrize("activation", ["sigmoid", "tanh", "relu"])
+def test_gradiente_de_net(activation):
+    # puntos corridos para que ningun z quede en 0, donde relu no es derivable
+    Xs = [[a + 0.05, b - 0.03] for a, b in X3]
+    net = MyMLP.create_net([2, 5, 3], activation)
+    before = list(net.params)
+    lr, h = 0.01, 1e-6
+    MyMLP.train_net(net, Xs, Y3, lr, 1, batch_size=len(Xs))
+    for i in range(len(before)):
+        probe = MyMLP.Net([2, 5, 3], activation, before)
+        probe.params[i] += h
+        up = _mean_cross_entropy(probe, Xs, Y3)
+        probe.params[i] -= 2 * h
+        grad = (up - _mean_cross_entropy(probe, Xs, Y3)) / (2 * h)
+        assert abs(net.params[i] - before[i] + lr * grad) < 1e-8
+
+
+@pytest.mark.parametrize("activation", ["sigmoid", "tanh", "relu"])
+def test_net_aprende_tres_clases(activation):
+    net = MyMLP.create_net([2, 6, 3], activation)
+    MyMLP.train_net(net, X3, Y3, 0.5, 300, batch_size=3)
+    assert MyMLP.predict_net(net, X3) == Y3
+    assert net.loss_history[-1] < net.loss_history[0]
+
+
+def test_net_con_una_salida_es_binaria():
+    net = MyMLP.create_net([2, 4, 1], "tanh")
+    MyMLP.train_net(net, X, [0, 0, 0, 1], 1.0, 500)
+    assert MyMLP.predict_net(net, X) == [0, 0, 0, 1]
+
+
+@pytest.mark.parametrize("call", [
+    lambda: MyMLP.create_net([3]),
+    lambda: MyMLP.create_net([2, 0, 1]),
+    lambda: MyMLP.create_net([2, 1], "softplus"),
+    lambda: MyMLP.Net([2, 1], params=[0.0, 0.0]),
+    lambda: MyMLP.train_net(MyMLP.create_net([2, 3]), X3, [0] * 8 + [3], 0.1, 1),
+    lambda: MyMLP.train_net(MyMLP.create_net([2, 3]), X3, Y3[:-1], 0.1, 1),
+])
+def test_errores_de_net(call):
+    with pytest.raises(ValueError):
+        call()
+
+
+# ---------- Historial de perdida, parada temprana y tasa de aprendizaje ----------
+
+def test_historial_una_perdida_por_epoca():
+    net = MyMLP.create_net([2, 4, 3])
+    start = _mean_cross_entropy(net, X3, Y3)
+    MyMLP.train_net(net, X3, Y3, 0.2, 15, batch_size=len(X3))
+    history = MyMLP.loss_history(net)
+    assert len(history) == 15
+    # la perdida de cada epoca se mide antes de su actualizacion
+    assert history[0] == pytest.approx(start, rel=1e-12)
+    history.append(0.0)
+    assert len(net.loss_history) == 15
+
+
+def test_parada_temprana():
+    # con tolerancia enorme ninguna epoca mejora a la primera: 1 + patience epocas
+    model = MyMLP.train_mlp(MyMLP.create_mlp(2, 3, 1), X, Y_XOR, 0.3, 100,
+                            tolerance=10.0, patience=3)
+    assert len(model.loss_history) == 4
+    # sin aprendizaje la perdida no cambia; patience por defecto es 5
+    net = MyMLP.train_net(MyMLP.create_net([2, 3]), X3, Y3, 0.0, 100, tolerance=0.0)
+    assert len(net.loss_history) == 6
+    # patience = 0 desactiva la parada temprana
+    net = MyMLP.train_net(MyMLP.create_net([2, 3]), X3, Y3, 0.0, 20, tolerance=0.0, patience=0)
+    assert len(net.loss_history) == 20
+
+
+def test_tasas_de_aprendizaje_por_epoca():
+    def rates(schedule):
+        return [MyMLP._Plan(0.8, 4, schedule=schedule).rate(e) for e in range(4)]
+
+    assert rates(None) == rates("constant") == [0.8] * 4
+    assert rates("inverse") == [0.8, 0.4, 0.8 / 3, 0.2]
+    assert rates(0.5) == [0.8, 0.4, 0.2, 0.1]
+    cosine = rates("cosine")
+    assert cosine[0] == 0.8 and cosine[2] == pytest.approx(0.4)
+    assert cosine == sorted(cosine, reverse=True)
+
+
+def test_decaimiento_casi_nulo_solo_entrena_la_primera_epoca():
+    one = MyMLP.train_mlp(MyMLP.create_mlp(2, 3, 1), X, Y_XOR, 0.5, 1, batch_size=2)
+    many = MyMLP.train_mlp(MyMLP.create_mlp(2, 3, 1), X, Y_XOR, 0.5, 5, batch_size=2,
+                           schedule=1e-300)
+    assert (one.W1, one.W2, one.b1, one.b2) == (many.W1, many.W2, many.b1, many.b2)
+    assert len(many.loss_history) == 5
+
+
+@pytest.mark.parametrize("options", [
+    {"schedule": "linear"}, {"schedule": 0}, {"schedule": 1.5},
+    {"tolerance": -1}, {"patience": -1}, {"patience": 1.5},
+])
+def test_opciones_de_entrenamiento_invalidas(options):
+    with pytest.raises(ValueError):
+        MyMLP.train_net(MyMLP.create_net([2, 3]), X3, Y3, 0.1, 1, **options)
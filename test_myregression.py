@@ -0,0 +1,124 @@
+# test_myregression.py
+# Regresion lineal simple y multiple incremental (MyRegression.py)
+#
+#   python -m pytest -q
+
+import random
+
+import pytest
+
+import MyFile
+import MyRegression
+
+
+# y = 2 x1 - 3 x2 + 0.5 x3 + 4, sin ruido
+W = [2.0, -3.0, 0.5]
+B = 4.0
+
+
+def _data(n, seed, offset=0.0):
+    rng = random.Random(seed)
+    xs = [[offset + rng.uniform(-5, 5) for _ in W] for _ in range(n)]
+    ys = [sum(w * v for w, v in zip(W, x)) + B for x in xs]
+    return xs, ys
+
+
+def _close(a, b, tol=1e-9):
+    return len(a) == len(b) and all(abs(u - v) <= tol for u, v in zip(a, b))
+
+
+def test_regresion_lineal_simple():
+    m, b = MyRegression.regresion_lineal([0, 1, 2, 3], [1, 3, 5, 7])
+    assert (m, b) == (2.0, 1.0)
+    assert MyRegression.predecir_lineal([10, -1], [m, b]) == [21.0, -1.0]
+    with pytest.raises(ValueError):
+        MyRegression.regresion_lineal([1, 1], [2, 3])
+    with pytest.raises(ValueError):
+        MyRegression.regresion_lineal([1, 2], [2])
+
+
+def test_una_variable_igual_que_regresion_lineal():
+    xs = [0.5, 1.0, 2.5, 4.0, 7.0]
+    ys = [1.2, 1.9, 5.1, 8.2, 13.7]
+    reg = MyRegression.ajustar_parcial(MyRegression.crear_regresion(), xs, ys)
+    assert _close(MyRegression.coeficientes_regresion(reg), MyRegression.regresion_lineal(xs, ys))
+
+
+def test_ajuste_multiple_exacto():
+    xs, ys = _data(50, 1)
+    reg = MyRegression.ajustar_parcial(MyRegression.crear_regresion(3), xs, ys)
+    assert _close(MyRegression.coeficientes_regresion(reg), W + [B])
+    assert _close(MyRegression.predecir_regresion(reg, [[1, 1, 1], [0, 0, 0]]), [3.5, 4.0])
+
+
+def test_partes_y_combinacion_igual_que_todo_junto(monkeypatch):
+    # bloques chicos: los ejemplos de cada ajuste parcial se parten en varios
+    monkeypatch.setattr(MyRegression, "CHUNK_ROWS", 7)
+    xs, ys = _data(60, 2)
+    ys = [y + 0.1 * (i % 3 - 1) for i, y in enumerate(ys)]   # con ruido
+    whole = MyRegression.crear_regresion(3).partial_fit(xs, ys)
+    first = MyRegression.crear_regresion(3).partial_fit(xs[:25], ys[:25])
+    second = MyRegression.crear_regresion(3).partial_fit(xs[25:], ys[25:])
+    merged = MyRegression.combinar_regresion(first, second)
+    assert merged.n == 60
+    assert _close(merged.coefficients(), whole.coefficients())
+    incremental = MyRegression.crear_regresion(3)
+    for start in range(0, 60, 11):
+        MyRegression.ajustar_parcial(incremental, xs[start:start + 11], ys[start:start + 11])
+    assert _close(incremental.coefficients(), whole.coefficients())
+
+
+def test_promedios_grandes_no_pierden_precision():
+    xs, ys = _data(200, 3, offset=1e7)
+    reg = MyRegression.crear_regresion(3).partial_fit(xs[:100], ys[:100])
+    reg = reg.merge(MyRegression.crear_regresion(3).partial_fit(xs[100:], ys[100:]))
+    coefs = reg.coefficients()
+    assert _close(coefs[:3], W, 1e-6)
+    assert abs(coefs[3] - B) < 1e-2
+
+
+def _lines(xs, ys):
+    return [" ".join(map(repr, x)) + f", {y!r}" for x, y in zip(xs, ys)]
+
+
+def test_ajustar_archivo_del_disco(tmp_path, monkeypatch):
+    monkeypatch.setattr(MyRegression, "CHUNK_ROWS", 4)
+    xs, ys = _data(30, 4)
+    path = tmp_path / "datos.txt"
+    path.write_text("x1 x2 x3 y\n# comentario\n\n" + "\n".join(_lines(xs, ys)) + "\n")
+    reg = MyRegression.ajustar_archivo(MyRegression.crear_regresion(3), str(path))
+    assert reg.n == 30
+    assert _close(reg.coefficients(), MyRegression.crear_regresion(3).partial_fit(xs, ys).coefficients())
+
+
+def test_ajustar_archivo_de_myfile(monkeypatch):
+    xs, ys = _data(20, 5)
+    monkeypatch.setitem(MyFile.FS, "datos_regresion.txt", "\n".join(_lines(xs, ys)))
+    reg = MyRegression.ajustar_archivo(MyRegression.crear_regresion(3), "datos_regresion.txt")
+    assert _close(reg.coefficients(), W + [B])
+
+
+@pytest.mark.parametrize("text, message", [
+    ("1 2 3 4\n1 2 x 4\n", "^Linea 2 invalida"),
+    ("1 2 3 4\n1 2 3\n", "^Linea 2 de"),
+])
+def test_archivo_con_lineas_invalidas(tmp_path, text, message):
+    path = tmp_path / "malo.txt"
+    path.write_text(text)
+    with pytest.raises(ValueError, match=message):
+        MyRegression.crear_regresion(3).fit_file(str(path))
+
+
+def test_errores_de_regresion(tmp_path):
+    with pytest.raises(ValueError, match="^Archivo no encontrado"):
+        MyRegression.crear_regresion(2).fit_file(str(tmp_path / "no_existe.txt"))
+    with pytest.raises(ValueError):
+        MyRegression.crear_regresion(0)
+    with pytest.raises(ValueError, match="^No se puede hacer regresion con 3 puntos"):
+        MyRegression.crear_regresion(3).partial_fit(*_data(3, 6)).coefficients()
+    with pytest.raises(ValueError, match="dependientes"):
+        MyRegression.crear_regresion(2).partial_fit([[1, 2], [2, 4], [3, 6]], [1, 2, 3]).coefficients()
+    with pytest.raises(ValueError, match="misma cantidad de variables"):
+        MyRegression.crear_regresion(2).merge(MyRegression.crear_regresion(3))
+    with pytest.raises(ValueError, match="variables"):
+        MyRegression.crear_regresion(2).partial_fit([[1, 2, 3]], [1])
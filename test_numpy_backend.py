@@ -0,0 +1,130 @@
+# test_numpy_backend.py
+# Paridad del motor "numpy" (NumpyBackend.py) con el motor de Python: se
+# ejecutan las mismas operaciones con ambos y los resultados deben coincidir
+# salvo redondeo. Se saltea si NumPy no esta instalado.
+#
+#   python -m pytest -q test_numpy_backend.py
+
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import Backend
+import Matrix
+import MyClusterNN
+import MyMLP
+
+
+TOL = 1e-9
+
+_rng = random.Random(0)
+
+
+def _rand_rows(r, c):
+    return [[_rng.uniform(-1.0, 1.0) for _ in range(c)] for _ in range(r)]
+
+
+A = _rand_rows(30, 20)
+B = _rand_rows(20, 25)
+S = _rand_rows(12, 12)
+X = _rand_rows(40, 3)
+Y = [1 if sum(x) > 0 else 0 for x in X]
+CLASSES = [int(2 * (x[0] + 1)) % 3 for x in X]
+
+
+# Resultado de cada operacion con el motor activo
+def _run():
+    mlp = MyMLP.create_mlp(3, 5, 1)
+    MyMLP.train_mlp(mlp, X, Y, 0.5, 20)
+    mlp_batch = MyMLP.create_mlp(3, 5, 1)
+    MyMLP.train_mlp(mlp_batch, X, Y, 0.5, 20, 16)
+    mlp_stop = MyMLP.create_mlp(3, 5, 1)
+    MyMLP.train_mlp(mlp_stop, X, Y, 2.0, 200, 0, 1e-4, 3, "inverse")
+    deep = MyMLP.create_net([3, 6, 4, 3], "tanh")
+    MyMLP.train_net(deep, X, CLASSES, 0.3, 15, 8)
+    relu = MyMLP.create_net([3, 5, 1], "relu")
+    MyMLP.train_net(relu, X, Y, 0.3, 15, None, None, None, 0.9)
+    net = MyClusterNN.create_cluster_net(3, 4)
+    MyClusterNN.train_cluster_net(net, X, 0.2, 5)
+    lloyd = MyClusterNN.create_kmeans(3, 4, 7)
+    MyClusterNN.train_kmeans(lloyd, X, 20)
+    minibatch = MyClusterNN.create_kmeans(3, 3, 7)
+    MyClusterNN.train_kmeans(minibatch, X, 30, 8, 0)
+    return {
+        "mat_mul": Matrix.mat_mul(A, B).tolist(),
+        "mat_inverse": Matrix.mat_inverse(S).tolist(),
+        "mat_transpose": Matrix.mat_transpose(A).tolist(),
+        "mlp_W1": mlp.W1,
+        "mlp_W2": mlp.W2,
+        "mlp_bias": mlp.b1 + mlp.b2,
+        "mlp_salida": MyMLP.predict_real_mlp(mlp, X),
+        "mlp_lotes_W1": mlp_batch.W1,
+        "mlp_lotes_salida": MyMLP.predict_real_mlp(mlp_batch, X),
+        "mlp_lotes_perdida": MyMLP.loss_history(mlp_batch),
+        "mlp_parada_perdida": MyMLP.loss_history(mlp_stop),
+        "mlp_parada_W1": mlp_stop.W1,
+        "net_tanh_params": deep.params.tolist(),
+        "net_tanh_salida": MyMLP.predict_real_net(deep, X),
+        "net_tanh_perdida": MyMLP.loss_history(deep),
+        "net_relu_params": relu.params.tolist(),
+        "net_relu_perdida": MyMLP.loss_history(relu),
+        "cluster_centros": net.centers,
+        "cluster_etiquetas": MyClusterNN.predict_cluster(net, X),
+        "kmeans_centros": lloyd.centers,
+        "kmeans_inercia": MyClusterNN.inertia_history(lloyd),
+        "kmeans_mb_centros": minibatch.centers,
+        "kmeans_mb_inercia": MyClusterNN.inertia_history(minibatch),
+    }
+
+
+CASES = [
+    "mat_mul", "mat_inverse", "mat_transpose",
+    "mlp_W1", "mlp_W2", "mlp_bias", "mlp_salida",
+    "mlp_lotes_W1", "mlp_lotes_salida", "mlp_lotes_perdida",
+    "mlp_parada_perdida", "mlp_parada_W1",
+    "net_tanh_params", "net_tanh_salida", "net_tanh_perdida",
+    "net_relu_params", "net_relu_perdida",
+    "cluster_centros", "cluster_etiquetas",
+    "kmeans_centros", "kmeans_inercia", "kmeans_mb_centros", "kmeans_mb_inercia",
+]
+
+
+@pytest.fixture(scope="module")
+def results():
+    previous = Backend.get_backend()
+    try:
+        Backend.set_backend("python")
+        reference = _run()
+        Backend.set_backend("numpy")
+        vectorized = _run()
+    finally:
+        Backend.set_backend(previous)
+    return reference, vectorized
+
+
+def test_casos_cubiertos(results):
+    reference, vectorized = results
+    assert sorted(reference) == sorted(CASES) == sorted(vectorized)
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_paridad(results, case):
+    reference, vectorized = results
+    expected = np.asarray(reference[case], dtype=np.float64)
+    got = np.asarray(vectorized[case], dtype=np.float64)
+    # misma forma: por ejemplo, la misma cantidad de epocas antes de parar
+    assert got.shape == expected.shape
+    assert float(np.max(np.abs(got - expected))) <= TOL
+
+
+def test_ganador_en_empate_es_el_menor_indice():
+    model = MyClusterNN.create_cluster_net(2, 3)
+    model.centers = [[1.0, 0.0], [0.0, 1.0], [1.0, 0.0]]
+    previous = Backend.get_backend()
+    try:
+        Backend.set_backend("numpy")
+        assert MyClusterNN.predict_cluster(model, [[0.5, 0.5], [2.0, 0.0]]) == [0, 0]
+    finally:
+        Backend.set_backend(previous)
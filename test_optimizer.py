@@ -0,0 +1,69 @@
+# test_optimizer.py
+# Plegado de constantes y ramas muertas (Optimizer.py). Se saltea si no esta
+# el parser generado por ANTLR.
+#
+#   python -m pytest -q
+
+import contextlib
+import io
+import time
+
+import pytest
+
+pytest.importorskip("DLangParser")
+
+import Main
+import Optimizer
+from EvalVisitor import EvalVisitor
+
+
+def _dump(code):
+    tree = Main.parse_code(code)
+    return Optimizer.dump_program(tree, Optimizer.optimize(tree)).splitlines()
+
+
+def _run(code, engine):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        Main.run_code(code, EvalVisitor(), engine=engine, use_cache=False)
+    return out.getvalue()
+
+
+def test_pliega_expresiones_constantes():
+    assert _dump("x = 2 ^ 10 + 1\ny = sqrt(16) * 2\nz = 'ab' * 3\n") == [
+        "x = 1025", "y = 8.0", 'z = "ababab"',
+    ]
+
+
+def test_rama_muerta_desaparece():
+    code = "if (1 > 2) {\n    print(1)\n} else {\n    print(2 + 3)\n}\nwhile (false) {\n    print(4)\n}\n"
+    assert _dump(code) == ["print(5)"]
+
+
+# Lo que esta dentro de una rama muerta no se calcula
+def test_no_pliega_dentro_de_una_rama_muerta(monkeypatch):
+    calls = []
+    monkeypatch.setattr(Optimizer, "_fold_call", lambda func, *args: calls.append(args) or func(*args))
+    tree = Main.parse_code("if (false) {\n    y = factorial(20)\n}\nwhile (0) {\n    z = sqrt(4)\n}\nw = sqrt(9)\n")
+    opt = Optimizer.optimize(tree)
+    assert calls == [(9,)]
+    values = list(opt.constants.values())
+    assert 20 not in values and 4 not in values
+    assert 9 in values and 3.0 in values
+
+
+@pytest.mark.parametrize("code, expected", [
+    ("x = 2 ^ 20000\n", "x = 2 ^ 20000"),
+    ("x = factorial(200000)\n", "x = factorial(200000)"),
+    ("x = potencia(10, 5000)\n", "x = potencia(10, 5000)"),
+    ("x = 'a' * 100000\n", "x = 'a' * 100000"),
+])
+def test_resultados_grandes_quedan_para_la_ejecucion(code, expected):
+    t0 = time.perf_counter()
+    assert _dump(code) == [expected.replace("'", '"')]
+    assert time.perf_counter() - t0 < 1.0
+
+
+def test_resultado_grande_igual_en_todos_los_motores():
+    code = "x = 2 ^ 5000\nprint(x - 2 ^ 5000 + factorial(25) % 1000)\n"
+    assert _run(code, "compile") == _run(code, "vm") == _run(code, "tree") == "0\n"
@@ -0,0 +1,94 @@
+# test_program_cache.py
+# Cache de programas (ProgramCache.py): claves e invalidacion
+#
+#   python -m pytest -q
+
+import os
+import shutil
+
+import ProgramCache
+
+
+def _counting_build():
+    calls = []
+
+    def build(code):
+        calls.append(code)
+        return ("bytecode", code)
+    return build, calls
+
+
+def test_clave_depende_del_codigo_y_la_variante():
+    assert ProgramCache.source_key("x = 1") == ProgramCache.source_key("x = 1")
+    assert ProgramCache.source_key("x = 1") != ProgramCache.source_key("x = 2")
+    assert ProgramCache.source_key("x = 1", "opt") != ProgramCache.source_key("x = 1")
+
+
+def test_bytecode_en_disco_se_reutiliza(tmp_path):
+    build, calls = _counting_build()
+    ProgramCache.ProgramCache().get_bytecode("print(sin(1))", build, str(tmp_path))
+    co = ProgramCache.ProgramCache().get_bytecode("print(sin(1))", build, str(tmp_path))
+    assert co == ("bytecode", "print(sin(1))")
+    assert len(calls) == 1
+
+
+def test_funciones_puras_forman_parte_de_la_version():
+    files = [os.path.basename(path) for path in ProgramCache._folding_files()]
+    assert "MyMath.py" in files
+    assert "Operators.py" in files and "Optimizer.py" in files
+
+
+# Cambiar el codigo de una funcion pura (que el optimizador pliega dentro del
+# bytecode) invalida lo guardado en disco
+def test_cambio_en_una_funcion_pura_invalida_la_cache(tmp_path, monkeypatch):
+    library = tmp_path / "lib"
+    library.mkdir()
+    paths = []
+    for path in ProgramCache._folding_files():
+        paths.append(shutil.copy(path, library))
+    before = ProgramCache._files_version(paths)
+    assert before == ProgramCache.BUILTINS_VERSION
+
+    cache_dir = str(tmp_path / "cache")
+    build, calls = _counting_build()
+    ProgramCache.ProgramCache().get_bytecode("print(sin(1))", build, cache_dir)
+
+    mymath = str(library / "MyMath.py")
+    with open(mymath, "a") as f:
+        f.write("\n# sin cambia\n")
+    after = ProgramCache._files_version(paths)
+    assert after != before
+
+    monkeypatch.setattr(ProgramCache, "BUILTINS_VERSION", after)
+    ProgramCache.ProgramCache().get_bytecode("print(sin(1))", build, cache_dir)
+    assert len(calls) == 2
+    assert len(os.listdir(cache_dir)) == 2
+
+
+# Arboles en disco: se guarda encode(arbol) y se reconstruye con decode
+def test_arbol_en_disco_se_reutiliza(tmp_path):
+    build, calls = _counting_build()
+    args = (str(tmp_path), lambda tree: list(tree), tuple)
+    ProgramCache.ProgramCache().get_tree("print(1)", build, *args, variant="arbol")
+    tree = ProgramCache.ProgramCache().get_tree("print(1)", build, *args, variant="arbol")
+    assert tree == ("bytecode", "print(1)")
+    assert len(calls) == 1
+
+
+def test_arbol_que_no_se_puede_guardar(tmp_path):
+    build, calls = _counting_build()
+    for _ in range(2):
+        ProgramCache.ProgramCache().get_tree("x = (", build, str(tmp_path), lambda tree: None, tuple)
+    assert len(calls) == 2
+    assert os.listdir(tmp_path) == []
+
+
+def test_arbol_guardado_invalido_se_reconstruye(tmp_path):
+    build, calls = _counting_build()
+
+    def broken(data):
+        raise ValueError("formato viejo")
+    ProgramCache.ProgramCache().get_tree("print(1)", build, str(tmp_path), list, broken)
+    tree = ProgramCache.ProgramCache().get_tree("print(1)", build, str(tmp_path), list, broken)
+    assert tree == ("bytecode", "print(1)")
+    assert len(calls) == 2
@@ -0,0 +1,65 @@
+# test_scope.py
+# Ambitos de las funciones (Scope.py): las mismas reglas en los tres motores.
+# Se saltea si no esta el parser generado por ANTLR.
+#
+#   python -m pytest -q
+
+import contextlib
+import io
+
+import pytest
+
+pytest.importorskip("DLangParser")
+
+import Main
+from EvalVisitor import EvalVisitor
+
+
+ENGINES = ["tree", "compile", "vm"]
+
+
+def _run(code, engine):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        Main.run_code(code, EvalVisitor(), engine=engine, use_cache=False)
+    return out.getvalue().split()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_parametros_son_locales(engine):
+    code = "x = 1\ndef f(x) {\n    x = x + 10\n    return x\n}\nprint(f(2))\nprint(x)\n"
+    assert _run(code, engine) == ["12", "1"]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_lee_globales(engine):
+    code = "k = 3\ndef f(n) {\n    return n * k\n}\nprint(f(2))\nk = 5\nprint(f(2))\n"
+    assert _run(code, engine) == ["6", "10"]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_asignar_una_global_existente_la_actualiza(engine):
+    code = "total = 0\ndef sumar(n) {\n    total = total + n\n}\nsumar(2)\nsumar(3)\nprint(total)\n"
+    assert _run(code, engine) == ["5"]
+
+
+# La regla se aplica al llamar: la global puede crearse despues de definir f
+@pytest.mark.parametrize("engine", ENGINES)
+def test_global_creada_despues_de_definir(engine):
+    code = "def f() {\n    z = 1\n}\nz = 0\nf()\nprint(z)\n"
+    assert _run(code, engine) == ["1"]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_nombre_nuevo_es_local(engine):
+    code = "def f() {\n    y = 3\n    return y\n}\nprint(f())\nprint(y)\n"
+    with pytest.raises(Exception, match="Variable no definida: y"):
+        _run(code, engine)
+
+
+# Cada llamada tiene sus propios locales, tambien en la recursion
+@pytest.mark.parametrize("engine", ENGINES)
+def test_cada_llamada_tiene_su_marco(engine):
+    code = ("def suma(n) {\n    if (n == 0) {\n        return 0\n    }\n"
+            "    parcial = suma(n - 1)\n    return parcial + n\n}\nprint(suma(10))\n")
+    assert _run(code, engine) == ["55"]
@@ -0,0 +1,81 @@
+# test_vm.py
+# Motor "vm" (VMCompiler.py y VM.py): mismos resultados que el motor "tree",
+# desensamblado y bytecode serializable. Se saltea si no esta el parser
+# generado por ANTLR.
+#
+#   python -m pytest -q
+
+import contextlib
+import io
+import pickle
+
+import pytest
+
+pytest.importorskip("DLangParser")
+
+import Main
+from EvalVisitor import EvalVisitor
+from VM import VM, disassemble
+
+
+PROGRAMS = [
+    "def fib(n) {\n    if (n < 2) {\n        return n\n    }\n    return fib(n - 1) + fib(n - 2)\n}\nprint(fib(15))\n",
+    "i = 0\ns = 0\nwhile (i < 100) {\n    s = s + i * 2 % 7 - 1\n    i = i + 1\n}\nprint(s)\n",
+    "print(2 ^ 10)\nprint(7 / 2)\nprint(-2.5 + +1)\nprint(not (1 < 2) or 3 >= 3 and \"a\" == \"a\")\n",
+    "L = [1, [2, 3], \"s\"]\nprint(L)\nprint([[1, 2], [3, 4]] * [[1, 0], [0, 1]])\n",
+    "if (0) {\n    print(\"no\")\n} else {\n    print(\"si\")\n}\ndef g() {\n    return\n}\nprint(g())\n",
+    "def a(n) {\n    return b(n) + 1\n}\ndef b(n) {\n    return n * 10\n}\nprint(a(4))\nprint(sqrt(16))\n",
+]
+
+
+def _run(code, engine):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        Main.run_code(code, EvalVisitor(), engine=engine, use_cache=False)
+    return out.getvalue()
+
+
+def _execute(co):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        VM(EvalVisitor()).run(co)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("code", PROGRAMS)
+def test_igual_que_el_interprete(code):
+    assert _run(code, "vm") == _run(code, "tree")
+
+
+@pytest.mark.parametrize("code, message", [
+    ("print(nada)\n", "Variable no definida: nada"),
+    ("print(nada(1))\n", "Funcion no definida: nada"),
+])
+def test_mismos_errores(code, message):
+    with pytest.raises(Exception, match=message):
+        _run(code, "vm")
+
+
+# Las llamadas del DSL no usan la pila de Python
+def test_recursion_profunda():
+    code = "def r(n) {\n    if (n == 0) {\n        return 0\n    }\n    return r(n - 1) + 1\n}\nprint(r(5000))\n"
+    assert _run(code, "vm") == "5000\n"
+
+
+def test_desensamblado():
+    co = Main.build_bytecode("def f(n) {\n    return n * 2\n}\nx = f(3)\nprint(x)\n", use_opt=False)
+    text = disassemble(co)
+    assert "Desensamblado de <programa>():" in text
+    assert "Desensamblado de f(n):" in text
+    for op in ("MAKE_FUNCTION", "CALL", "STORE_NAME", "LOAD_FAST", "BINARY_MUL", "PRINT", "RETURN"):
+        assert op in text
+
+
+# El bytecode guardado (cache en disco) se ejecuta igual y sin los destinos
+# de llamada ya resueltos
+def test_bytecode_serializado():
+    co = Main.build_bytecode("print(sqrt(16))\ndef f(n) {\n    return n + 1\n}\nprint(f(1))\n")
+    assert _execute(co) == "4.0\n2\n"
+    copy = pickle.loads(pickle.dumps(co))
+    assert all(target is None for target in copy.call_cache)
+    assert _execute(copy) == "4.0\n2\n"